@@ -123,9 +123,10 @@ router.post('/compare-candidates', protect, authorize('hr', 'admin'), async (req
     }
 
     // Call ML service - no fallback
+    // The ML service returns its best-so-far ranking (partial: true) before our timeout hits
     const response = await axios.post(`${AI_SERVICE_URL}/match-candidates`, 
       { jd_text, candidate_resumes },
-      { timeout: 60000 }
+      { timeout: 60000, headers: { 'X-Request-Timeout-Ms': '55000' } }
     );
     
     return res.json({
@@ -1,17 +1,69 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
+from typing import List, Optional, Union
 import uvicorn
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 from resume_analyzer import ResumeAnalyzer
 from jd_analyzer import JDAnalyzer
 from candidate_matcher import CandidateMatcher
+from vacancy_index import VacancyIndex
+from candidate_index import CandidateIndex
+from shared_state import SharedStateStore
+from profiling import RequestProfiler
+from coalescing import SingleFlight, content_key
+from batching import MicroBatcher
+from nlp_loader import load_spacy_model
+from metrics import (
+    REGISTRY, REQUESTS_TOTAL, REQUEST_LATENCY, REQUESTS_IN_PROGRESS,
+    EXECUTOR_QUEUE_DEPTH, EXECUTOR_ACTIVE, DEADLINE_OUTCOMES, stage, record_rejection
+)
+from prescreen import ResumeRejected
+from scoring import MatchScorer, ScoringConfigStore
+from ranking_session import RankingSession, RankingSessionStore
+from ranking_cache import RankingCache, vacancy_version
+from skill_filter import CandidateFilter
+from cascade import Cascade, ExpensiveScoreCache, build_scorer
+from sharding import ShardCoordinator, ShardError
+from deadline import Deadline, DeadlineExceeded, RequestCancelled
+import minhash
 
 load_dotenv()
 
-app = FastAPI(title="Resume Shortlisting AI Service", version="1.0.0")
+def warm_up():
+    """Import sklearn and load the spaCy model now rather than on the first request"""
+    start = time.perf_counter()
+    from sklearn.base import clone  # noqa: F401
+    from sklearn.metrics.pairwise import cosine_similarity  # noqa: F401
+    candidate_matcher.vectorizer
+    resume_analyzer.nlp
+    try:
+        jd_analyzer.nlp
+    except OSError as e:
+        print(f"⚠️  JD analysis will be unavailable: {e}")
+    print(f"🔥 Models warmed up in {time.perf_counter() - start:.2f}s")
+
+@asynccontextmanager
+async def lifespan(app):
+    # ML_LAZY_LOAD=1 defers model loading to the first request that needs it
+    if os.getenv("ML_LAZY_LOAD", "0").lower() not in ("1", "true", "yes"):
+        await asyncio.get_running_loop().run_in_executor(None, warm_up)
+    yield
+    if hasattr(cascade.scorer, "close"):
+        await cascade.scorer.close()
+    if shard_coordinator is not None:
+        await shard_coordinator.close()
+    analysis_executor.shutdown(wait=False)
+
+app = FastAPI(title="Resume Shortlisting AI Service", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -23,9 +75,172 @@ app.add_middleware(
 )
 
 # Initialize AI services
-resume_analyzer = ResumeAnalyzer()
+# FUZZY_SKILLS=1 turns on typo-tolerant skill lookup (skill_resolver.py)
+fuzzy_skills = os.getenv("FUZZY_SKILLS", "0").lower() in ("1", "true", "yes")
+resume_analyzer = ResumeAnalyzer(fuzzy_skills=fuzzy_skills)
 jd_analyzer = JDAnalyzer()
-candidate_matcher = CandidateMatcher()
+candidate_matcher = CandidateMatcher(fuzzy_skills=fuzzy_skills)
+# With several workers (serve.py) the vacancy index lives in a shared memory-mapped snapshot
+shared_state_dir = os.getenv("ML_SHARED_STATE_DIR")
+vacancy_index = VacancyIndex(
+    candidate_matcher,
+    store=SharedStateStore(shared_state_dir) if shared_state_dir else None
+)
+
+# On-disk candidate pool, memory-mapped on first use (see candidate_index.py)
+candidate_index_dir = os.getenv("CANDIDATE_INDEX_DIR", os.path.join("data", "candidate_index"))
+candidate_index = None
+candidate_index_lock = threading.Lock()
+
+def get_candidate_index():
+    """Open the candidate index if one exists; None otherwise"""
+    global candidate_index
+    if candidate_index is None and os.path.exists(os.path.join(candidate_index_dir, "MANIFEST.json")):
+        with candidate_index_lock:
+            if candidate_index is None:
+                candidate_index = CandidateIndex.open(candidate_index_dir, candidate_matcher)
+    return candidate_index
+
+# Named match scoring configs (per tenant or vacancy); changing one needs no redeploy
+scoring_store = ScoringConfigStore(os.getenv("SCORING_CONFIG_DIR", os.path.join("data", "scoring")))
+
+def resolve_scorer(scoring):
+    """Compiled scorer for a request's `scoring` value; None keeps the default weights"""
+    if scoring is None:
+        return candidate_matcher.scorer
+    return MatchScorer([scoring_store.resolve(scoring)])
+
+# What-if re-ranking sessions (per worker, in memory)
+ranking_sessions = RankingSessionStore(
+    max_sessions=int(os.getenv("RANKING_SESSIONS_MAX", "16")),
+    ttl_seconds=float(os.getenv("RANKING_SESSION_TTL_SECONDS", "1800"))
+)
+
+# Rankings of vacancies' applicant pools, updated per applicant (per worker, in memory)
+ranking_cache = RankingCache(
+    candidate_matcher,
+    max_entries=int(os.getenv("RANKING_CACHE_SIZE", "128")),
+    max_rows=int(os.getenv("RANKING_CACHE_MAX_ROWS", "500000"))
+)
+
+# Coordinator mode: candidates are partitioned across these ml-service nodes (see sharding.py)
+shard_urls = [url.strip() for url in os.getenv("ML_SHARDS", "").split(",") if url.strip()]
+shard_coordinator = ShardCoordinator(
+    shard_urls, timeout_seconds=float(os.getenv("ML_SHARD_TIMEOUT_SECONDS", "5"))
+) if shard_urls else None
+
+def get_shard_coordinator():
+    if shard_coordinator is None:
+        raise HTTPException(status_code=404, detail="Sharding is not configured. Set ML_SHARDS to the shard URLs.")
+    return shard_coordinator
+
+# Local ranking first, then only the top of the pool goes to the expensive (LLM) scorer
+cascade = Cascade(
+    build_scorer(
+        os.getenv("CASCADE_SCORER", "stub"),
+        timeout_seconds=float(os.getenv("CASCADE_SCORER_TIMEOUT_SECONDS", "60")),
+        stub_latency_seconds=float(os.getenv("CASCADE_STUB_LATENCY_MS", "0")) / 1000
+    ),
+    ExpensiveScoreCache(max_entries=int(os.getenv("CASCADE_CACHE_SIZE", "10000"))),
+    max_concurrency=int(os.getenv("CASCADE_CONCURRENCY", "4"))
+)
+
+# CPU-bound analysis runs here so the event loop stays free for health checks and scrapes
+analysis_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ANALYSIS_WORKERS", "4")),
+    thread_name_prefix="analysis"
+)
+started_at = time.time()
+request_profiler = RequestProfiler()
+# Identical analyses already in flight (concurrent opens, client retries) share one computation
+resume_text_flight = SingleFlight("analyze_resume_text")
+jd_flight = SingleFlight("analyze_jd")
+
+async def run_analysis(fn, *args, **kwargs):
+    """Run blocking analysis on the executor, tracking queue depth"""
+    EXECUTOR_QUEUE_DEPTH.inc()
+    
+    def task():
+        EXECUTOR_QUEUE_DEPTH.dec()
+        EXECUTOR_ACTIVE.inc()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            EXECUTOR_ACTIVE.dec()
+    
+    future = analysis_executor.submit(task)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # A task cancelled before it started never decremented the queue
+        if future.cancel():
+            EXECUTOR_QUEUE_DEPTH.dec()
+        raise
+
+async def wait_for_disconnect(http_request):
+    """Return once the client has gone away (the request body must already have been read)"""
+    # Not Request.is_disconnected(): behind an @app.middleware("http") it never reports the disconnect
+    while (await http_request.receive())["type"] != "http.disconnect":
+        pass
+
+async def run_until_disconnect(http_request, deadline, fn, /, *args, **kwargs):
+    """run_analysis, cancelling `deadline` (so fn stops at its next check) if the client disconnects"""
+    work = asyncio.ensure_future(run_analysis(fn, *args, **kwargs))
+    disconnected = asyncio.ensure_future(wait_for_disconnect(http_request))
+    try:
+        await asyncio.wait({work, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        if work.done():
+            return work.result()
+        deadline.cancel()
+        raise RequestCancelled("Client disconnected")
+    finally:
+        for task in (work, disconnected):
+            if not task.done():
+                task.cancel()
+
+def parse_batch(texts):
+    """Parse lower-cased texts with one nlp.pipe call; None per text if the model is missing"""
+    try:
+        nlp = load_spacy_model("en_core_web_sm")
+    except OSError:
+        return [None] * len(texts)
+    with stage("nlp_batch", "pipe"):
+        return list(nlp.pipe(texts, batch_size=len(texts)))
+
+# Concurrent resume-text and JD requests share spaCy batches (NLP_BATCHING=0 parses one by one)
+nlp_batcher = MicroBatcher(
+    "nlp",
+    parse_batch,
+    run_analysis,
+    max_batch_size=int(os.getenv("NLP_BATCH_MAX_SIZE", "16")),
+    max_wait_ms=float(os.getenv("NLP_BATCH_MAX_WAIT_MS", "5")),
+) if os.getenv("NLP_BATCHING", "1").lower() not in ("0", "false", "no") else None
+
+async def parse_text(text):
+    """spaCy doc of text.lower() via the micro-batcher, or None to let the analyzer parse it
+
+    Callers validate the text first, so rejected input never takes a batch slot.
+    """
+    if nlp_batcher is None:
+        return None
+    return await nlp_batcher.submit(text.lower())
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and record latency per route template"""
+    start = time.perf_counter()
+    REQUESTS_IN_PROGRESS.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_PROGRESS.dec()
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUEST_LATENCY.observe(time.perf_counter() - start, request.method, endpoint)
+        REQUESTS_TOTAL.inc(request.method, endpoint, status)
 
 class AnalysisRequest(BaseModel):
     text: str
@@ -33,13 +248,103 @@ class AnalysisRequest(BaseModel):
 class TextAnalysisRequest(BaseModel):
     text: str
 
+class ReanalysisRequest(BaseModel):
+    text: str
+    previous_analysis: dict
+    candidate_id: Optional[str] = None
+
+class MatchRequest(BaseModel):
+    jd_text: str
+    candidate_resumes: list
+    # Score only the first submission of each near-duplicate group (others listed under "duplicates")
+    collapse_duplicates: bool = False
+    # Stored scoring config name or an inline config; default weights if omitted
+    scoring: Optional[Union[str, dict]] = None
+    # Hard filters applied before scoring: must / must_not skills, experience / education ranges
+    filters: Optional[dict] = None
+
+class CascadeRequest(BaseModel):
+    jd_text: str
+    candidate_resumes: list
+    # Forward the local top_k, plus anyone within `margin` points of the top_k-th score
+    top_k: int = 10
+    margin: float = 0.0
+    collapse_duplicates: bool = False
+    scoring: Optional[Union[str, dict]] = None
+    filters: Optional[dict] = None
+
+class VacancyProfile(BaseModel):
+    # Omitted: an automatic vacancy_<n> ID is assigned
+    id: Optional[Union[str, int]] = None
+    title: str = ''
+    text: str = ''
+    # Stored scoring config name or an inline config
+    scoring: Optional[Union[str, dict]] = None
+
+class VacancyIndexRequest(BaseModel):
+    vacancies: List[VacancyProfile]
+    replace: bool = False
+
+class VacancyMatchRequest(BaseModel):
+    resumes: list
+    top_k: int = 10
+
+class CandidateIndexRequest(BaseModel):
+    candidates: list
+
+class NearDuplicateRequest(BaseModel):
+    text: Optional[str] = None
+    # "minhash" from a resume analysis, instead of the text
+    minhash: Optional[str] = None
+
+class CandidateSearchRequest(BaseModel):
+    jd_text: str
+    top_k: int = 50
+    scoring: Optional[Union[str, dict]] = None
+    filters: Optional[dict] = None
+
+class ShardedIndexRequest(BaseModel):
+    candidates: list
+    timeout_seconds: Optional[float] = None
+
+class ShardedSearchRequest(BaseModel):
+    jd_text: str
+    top_k: int = 50
+    scoring: Optional[Union[str, dict]] = None
+    filters: Optional[dict] = None
+    # Per-shard deadline; shards slower than this are left out and the result is flagged partial
+    timeout_seconds: Optional[float] = None
+
+class RankingSessionRequest(BaseModel):
+    jd_text: str
+    # Candidates to rank; the whole candidate index when omitted
+    candidate_resumes: Optional[list] = None
+    top_k: int = 50
+    scoring: Optional[Union[str, dict]] = None
+
+class VacancyRankingRequest(BaseModel):
+    jd_text: str
+    candidate_resumes: list
+    scoring: Optional[Union[str, dict]] = None
+    # The whole ranking when omitted
+    top_k: Optional[int] = None
+
+class RerankRequest(BaseModel):
+    # Requirement overrides; omitted fields keep what was extracted from the JD
+    skills: Optional[list] = None
+    experience_years: Optional[float] = None
+    education: Optional[str] = None
+    top_k: int = 50
+    scoring: Optional[Union[str, dict]] = None
+
 @app.get("/")
 async def root():
     return {"message": "AI Resume Shortlisting Service", "status": "running"}
 
 @app.post("/analyze-resume")
-async def analyze_resume(file: UploadFile = File(...)):
+async def analyze_resume(http_request: Request, file: UploadFile = File(...)):
     """Analyze uploaded resume and return AI score and analysis"""
+    started = time.perf_counter()
     try:
         # Validate file
         if not file.filename:
@@ -59,25 +364,39 @@ async def analyze_resume(file: UploadFile = File(...)):
         if len(content) > 5 * 1024 * 1024:
             raise HTTPException(status_code=400, detail="File size exceeds 5MB limit.")
         
-        # Reset file pointer for extraction
-        await file.seek(0)
-        
         print(f"Processing file: {file.filename}, size: {len(content)} bytes")
         
-        # Extract text from resume
-        text = await resume_analyzer.extract_text(file)
-        print(f"Extracted text length: {len(text)}")
-        
-        # Analyze resume - this will raise ValueError for invalid content
-        analysis = resume_analyzer.analyze(text)
-        print(f"Analysis completed successfully")
+        deadline = Deadline.from_headers(http_request.headers)
+        with request_profiler.request("analyze_resume", http_request.headers) as profile:
+            profile.set_input(content, filename=file.filename)
+            
+            # Extract text from resume
+            text = await run_until_disconnect(
+                http_request, deadline, profile.wrap(resume_analyzer.extract_text_from_bytes), content, file.filename
+            )
+            print(f"Extracted text length: {len(text)}")
+            
+            # Analyze resume - this will raise ValueError for invalid content
+            analysis = await run_until_disconnect(
+                http_request, deadline, profile.wrap(resume_analyzer.analyze), text, deadline=deadline
+            )
+            print(f"Analysis completed successfully")
         
         return {
             "success": True,
             "data": analysis
         }
+    except DeadlineExceeded as e:
+        DEADLINE_OUTCOMES.inc("analyze_resume", "exceeded")
+        raise HTTPException(status_code=504, detail=str(e))
+    except RequestCancelled as e:
+        DEADLINE_OUTCOMES.inc("analyze_resume", "cancelled")
+        print(f"Resume analysis cancelled: {str(e)}")
+        raise HTTPException(status_code=499, detail=str(e))
     except ValueError as e:
         # Handle validation errors (empty resume, non-technical content, etc.)
+        if isinstance(e, ResumeRejected):
+            record_rejection(e.tier, e.reason, time.perf_counter() - started)
         print(f"Validation error: {str(e)}")
         raise HTTPException(status_code=422, detail=str(e))
     except HTTPException:
@@ -91,29 +410,75 @@ async def analyze_resume(file: UploadFile = File(...)):
 @app.post("/analyze-resume-text")
 async def analyze_resume_text(request: TextAnalysisRequest):
     """Analyze resume text directly"""
+    started = time.perf_counter()
+    try:
+        if not request.text or len(request.text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Resume text is required.")
+        
+        async def compute():
+            return await run_analysis(resume_analyzer.analyze, request.text)
+        
+        analysis = await resume_text_flight.do(content_key(request.text), compute)
+        
+        return {
+            "success": True,
+            "data": analysis
+        }
+    except ValueError as e:
+        if isinstance(e, ResumeRejected):
+            record_rejection(e.tier, e.reason, time.perf_counter() - started)
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Resume analysis failed: {str(e)}")
+
+def _reanalyze(text, previous_analysis, candidate_id):
+    analysis = resume_analyzer.reanalyze(text, previous_analysis)
+    index_update = None
+    index = get_candidate_index()
+    if candidate_id and index is not None:
+        # Replaces just this candidate's row instead of rebuilding the index
+        index_update = index.update(resume_analyzer.candidate_profile(candidate_id, text, analysis))
+    analysis["reanalysis"]["index_update"] = index_update
+    return analysis
+
+@app.post("/reanalyze-resume-text")
+async def reanalyze_resume_text(request: ReanalysisRequest):
+    """Re-analyze an updated resume, recomputing only the sections that changed"""
+    started = time.perf_counter()
     try:
         if not request.text or len(request.text.strip()) == 0:
             raise HTTPException(status_code=400, detail="Resume text is required.")
         
-        analysis = resume_analyzer.analyze(request.text)
+        analysis = await run_analysis(_reanalyze, request.text, request.previous_analysis, request.candidate_id)
         
         return {
             "success": True,
             "data": analysis
         }
+    except HTTPException:
+        raise
     except ValueError as e:
+        if isinstance(e, ResumeRejected):
+            record_rejection(e.tier, e.reason, time.perf_counter() - started)
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume analysis failed: {str(e)}")
 
 @app.post("/analyze-jd")
-async def analyze_jd(request: AnalysisRequest):
+async def analyze_jd(request: AnalysisRequest, http_request: Request):
     """Analyze job description and extract key requirements"""
     try:
         if not request.text or len(request.text.strip()) == 0:
             raise HTTPException(status_code=400, detail="Job description text is required.")
         
-        analysis = jd_analyzer.analyze(request.text)
+        async def compute():
+            with request_profiler.request("analyze_jd", http_request.headers) as profile:
+                profile.set_input(request.text)
+                # Parsed only after the emptiness check above; resume text is validated without any parse
+                doc = await parse_text(request.text)
+                return await run_analysis(profile.wrap(jd_analyzer.analyze), request.text, doc=doc)
+        
+        analysis = await jd_flight.do(content_key(request.text), compute)
         
         return {
             "success": True,
@@ -125,8 +490,10 @@ async def analyze_jd(request: AnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/match-candidates")
-async def match_candidates(jd_text: str, candidate_resumes: list):
+async def match_candidates(request: MatchRequest, http_request: Request):
     """Match candidates to job description"""
+    jd_text = request.jd_text
+    candidate_resumes = request.candidate_resumes
     try:
         if not jd_text or len(jd_text.strip()) == 0:
             raise HTTPException(status_code=400, detail="Job description text is required.")
@@ -134,17 +501,486 @@ async def match_candidates(jd_text: str, candidate_resumes: list):
         if not candidate_resumes or len(candidate_resumes) == 0:
             raise HTTPException(status_code=400, detail="At least one candidate resume is required.")
         
-        matches = candidate_matcher.match(jd_text, candidate_resumes)
+        scorer = resolve_scorer(request.scoring)
+        filters = CandidateFilter(request.filters)
+        deadline = Deadline.from_headers(http_request.headers)
+        
+        with request_profiler.request("match_candidates", http_request.headers) as profile:
+            profile.set_input(
+                jd_text,
+                candidate_count=len(candidate_resumes),
+                candidate_text_chars=sum(len(c.get('text') or '') for c in candidate_resumes if isinstance(c, dict))
+            )
+            matches = await run_until_disconnect(
+                http_request, deadline, profile.wrap(candidate_matcher.match), jd_text, candidate_resumes, scorer,
+                collapse_duplicates=request.collapse_duplicates, filters=filters, deadline=deadline
+            )
+        
+        response = {
+            "success": True,
+            "data": matches,
+            "scoring_version": scorer.versions[0],
+            "partial": deadline.partial is not None
+        }
+        if deadline.partial is not None:
+            # Out of time: the best-so-far ranking of the candidates scored before the deadline
+            DEADLINE_OUTCOMES.inc("match_candidates", "partial")
+            response["progress"] = deadline.partial
+        return response
+    except HTTPException:
+        raise
+    except RequestCancelled as e:
+        DEADLINE_OUTCOMES.inc("match_candidates", "cancelled")
+        print(f"Matching cancelled: {str(e)}")
+        raise HTTPException(status_code=499, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/match-candidates/cascade")
+async def match_candidates_cascade(request: CascadeRequest):
+    """Rank candidates locally, then re-rank only the top of the pool with the expensive scorer"""
+    try:
+        if not request.jd_text or len(request.jd_text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Job description text is required.")
+        
+        if not request.candidate_resumes:
+            raise HTTPException(status_code=400, detail="At least one candidate resume is required.")
+        
+        if request.top_k < 1 or request.margin < 0:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1 and margin must not be negative.")
+        
+        scorer = resolve_scorer(request.scoring)
+        filters = CandidateFilter(request.filters)
+        with stage("cascade", "local"):
+            matches = await run_analysis(
+                candidate_matcher.match, request.jd_text, request.candidate_resumes, scorer,
+                collapse_duplicates=request.collapse_duplicates, filters=filters
+            )
+        
+        matches, stats = await cascade.rerank(
+            request.jd_text, request.candidate_resumes, matches, top_k=request.top_k, margin=request.margin
+        )
+        
+        return {
+            "success": True,
+            "data": matches,
+            "cascade": dict(stats, scorer=cascade.scorer.name),
+            "scoring_version": scorer.versions[0]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/vacancies/index")
+async def index_vacancies(request: VacancyIndexRequest):
+    """Add or replace vacancy profiles used for reverse matching"""
+    try:
+        # Stored config names are resolved now, so a vacancy keeps the weights it was indexed with
+        vacancies = [
+            dict(vacancy, scoring=scoring_store.resolve(vacancy["scoring"])) if vacancy.get("scoring") else vacancy
+            for vacancy in (profile.model_dump() for profile in request.vacancies)
+        ]
+        
+        if request.replace:
+            vacancy_index.clear()
+        
+        total = vacancy_index.upsert(vacancies)
+        # An edited JD invalidates that vacancy's cached rankings only
+        for vacancy in vacancies:
+            if vacancy.get('id') is not None:
+                ranking_cache.invalidate(vacancy['id'], keep_version=vacancy_version(vacancy.get('text', '')))
+        
+        return {
+            "success": True,
+            "data": {"indexed": len(request.vacancies), "total_vacancies": total}
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/vacancies/{vacancy_id}")
+async def remove_vacancy(vacancy_id: str):
+    """Remove a vacancy from the reverse-matching index"""
+    removed = vacancy_index.remove([vacancy_id])
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Vacancy '{vacancy_id}' is not indexed.")
+    ranking_cache.invalidate(vacancy_id)
+    
+    return {"success": True, "data": {"total_vacancies": len(vacancy_index)}}
+
+@app.post("/vacancies/{vacancy_id}/ranking")
+async def rank_vacancy_applicants(vacancy_id: str, request: VacancyRankingRequest):
+    """Rank a vacancy's applicants, reusing its cached ranking and scoring only new or edited applicants"""
+    try:
+        if not request.jd_text or len(request.jd_text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Job description text is required.")
+        
+        if not request.candidate_resumes:
+            raise HTTPException(status_code=400, detail="At least one candidate resume is required.")
+        
+        if request.top_k is not None and request.top_k < 1:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+        
+        scorer = resolve_scorer(request.scoring)
+        matches, info = await run_analysis(
+            ranking_cache.rank, vacancy_id, request.jd_text, request.candidate_resumes, scorer, top_k=request.top_k
+        )
+        
+        return {
+            "success": True,
+            "data": matches,
+            "ranking_cache": info,
+            "scoring_version": scorer.versions[0]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/vacancies/{vacancy_id}/ranking")
+async def invalidate_vacancy_ranking(vacancy_id: str):
+    """Drop a vacancy's cached rankings"""
+    return {"success": True, "data": {"invalidated": ranking_cache.invalidate(vacancy_id)}}
+
+@app.get("/ranking-cache")
+async def ranking_cache_stats():
+    """Size of the ranking cache"""
+    return {"success": True, "data": ranking_cache.stats()}
+
+@app.post("/match-vacancies")
+async def match_vacancies(request: VacancyMatchRequest):
+    """Match one or many resumes against every indexed vacancy"""
+    try:
+        if not request.resumes:
+            raise HTTPException(status_code=400, detail="At least one resume is required.")
+        
+        if len(vacancy_index) == 0:
+            raise HTTPException(status_code=400, detail="No vacancies are indexed. Use /vacancies/index first.")
+        
+        if request.top_k < 1:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+        
+        matches = await run_analysis(vacancy_index.match, request.resumes, top_k=request.top_k)
         
         return {
             "success": True,
             "data": matches
         }
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _append_candidates(candidates):
+    """Ingest candidates, creating the index on first use; returns (index, near-duplicates found)"""
+    global candidate_index
+    index = get_candidate_index()
+    if index is None:
+        with candidate_index_lock:
+            if candidate_index is None:
+                # The first batch also fixes the index vocabulary
+                candidate_index = CandidateIndex.create(
+                    candidate_index_dir, candidate_matcher, candidates, append=False
+                )
+        index = candidate_index
+    return index, index.ingest(candidates)
+
+def _format_duplicates(matches):
+    return [{"candidate_id": candidate_id, "similarity": score} for candidate_id, score in matches]
+
+@app.post("/candidates/index")
+async def index_candidates(request: CandidateIndexRequest):
+    """Append candidates to the on-disk candidate index"""
+    try:
+        if not request.candidates:
+            raise HTTPException(status_code=400, detail="At least one candidate is required.")
+        
+        index, duplicates = await run_analysis(_append_candidates, request.candidates)
+        
+        return {
+            "success": True,
+            "data": {
+                "indexed": len(request.candidates),
+                "total_candidates": len(index),
+                "generation": index.generation,
+                # New candidate ID -> already indexed (or earlier in this batch) near-duplicate resumes
+                "near_duplicates": {
+                    candidate_id: _format_duplicates(matches) for candidate_id, matches in duplicates.items()
+                }
+            }
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/candidates/near-duplicates")
+async def find_near_duplicates(request: NearDuplicateRequest):
+    """Indexed candidates whose resumes are near-duplicates of a text or MinHash signature"""
+    try:
+        index = get_candidate_index()
+        if index is None:
+            raise HTTPException(status_code=404, detail="No candidate index. Use /candidates/index first.")
+        if not request.text and not request.minhash:
+            raise HTTPException(status_code=400, detail="Either text or minhash is required.")
+        
+        signature = minhash.decode(request.minhash) if request.minhash else None
+        matches = await run_analysis(index.near_duplicates, request.text, signature=signature)
+        return {"success": True, "data": _format_duplicates(matches)}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/index")
+async def candidate_index_stats():
+    """Segments, size and generation of the candidate index"""
+    index = get_candidate_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="No candidate index. Use /candidates/index first.")
+    index.refresh()
+    return {"success": True, "data": index.stats()}
+
+@app.delete("/candidates/{candidate_id:path}")
+async def remove_candidate(candidate_id: str):
+    """Delete a candidate from the candidate index"""
+    index = get_candidate_index()
+    if index is None or not index.delete([candidate_id]):
+        raise HTTPException(status_code=404, detail=f"Candidate '{candidate_id}' is not indexed.")
+    
+    return {"success": True, "data": {"total_candidates": len(index)}}
+
+@app.post("/candidates/compact")
+async def compact_candidates():
+    """Merge index segments and reclaim deleted rows"""
+    index = get_candidate_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="No candidate index. Use /candidates/index first.")
+    
+    compacted = await run_analysis(index.compact)
+    return {"success": True, "data": {"compacted": compacted, **index.stats()}}
+
+@app.post("/candidates/search")
+async def search_candidates(request: CandidateSearchRequest):
+    """Rank every indexed candidate against a job description"""
+    try:
+        index = get_candidate_index()
+        if index is None or len(index) == 0:
+            raise HTTPException(status_code=400, detail="No candidates are indexed. Use /candidates/index first.")
+        
+        if request.top_k < 1:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+        
+        scorer = resolve_scorer(request.scoring)
+        filters = CandidateFilter(request.filters)
+        matches = await run_analysis(
+            index.search, request.jd_text, top_k=request.top_k, scorer=scorer, filters=filters
+        )
+        
+        return {
+            "success": True,
+            "data": matches,
+            "scoring_version": scorer.versions[0]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/shards/candidates/index")
+async def index_sharded_candidates(request: ShardedIndexRequest):
+    """Route candidates to their shards by ID hash and index them there"""
+    coordinator = get_shard_coordinator()
+    try:
+        if not request.candidates:
+            raise HTTPException(status_code=400, detail="At least one candidate is required.")
+        
+        result = await coordinator.index(request.candidates, timeout_seconds=request.timeout_seconds)
+        return {"success": True, "data": result}
+    except HTTPException:
+        raise
+    except ShardError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/shards/candidates/search")
+async def search_sharded_candidates(request: ShardedSearchRequest):
+    """Fan a JD out to every shard and merge their top candidates"""
+    coordinator = get_shard_coordinator()
+    try:
+        if request.top_k < 1:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+        
+        result = await coordinator.search(
+            request.jd_text, top_k=request.top_k, scoring=request.scoring, filters=request.filters,
+            timeout_seconds=request.timeout_seconds
+        )
+        if not any(shard["status"] in ("ok", "empty") for shard in result["shards"]):
+            raise HTTPException(status_code=503, detail={"message": "No shard answered.", "shards": result["shards"]})
+        
+        return {"success": True, **result}
+    except HTTPException:
+        raise
+    except ShardError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/shards/candidates/{candidate_id:path}")
+async def remove_sharded_candidate(candidate_id: str):
+    """Delete a candidate from the shard that owns it"""
+    coordinator = get_shard_coordinator()
+    try:
+        removed = await coordinator.delete(candidate_id)
+    except ConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Candidate '{candidate_id}' is not indexed.")
+    
+    return {"success": True, "data": {"candidate_id": candidate_id}}
+
+@app.get("/shards")
+async def shard_status():
+    """Candidate counts and reachability of every shard"""
+    coordinator = get_shard_coordinator()
+    return {"success": True, "data": await coordinator.status()}
+
+@app.post("/ranking-sessions")
+async def create_ranking_session(request: RankingSessionRequest):
+    """Cache similarities and features of a candidate pool for a JD and return the first ranking"""
+    try:
+        if not request.jd_text or len(request.jd_text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Job description text is required.")
+        
+        if request.top_k < 1:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+        
+        scorer = resolve_scorer(request.scoring)
+        if request.candidate_resumes:
+            session = await run_analysis(
+                RankingSession.from_candidates, candidate_matcher, request.jd_text, request.candidate_resumes
+            )
+        else:
+            index = get_candidate_index()
+            if index is None or len(index) == 0:
+                raise HTTPException(status_code=400, detail="No candidates given and none are indexed.")
+            session = await run_analysis(RankingSession.from_index, index, request.jd_text)
+        
+        matches = await run_analysis(session.rerank, scorer=scorer, top_k=request.top_k)
+        session_id = ranking_sessions.add(session)
+        
+        return {
+            "success": True,
+            "data": {"session_id": session_id, **session.describe(), "matches": matches},
+            "scoring_version": scorer.versions[0]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/ranking-sessions/{session_id}/rerank")
+async def rerank_session(session_id: str, request: RerankRequest):
+    """Re-rank a session's candidates under changed requirements or scoring, reusing its similarities"""
+    session = ranking_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Ranking session '{session_id}' does not exist or expired.")
+    
+    try:
+        if request.top_k < 1:
+            raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+        
+        scorer = resolve_scorer(request.scoring)
+        requirements = session.requirement_overrides(
+            skills=request.skills, experience_years=request.experience_years, education=request.education
+        )
+        matches = await run_analysis(session.rerank, requirements, scorer=scorer, top_k=request.top_k)
+        
+        return {
+            "success": True,
+            "data": {"session_id": session_id, "candidates": len(session), "matches": matches},
+            "scoring_version": scorer.versions[0]
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/ranking-sessions/{session_id}")
+async def get_ranking_session(session_id: str):
+    """Size and extracted requirements of a ranking session"""
+    session = ranking_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Ranking session '{session_id}' does not exist or expired.")
+    return {"success": True, "data": {"session_id": session_id, **session.describe()}}
+
+@app.delete("/ranking-sessions/{session_id}")
+async def delete_ranking_session(session_id: str):
+    """Drop a ranking session"""
+    if not ranking_sessions.remove(session_id):
+        raise HTTPException(status_code=404, detail=f"Ranking session '{session_id}' does not exist or expired.")
+    return {"success": True, "data": {"session_id": session_id}}
+
+@app.put("/scoring-configs/{name}")
+async def put_scoring_config(name: str, config: dict):
+    """Create or replace a named match scoring config"""
+    try:
+        normalised = scoring_store.put(name, config)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return {"success": True, "data": {"name": name, "version": MatchScorer([normalised]).versions[0], "config": normalised}}
+
+@app.get("/scoring-configs")
+async def list_scoring_configs():
+    """Names of the stored scoring configs"""
+    return {"success": True, "data": scoring_store.names()}
+
+@app.get("/scoring-configs/{name}")
+async def get_scoring_config(name: str):
+    """One stored scoring config"""
+    try:
+        config = scoring_store.get(name)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=404, detail=f"Scoring config '{name}' does not exist.")
+    
+    return {"success": True, "data": {"name": name, "config": config}}
+
+@app.delete("/scoring-configs/{name}")
+async def delete_scoring_config(name: str):
+    """Delete a stored scoring config; vacancies indexed with it keep their copy"""
+    try:
+        removed = scoring_store.delete(name)
+    except ValueError:
+        removed = False
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Scoring config '{name}' does not exist.")
+    
+    return {"success": True, "data": {"name": name}}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for service monitoring"""
@@ -152,9 +988,18 @@ async def health_check():
         "status": "healthy", 
         "service": "AI Resume Shortlisting",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat() + "Z"
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "uptime_seconds": round(time.time() - started_at, 1),
+        "requests_in_progress": REQUESTS_IN_PROGRESS.value(),
+        "executor_queue_depth": EXECUTOR_QUEUE_DEPTH.value(),
+        "deduplicated_requests": resume_text_flight.deduplicated() + jd_flight.deduplicated()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.options("/health")
 async def health_check_options():
     """Handle OPTIONS request for health check"""
@@ -0,0 +1,75 @@
+"""
+Adaptive micro-batching of single-item requests.
+
+Callers submit one item and await its result. Items are collected until
+either max_batch_size is reached or the oldest item has waited max_wait_ms,
+then the whole batch is handed to `process_batch` (e.g. a spaCy nlp.pipe
+call) in one go and results are fanned back out to the callers. When nothing
+is in flight the wait is skipped, so an idle service adds no latency and
+batches only form under concurrency.
+"""
+
+import asyncio
+import time
+
+from metrics import BATCH_SIZE, BATCH_WAIT
+
+
+class MicroBatcher:
+    def __init__(self, name, process_batch, run, max_batch_size=16, max_wait_ms=5.0, adaptive=True):
+        """process_batch(items) -> results runs via the coroutine function run(fn, items)"""
+        self.name = name
+        self.process_batch = process_batch
+        self.run = run
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.adaptive = adaptive
+        self._pending = []  # (item, future, enqueued_at)
+        self._timer = None
+        self._in_flight = 0
+        self._tasks = set()
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size or self.max_wait == 0 or (self.adaptive and self._in_flight == 0):
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            # Callers that went away before dispatch do not cost any work
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if batch:
+                self._in_flight += 1
+                task = asyncio.ensure_future(self._dispatch(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        now = time.perf_counter()
+        BATCH_SIZE.observe(len(batch), self.name)
+        for _, _, enqueued_at in batch:
+            BATCH_WAIT.observe(now - enqueued_at, self.name)
+
+        try:
+            results = await self.run(self.process_batch, [item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight -= 1
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory-mapped candidate index: build, open, search, compaction.
+
+The index is built in segments of --segment-size candidates (like a stream of
+appends), so the search numbers include the multi-segment case; --compact
+then merges everything into one segment and times the search again.
+
+Usage:
+    python benchmarks/bench_candidate_index.py --candidates 100000
+    python benchmarks/bench_candidate_index.py --candidates 1000000 --dir /var/tmp/cand-1m --reuse
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_index import CandidateIndex
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def directory_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1024 / 1024
+
+
+def build(path, matcher, generator, count, segment_size):
+    start = time.perf_counter()
+    first = generator.candidates(min(segment_size, count), size="small")
+    index = CandidateIndex.create(path, matcher, first)
+    for offset in range(len(first), count, segment_size):
+        batch = [
+            generator.resume(i, size="small") for i in range(offset, min(offset + segment_size, count))
+        ]
+        index.append(batch)
+        print(f"  appended {offset + len(batch):,} candidates", flush=True)
+    return time.perf_counter() - start
+
+
+def time_searches(index, jds, top_k):
+    timings = []
+    for jd in jds:
+        start = time.perf_counter()
+        index.search(jd, top_k=top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--segment-size", type=int, default=100000)
+    parser.add_argument("--dir", help="index directory (default: a temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="open an existing index in --dir instead of building")
+    parser.add_argument("--compact", action="store_true", help="also time compaction and post-compaction search")
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    path = args.dir or os.path.join(tempfile.mkdtemp(prefix="candidate-index-"), "index")
+
+    if not (args.reuse and os.path.exists(os.path.join(path, "MANIFEST.json"))):
+        shutil.rmtree(path, ignore_errors=True)
+        print(f"Building {args.candidates:,} candidates into {path}")
+        build_seconds = build(path, matcher, generator, args.candidates, args.segment_size)
+        print(f"build: {build_seconds:.1f}s ({args.candidates / build_seconds:,.0f} candidates/s), "
+              f"{directory_mb(path):.0f} MB on disk")
+
+    # Load the sklearn machinery first so "open" measures the index alone
+    matcher.vectorizer
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    index = CandidateIndex.open(path, matcher)
+    open_ms = (time.perf_counter() - start) * 1000
+    print(f"open: {open_ms:.1f} ms, {len(index.segments)} segments, {len(index):,} live candidates, "
+          f"RSS +{rss_mb() - rss_before:.1f} MB")
+
+    jds = [generator.jd(i)["text"] for i in range(args.queries)]
+    timings = time_searches(index, jds, args.top_k)
+    print(f"search (first, cold pages): {timings[0]:.1f} ms; "
+          f"warm median: {sorted(timings[1:] or timings)[len(timings[1:] or timings) // 2]:.1f} ms; "
+          f"RSS +{rss_mb() - rss_before:.1f} MB")
+
+    if args.compact:
+        start = time.perf_counter()
+        index.compact()
+        print(f"compact: {time.perf_counter() - start:.1f}s -> {len(index.segments)} segment")
+        timings = time_searches(index, jds, args.top_k)
+        print(f"search after compaction: median {sorted(timings)[len(timings) // 2]:.1f} ms")
+
+    if not args.dir:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
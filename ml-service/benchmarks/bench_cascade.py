@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local-rank / expensive-rerank cascade against scoring every
+applicant with the expensive scorer (what the backend's analyzeResume does),
+using StubScorer with a fixed per-call latency in place of the LLM.
+
+Prints expensive calls made and wall time for: the per-applicant baseline,
+a cold cascade run, and a warm re-run of the same vacancy (served from cache).
+
+Usage:
+    python benchmarks/bench_cascade.py --candidates 500 --top-k 20 --margin 2 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_matcher import CandidateMatcher
+from cascade import Cascade, StubScorer
+from corpus import CorpusGenerator
+
+
+async def baseline(scorer, jd_text, candidates, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def score(candidate):
+        async with semaphore:
+            return await scorer.score(candidate["text"], jd_text)
+
+    return await asyncio.gather(*(score(candidate) for candidate in candidates))
+
+
+async def run(args):
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    candidates = generator.candidates(args.candidates, size="small")
+    jd_text = generator.jd(0)["text"]
+    latency = args.latency_ms / 1000
+
+    scorer = StubScorer(latency_seconds=latency)
+    start = time.perf_counter()
+    await baseline(scorer, jd_text, candidates, args.concurrency)
+    print(f"every applicant:  {scorer.calls:>5} expensive calls, {time.perf_counter() - start:7.2f} s")
+
+    scorer = StubScorer(latency_seconds=latency)
+    cascade = Cascade(scorer, max_concurrency=args.concurrency)
+    for label in ("cascade (cold)", "cascade (warm)"):
+        calls = scorer.calls
+        start = time.perf_counter()
+        matches = matcher.match(jd_text, candidates)
+        local_seconds = time.perf_counter() - start
+        _, stats = await cascade.rerank(jd_text, candidates, matches, top_k=args.top_k, margin=args.margin)
+        print(f"{label + ':':<17} {scorer.calls - calls:>5} expensive calls, {time.perf_counter() - start:7.2f} s "
+              f"(local ranking {local_seconds:.2f} s; forwarded {stats['forwarded']}, "
+              f"cache hits {stats['cache_hits']}, avoided {stats['avoided_calls']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--margin", type=float, default=2.0)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark deadline-aware matching (deadline.py) on generated candidates.
+
+For each --deadlines budget (ms), runs CandidateMatcher.match with a
+Deadline and reports the time taken, how many candidates were scored and
+returned, and the mean score of the returned top-K next to the full
+ranking's. Recall of the exact top-K says little here: generated
+candidates often tie at 100, and ties keep submission order.
+
+Then cancels a match from another thread (as a client disconnect does)
+and reports how long the worker took to stop.
+
+Usage:
+    python benchmarks/bench_deadline.py --candidates 5000 --deadlines 250 500 1000 2000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+from deadline import Deadline, RequestCancelled
+
+
+def mean_score(matches, top_k):
+    top = matches[:top_k]
+    return sum(match["comprehensive_score"] for match in top) / max(len(top), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--size", default="medium")
+    parser.add_argument("--deadlines", type=float, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--cancel-after-ms", type=float, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    candidates = generator.candidates(args.candidates, size=args.size)
+    jd_text = generator.jd(0)["text"]
+    matcher = CandidateMatcher()
+    matcher.match(jd_text, candidates[:100])
+
+    start = time.perf_counter()
+    full = matcher.match(jd_text, candidates)
+    full_seconds = time.perf_counter() - start
+    print(f"{len(candidates)} {args.size} candidates; full match {full_seconds * 1000:.0f} ms, "
+          f"top-{args.top_k} mean score {mean_score(full, args.top_k):.1f}\n")
+
+    print(f"{'deadline':>10} {'time':>9} {'scored':>8} {'returned':>9} {f'top-{args.top_k} mean':>12}")
+    for budget in args.deadlines:
+        deadline = Deadline(budget / 1000)
+        start = time.perf_counter()
+        matches = matcher.match(jd_text, candidates, deadline=deadline)
+        elapsed = (time.perf_counter() - start) * 1000
+        progress = deadline.partial or {"scored": len(candidates), "returned": len(matches)}
+        print(f"{budget:>8.0f}ms {elapsed:>7.0f}ms {progress['scored']:>8} {progress['returned']:>9} "
+              f"{mean_score(matches, args.top_k):>12.1f}")
+
+    deadline = Deadline()
+    timer = threading.Timer(args.cancel_after_ms / 1000, deadline.cancel)
+    timer.start()
+    start = time.perf_counter()
+    try:
+        matcher.match(jd_text, candidates, deadline=deadline)
+        print("\nmatch finished before it was cancelled")
+    except RequestCancelled:
+        stopped = (time.perf_counter() - start) * 1000 - args.cancel_after_ms
+        print(f"\ncancelled after {args.cancel_after_ms:.0f} ms: worker stopped {stopped:.0f} ms later "
+              f"instead of running {full_seconds * 1000 - args.cancel_after_ms:.0f} ms more")
+
+
+if __name__ == "__main__":
+    main()
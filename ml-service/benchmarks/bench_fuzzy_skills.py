@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark typo-tolerant skill extraction (skill_resolver.py) against the exact
+substring checks, on generated resume text.
+
+Throughput is measured per resume for:
+- exact substring matching
+- exact plus SkillResolver, with a cold and a warm per-token cache
+- a naive scan computing the edit distance of every token against every term
+
+Recall is measured on copies of the resumes where skill names of 6 or more
+letters get one random typo (a transposition, deletion or substitution).
+
+Usage:
+    python benchmarks/bench_fuzzy_skills.py --resumes 500
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator
+from resume_analyzer import ResumeAnalyzer
+from skill_resolver import SkillResolver, TOKEN_PATTERN, allowed_distance, edit_distance, looks_like_typo, normalize
+
+
+def exact(terms, text):
+    text_lower = text.lower()
+    return {term for term in terms if term in text_lower}
+
+
+def naive(terms, text):
+    """Edit distance of every token against every term (what the deletion index avoids)"""
+    keys = {normalize(term): term for term in terms}
+    found = set()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = normalize(token)
+        for key, term in keys.items():
+            limit = allowed_distance(len(key))
+            if token == key or (token and looks_like_typo(token, key) and edit_distance(token, key, limit) <= limit):
+                found.add(term)
+    return found
+
+
+def add_typo(word, rng):
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("transpose", "delete", "substitute"))
+    if kind == "transpose":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "delete":
+        return word[:i] + word[i + 1:]
+    return word[:i] + rng.choice("aeiourstln") + word[i + 1:]
+
+
+def with_typos(text, terms, rng):
+    """Text with one typo in every mention of a single-word skill of 6+ letters; returns (text, skills hit)"""
+    typo_terms = [term for term in terms if " " not in term and len(term) >= 6 and term.isalpha()]
+    # Not inside host names ("github.com/...")
+    pattern = re.compile(r"\b(" + "|".join(map(re.escape, typo_terms)) + r")\b(?!\.\w)", re.IGNORECASE)
+    hit = set()
+
+    def replace(match):
+        hit.add(match.group(1).lower())
+        return add_typo(match.group(1), rng)
+
+    return pattern.sub(replace, text), hit
+
+
+def time_per_resume(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--size", default="medium")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    terms = ResumeAnalyzer(fuzzy_skills=False)._skill_keyword_list()
+    texts = CorpusGenerator(args.seed).resume_texts(args.resumes, size=args.size)
+    print(f"{len(texts)} {args.size} resumes, {sum(map(len, texts)) / len(texts):.0f} chars on average, "
+          f"{len(terms)} taxonomy terms\n")
+
+    resolver = SkillResolver(terms)
+    print(f"{'exact substring':<28} {time_per_resume(lambda t: exact(terms, t), texts):8.3f} ms/resume")
+    print(f"{'exact + fuzzy (cold cache)':<28} "
+          f"{time_per_resume(lambda t: (exact(terms, t), resolver.find(t)), texts):8.3f} ms/resume")
+    print(f"{'exact + fuzzy (warm cache)':<28} "
+          f"{time_per_resume(lambda t: (exact(terms, t), resolver.find(t)), texts):8.3f} ms/resume")
+    sample = texts[:max(1, len(texts) // 50)]
+    print(f"{'naive pairwise distance':<28} {time_per_resume(lambda t: naive(terms, t), sample):8.3f} ms/resume "
+          f"({len(sample)} resumes)")
+
+    rng = random.Random(args.seed)
+    typo_hits = exact_found = fuzzy_found = 0
+    for text in texts:
+        typo_text, hit = with_typos(text, terms, rng)
+        typo_hits += len(hit)
+        exact_found += len(hit & exact(terms, typo_text))
+        fuzzy_found += len(hit & (exact(terms, typo_text) | set(resolver.find(typo_text))))
+    print(f"\nskills with a typo: {typo_hits}; found by exact {exact_found} ({exact_found / max(typo_hits, 1):.0%}), "
+          f"by exact + fuzzy {fuzzy_found} ({fuzzy_found / max(typo_hits, 1):.0%})")
+
+
+if __name__ == "__main__":
+    main()
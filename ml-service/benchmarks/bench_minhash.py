@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark MinHash near-duplicate detection at scale.
+
+Real signatures are computed for --resumes synthetic resumes and for an
+edited copy of every --dup-every'th one (a changed line plus an appended
+sentence, like a re-submitted version). The index is then padded with random
+signatures (unrelated resumes) up to --signatures. Reports signature cost,
+bulk build, LSH query latency against a brute-force scan, recall on the
+planted duplicates and false positives on unrelated resumes.
+
+Usage:
+    python benchmarks/bench_minhash.py --signatures 1000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import minhash
+from corpus import CorpusGenerator
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def edited(text, i):
+    lines = text.split("\n")
+    lines[len(lines) // 2] = f"Updated responsibilities for role {i}"
+    return "\n".join(lines) + "\nReferences available on request."
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signatures", type=int, default=1000000)
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--dup-every", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    texts = generator.resume_texts(args.resumes, size="medium")
+    start = time.perf_counter()
+    signatures = np.array([minhash.signature(text) for text in texts])
+    print(f"signature: {(time.perf_counter() - start) / len(texts) * 1000:.2f} ms per medium resume")
+
+    planted = list(range(0, args.resumes, args.dup_every))
+    duplicates = np.array([minhash.signature(edited(texts[i], i)) for i in planted])
+
+    rng = np.random.RandomState(args.seed)
+    padding = rng.randint(0, minhash.MERSENNE_PRIME, size=(args.signatures - args.resumes, minhash.NUM_PERM))
+    all_signatures = np.concatenate([signatures, padding.astype(np.uint32)])
+    ids = [f"r{i}" for i in range(len(all_signatures))]
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    index = minhash.NearDuplicateIndex()
+    index.add_many(ids, all_signatures)
+    print(f"bulk build: {time.perf_counter() - start:.2f}s for {len(index):,} signatures, "
+          f"RSS +{rss_mb() - rss_before:.0f} MB")
+
+    # Recall on planted near-duplicates
+    query_rows = planted[:args.queries]
+    timings, found = [], 0
+    for row, duplicate in zip(query_rows, duplicates):
+        start = time.perf_counter()
+        matches = index.query(duplicate)
+        timings.append((time.perf_counter() - start) * 1000)
+        found += any(match_id == f"r{row}" for match_id, _ in matches)
+    true_similarity = np.mean([minhash.similarity(signatures[r], d) for r, d in zip(query_rows, duplicates)])
+    print(f"LSH query: p50 {percentile(timings, 0.5):.3f} ms, p99 {percentile(timings, 0.99):.3f} ms; "
+          f"recall {found}/{len(query_rows)} (mean estimated similarity {true_similarity:.2f})")
+
+    # False positives: resumes that are not in the index
+    fresh = [generator.resume(args.resumes + i, size="medium")["text"] for i in range(args.queries)]
+    false_positives = sum(bool(index.query(minhash.signature(text))) for text in fresh)
+    print(f"false positives on unrelated resumes: {false_positives}/{len(fresh)}")
+
+    start = time.perf_counter()
+    for duplicate in duplicates[:50]:
+        scores = (all_signatures == duplicate).mean(axis=1)
+        np.flatnonzero(scores >= index.threshold)
+    print(f"brute-force scan: {(time.perf_counter() - start) / 50 * 1000:.1f} ms per query")
+
+    new = rng.randint(0, minhash.MERSENNE_PRIME, size=(10000, minhash.NUM_PERM)).astype(np.uint32)
+    start = time.perf_counter()
+    for i, sig in enumerate(new):
+        index.add_and_query(f"new{i}", sig)
+    print(f"ingest (query + insert): {(time.perf_counter() - start) / len(new) * 1000:.3f} ms per resume "
+          f"at {len(index):,} signatures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vacancy ranking cache (ranking_cache.py) against re-running
+CandidateMatcher.match on every open of a vacancy's applicant list.
+
+Times one vacancy with --applicants applicants for a full match, a cache
+miss (the first open), a hit (a reopen), one added applicant and an edited
+JD. Then replays --opens opens spread over --vacancies vacancies, where
+each open adds an applicant with probability --add-rate, and reports the
+cache outcomes, hit ratio and total time against matching every time.
+
+Usage:
+    python benchmarks/bench_ranking_cache.py --applicants 2000 --vacancies 20 --opens 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+from ranking_cache import RankingCache
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicants", type=int, default=2000)
+    parser.add_argument("--size", default="medium")
+    parser.add_argument("--vacancies", type=int, default=20)
+    parser.add_argument("--opens", type=int, default=200)
+    parser.add_argument("--add-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    pool = generator.candidates(args.applicants, size=args.size)
+    jd_text = generator.jd(0)["text"]
+    matcher.match(jd_text, pool[:100])
+
+    cache = RankingCache(matcher)
+    print(f"One vacancy, {len(pool)} {args.size} applicants:")
+    _, ms = timed(matcher.match, jd_text, pool)
+    print(f"  {'full match':<24} {ms:8.0f} ms")
+    # Generated IDs restart at candidate_0, so new applicants get their own
+    added = pool + [dict(generator.candidates(1, size=args.size)[0], id="added_applicant")]
+    for label, vacancy_jd, applicants in (
+        ("first open (miss)", jd_text, pool),
+        ("reopen (hit)", jd_text, pool),
+        ("one applicant added", jd_text, added),
+        ("JD edited (miss)", jd_text + "\nKubernetes experience required.", added),
+    ):
+        (_, info), ms = timed(cache.rank, "vacancy_0", vacancy_jd, applicants)
+        print(f"  {label:<24} {ms:8.0f} ms  ({info['cache']}, {info['scored']} scored)")
+
+    rng = random.Random(args.seed)
+    sizes = [max(10, args.applicants // 10)] * args.vacancies
+    pools = {f"vacancy_{i}": generator.candidates(size, size=args.size) for i, size in enumerate(sizes)}
+    jds = {vacancy_id: generator.jd(i)["text"] for i, vacancy_id in enumerate(pools)}
+    next_id = 0
+    cache = RankingCache(matcher)
+    outcomes = {}
+    cached_ms = match_ms = 0.0
+    for _ in range(args.opens):
+        vacancy_id = rng.choice(list(pools))
+        if rng.random() < args.add_rate:
+            applicant = dict(generator.candidates(1, size=args.size)[0], id=f"applicant_{next_id}")
+            next_id += 1
+            pools[vacancy_id].append(applicant)
+        (_, info), ms = timed(cache.rank, vacancy_id, jds[vacancy_id], pools[vacancy_id])
+        cached_ms += ms
+        outcomes[info["cache"]] = outcomes.get(info["cache"], 0) + 1
+        _, ms = timed(matcher.match, jds[vacancy_id], pools[vacancy_id])
+        match_ms += ms
+
+    reused = outcomes.get("hit", 0) + outcomes.get("update", 0)
+    print(f"\n{args.opens} opens over {args.vacancies} vacancies of {sizes[0]} applicants "
+          f"(add rate {args.add_rate:.0%}):")
+    print(f"  outcomes {dict(sorted(outcomes.items()))}, hit ratio {reused / args.opens:.0%}")
+    print(f"  total {cached_ms / 1000:.1f} s with the cache vs {match_ms / 1000:.1f} s matching every open")
+
+
+if __name__ == "__main__":
+    main()
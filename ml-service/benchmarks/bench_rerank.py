@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark what-if re-ranking: a full CandidateMatcher.match per requirement
+tweak against one RankingSession and repeated rerank() calls.
+
+Usage:
+    python benchmarks/bench_rerank.py --candidates 50000 --tweaks 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_matcher import CandidateMatcher, TECHNICAL_SKILLS
+from corpus import CorpusGenerator
+from ranking_session import RankingSession
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=50000)
+    parser.add_argument("--tweaks", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    candidates = generator.candidates(args.candidates, size="small")
+    jd_text = generator.jd(0)["text"]
+    matcher.vectorizer
+
+    start = time.perf_counter()
+    matcher.match(jd_text, candidates)
+    match_ms = (time.perf_counter() - start) * 1000
+    print(f"CandidateMatcher.match: {match_ms:.0f} ms for {args.candidates:,} candidates (paid per tweak before)")
+
+    start = time.perf_counter()
+    session = RankingSession.from_candidates(matcher, jd_text, candidates)
+    print(f"session create: {(time.perf_counter() - start) * 1000:.0f} ms (once per vacancy)")
+
+    rng = random.Random(args.seed)
+    timings = []
+    for _ in range(args.tweaks):
+        requirements = session.requirement_overrides(
+            skills=rng.sample(TECHNICAL_SKILLS, rng.randint(1, 6)),
+            experience_years=rng.choice([0, 2, 3, 5, 8]),
+            education=rng.choice(["none", "bachelor", "master"]),
+        )
+        start = time.perf_counter()
+        session.rerank(requirements, top_k=args.top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"rerank: median {timings[len(timings) // 2]:.1f} ms, max {timings[-1]:.1f} ms "
+          f"over {args.tweaks} requirement tweaks (top {args.top_k})")
+
+
+if __name__ == "__main__":
+    main()
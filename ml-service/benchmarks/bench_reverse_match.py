@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark reverse matching: M resumes scored against V indexed vacancies.
+
+Usage:
+    python benchmarks/bench_reverse_match.py --resumes 1 100 1000 --vacancies 2000
+    python benchmarks/bench_reverse_match.py --resumes 1 --vacancies 200 --compare-naive
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+from vacancy_index import VacancyIndex
+
+
+def time_call(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--vacancies", type=int, nargs="+", default=[100, 2000])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare-naive", action="store_true",
+                        help="also time one CandidateMatcher.match call per vacancy")
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    resumes = generator.candidates(max(args.resumes), size="small")
+
+    print(f"{'resumes':>8} {'vacancies':>10} {'build (ms)':>11} {'match (ms)':>11} {'pairs/s':>12} {'naive (ms)':>11}")
+    for vacancy_count in args.vacancies:
+        vacancies = [generator.jd(i) for i in range(vacancy_count)]
+        index = VacancyIndex(matcher)
+        index.upsert(vacancies)
+
+        start = time.perf_counter()
+        index._ensure_built()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for resume_count in args.resumes:
+            batch = resumes[:resume_count]
+            seconds = time_call(lambda: index.match(batch, top_k=args.top_k), args.repeat)
+
+            naive = ""
+            if args.compare_naive:
+                naive_seconds = time_call(
+                    lambda: [matcher.match(v["text"], batch) for v in vacancies], 1
+                )
+                naive = f"{naive_seconds * 1000:.1f}"
+
+            pairs_per_second = resume_count * vacancy_count / seconds
+            print(f"{resume_count:>8} {vacancy_count:>10} {build_ms:>11.1f} {seconds * 1000:>11.1f} "
+                  f"{pairs_per_second:>12,.0f} {naive:>11}")
+
+
+if __name__ == "__main__":
+    main()
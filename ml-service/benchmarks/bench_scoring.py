@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark compiled scoring configs: several weightings over one candidate pool.
+
+Feature columns and TF-IDF similarities are computed once; then --configs
+weightings are scored either in one MatchScorer pass (one column per config)
+or one config at a time.
+
+Usage:
+    python benchmarks/bench_scoring.py --candidates 100000 --configs 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+from scoring import MatchScorer
+
+
+def random_configs(count, seed):
+    """The default weights plus `count - 1` random variations"""
+    rng = random.Random(seed)
+    configs = [{}]
+    while len(configs) < count:
+        configs.append({
+            "similarity": rng.choice([60, 80, 100]),
+            "skills": rng.choice([10, 20, 30, 40]),
+            "experience": [[1.0, rng.choice([10, 15, 20])], [0.7, rng.choice([0, 5, 10])]],
+            "education": rng.choice([0, 5, 10]),
+            "contact": rng.choice([0, 5]),
+        })
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--configs", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from sklearn.base import clone
+
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    candidates = generator.candidates(args.candidates, size="small")
+    jd_text = generator.jd(0)["text"]
+
+    start = time.perf_counter()
+    vectorizer = clone(matcher.vectorizer)
+    matrix = vectorizer.fit_transform([jd_text] + [candidate["text"] for candidate in candidates])
+    similarities = (matrix[1:] @ matrix[0].T).toarray().ravel()
+    candidate_columns = matcher._candidate_columns(candidates)
+    requirements = [matcher._jd_requirements(jd_text)]
+    print(f"features + similarities: {time.perf_counter() - start:.2f}s for {args.candidates:,} candidates")
+
+    configs = random_configs(args.configs, args.seed)
+    compiled = MatchScorer(configs)
+    separate = [MatchScorer([config]) for config in configs]
+    requirement_columns = matcher._requirement_columns(requirements * len(configs))
+    single_requirement = matcher._requirement_columns(requirements)
+
+    def one_pass():
+        bonus = compiled.bonus(candidate_columns, requirement_columns)
+        return compiled.combine(similarities[:, None], bonus)
+
+    def per_config():
+        return np.column_stack([
+            scorer.combine(similarities[:, None], scorer.bonus(candidate_columns, single_requirement))[:, 0]
+            for scorer in separate
+        ])
+
+    assert np.allclose(one_pass(), per_config())
+    for name, run in (("one pass", one_pass), ("per config", per_config)):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:>10}: {args.configs} configs x {args.candidates:,} candidates in "
+              f"{min(timings):.1f} ms (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark sharded scatter-gather search on a local cluster (serve_shards.py).
+
+Starts --shards shard nodes plus a coordinator, indexes --candidates through
+the coordinator and times merged searches. Compares the merged top-K with
+a single in-process CandidateIndex over the same candidates. Then pauses one
+shard (SIGSTOP) to show a timed-out shard giving a partial, flagged result.
+
+Usage:
+    python benchmarks/bench_shards.py --shards 3 --candidates 30000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_index import CandidateIndex
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+from serve_shards import start_cluster, stop_cluster
+
+
+def post(port, path, payload, timeout=600):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}", data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=30000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--base-port", type=int, default=8100)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    candidates = generator.candidates(args.candidates, size="small")
+    jds = [generator.jd(i)["text"] for i in range(args.queries)]
+    directory = tempfile.mkdtemp(prefix="shards-")
+
+    print(f"Starting {args.shards} shards and a coordinator in {directory}")
+    coordinator, shards = start_cluster(args.shards, args.base_port, directory, shard_timeout_seconds=30)
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(candidates), args.batch_size):
+            result = post(args.base_port, "/shards/candidates/index",
+                          {"candidates": candidates[offset:offset + args.batch_size]})["data"]
+            assert not result["partial"], result["shards"]
+        print(f"  indexed {len(candidates):,} candidates in {time.perf_counter() - start:.1f} s: "
+              f"{[shard['sent'] for shard in result['shards']]} in the last batch")
+
+        print("Building a single in-process index for comparison")
+        single = CandidateIndex.create(os.path.join(directory, "single"), CandidateMatcher(), candidates)
+
+        timings, overlaps = [], []
+        for jd_text in jds:
+            start = time.perf_counter()
+            merged = post(args.base_port, "/shards/candidates/search", {"jd_text": jd_text, "top_k": args.top_k})
+            timings.append((time.perf_counter() - start) * 1000)
+            assert not merged["partial"]
+            expected = {hit["candidate_id"] for hit in single.search(jd_text, top_k=args.top_k)}
+            overlaps.append(len(expected & {hit["candidate_id"] for hit in merged["data"]}) / len(expected))
+        timings.sort()
+        print(f"merged search: median {timings[len(timings) // 2]:.0f} ms; "
+              f"top-{args.top_k} overlap with a single index {min(overlaps):.0%}-{max(overlaps):.0%} "
+              f"(per-shard vocabularies differ slightly)")
+
+        shards[0].send_signal(signal.SIGSTOP)
+        start = time.perf_counter()
+        partial = post(args.base_port, "/shards/candidates/search",
+                       {"jd_text": jds[0], "top_k": args.top_k, "timeout_seconds": 1.0})
+        print(f"with shard 0 paused: partial={partial['partial']}, {len(partial['data'])} hits in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms, statuses "
+              f"{[shard['status'] for shard in partial['shards']]}")
+        shards[0].send_signal(signal.SIGCONT)
+    finally:
+        stop_cluster([coordinator] + shards)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark hard-filtered candidate search: posting-list / range pruning before
+scoring against an unfiltered search, across filters of varying selectivity.
+
+For each filter it prints the share of candidates that pass it, the time spent
+selecting them (posting-list intersection plus range checks) and the total
+search time. Filtered search only scores the selected rows, so its cost should
+fall roughly in line with selectivity, down to the fixed JD vectorization cost.
+
+Usage:
+    python benchmarks/bench_skill_filter.py --candidates 200000
+    python benchmarks/bench_skill_filter.py --dir /var/tmp/cand-1m --reuse
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_candidate_index import build
+from candidate_index import CandidateIndex
+from candidate_matcher import CandidateMatcher
+from corpus import CorpusGenerator
+from skill_filter import CandidateFilter
+
+FILTERS = [
+    ("none", {}),
+    ("experience >= 0", {"experience": {"min": 0}}),
+    ("must_not java", {"must_not": ["java"]}),
+    ("education >= master", {"education": {"min": "master"}}),
+    ("must python", {"must": ["python"]}),
+    ("must python, docker", {"must": ["python", "docker"]}),
+    ("must python, docker, aws", {"must": ["python", "docker", "aws"]}),
+    ("must python, docker; 5-10 years", {"must": ["python", "docker"], "experience": {"min": 5, "max": 10}}),
+    ("must python, docker, aws, kubernetes; >= 8 years",
+     {"must": ["python", "docker", "aws", "kubernetes"], "experience": {"min": 8}}),
+]
+
+
+def median_ms(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=200000)
+    parser.add_argument("--segment-size", type=int, default=100000)
+    parser.add_argument("--dir", help="index directory (default: a temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="open an existing index in --dir instead of building")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    matcher = CandidateMatcher()
+    path = args.dir or os.path.join(tempfile.mkdtemp(prefix="skill-filter-"), "index")
+
+    if not (args.reuse and os.path.exists(os.path.join(path, "MANIFEST.json"))):
+        print(f"Building index of {args.candidates:,} candidates in {path}")
+        seconds = build(path, matcher, generator, args.candidates, args.segment_size)
+        print(f"  built in {seconds:.1f} s")
+    index = CandidateIndex.open(path, matcher)
+    total = len(index)
+    jd_text = generator.jd(0)["text"]
+    index.search(jd_text, top_k=args.top_k)
+
+    print(f"\n{total:,} candidates, top_k={args.top_k}, median of {args.repeats} runs\n")
+    print(f"{'filter':<50} {'selected':>9} {'share':>7} {'select ms':>10} {'search ms':>10}")
+    baseline = None
+    for label, spec in FILTERS:
+        filters = CandidateFilter(spec)
+        if filters:
+            selected = sum(len(index.filter_rows(segment, filters)) for segment in index.segments)
+            select_ms = median_ms(lambda: [index.filter_rows(s, filters) for s in index.segments], args.repeats)
+        else:
+            selected, select_ms = total, 0.0
+        search_ms = median_ms(lambda: index.search(jd_text, top_k=args.top_k, filters=filters), args.repeats)
+        baseline = baseline or search_ms
+        print(f"{label:<50} {selected:>9,} {selected / total:>6.1%} {select_ms:>10.1f} {search_ms:>10.1f}"
+              f"  ({search_ms / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
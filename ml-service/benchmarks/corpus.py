@@ -0,0 +1,194 @@
+"""
+Deterministic synthetic resume / job description corpus.
+
+Everything is driven by a seeded random.Random, so the same seed always
+produces byte-identical texts and files (no timestamps in PDFs or DOCX
+metadata), which keeps benchmark inputs stable across runs and machines.
+"""
+
+import io
+import random
+from datetime import datetime
+
+SKILLS = [
+    "python", "java", "javascript", "react", "angular", "vue", "node.js",
+    "express", "django", "flask", "mysql", "postgresql", "mongodb", "redis",
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "git",
+    "jenkins", "tensorflow", "pytorch", "pandas", "numpy", "sql", "html", "css"
+]
+
+FILLER_WORDS = [
+    "team", "product", "platform", "design", "build", "scalable", "services",
+    "customers", "data", "pipeline", "testing", "delivery", "ownership",
+    "architecture", "performance", "reliability", "api", "backend", "frontend",
+    "mentoring", "agile", "cloud", "security", "monitoring", "analytics",
+    "improved", "delivered", "migrated", "reduced", "latency", "costs", "users"
+]
+
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Dara", "Elif", "Farid", "Grace", "Hiro", "Ines", "Jon"]
+LAST_NAMES = ["Patel", "Smith", "Wang", "Okafor", "Yilmaz", "Haddad", "Kim", "Sato", "Silva", "Berg"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+EDUCATION = ["High School Diploma", "Bachelor of Science in Computer Science",
+             "Master of Engineering", "PhD in Machine Learning"]
+
+# Approximate word counts for the named resume sizes
+RESUME_SIZES = {"small": 150, "medium": 600, "large": 2500}
+
+
+class CorpusGenerator:
+    def __init__(self, seed=42):
+        self.seed = seed
+
+    def _rng(self, kind, index):
+        # Independent stream per item so generating item i never depends on items before it
+        return random.Random(f"{self.seed}:{kind}:{index}")
+
+    def _sentence(self, rng, skills, skill_density, length=14):
+        words = []
+        for _ in range(length):
+            if skills and rng.random() < skill_density:
+                words.append(rng.choice(skills))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+        return " ".join(words).capitalize() + "."
+
+    def resume(self, index, size="medium", skill_density=0.1):
+        """Return a candidate dict (text plus structured fields) for resume `index`"""
+        rng = self._rng("resume", index)
+        target_words = RESUME_SIZES.get(size, size) if isinstance(size, str) else size
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        skills = rng.sample(SKILLS, rng.randint(3, 12))
+        years = rng.randint(0, 15)
+        education = rng.choice(EDUCATION)
+        email = f"{name.lower().replace(' ', '.')}{index}@example.com"
+
+        lines = [
+            name,
+            f"Email: {email} | Phone: +1 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            f"linkedin.com/in/{name.lower().replace(' ', '')}{index} | github.com/{name.split()[0].lower()}{index}",
+            "",
+            "SUMMARY",
+            f"Software engineer with {years} years of experience in {', '.join(skills[:3])}.",
+            "",
+            "SKILLS",
+            ", ".join(skills),
+            "",
+            "EXPERIENCE",
+        ]
+        words = sum(len(line.split()) for line in lines)
+        while words < target_words:
+            lines.append(f"{rng.choice(COMPANIES)} - Engineer ({rng.randint(2010, 2024)})")
+            for _ in range(rng.randint(2, 5)):
+                sentence = self._sentence(rng, skills, skill_density)
+                lines.append(f"- {sentence}")
+                words += len(sentence.split())
+            words += 4
+        lines += ["", "EDUCATION", f"{education}, State University", "", "PROJECTS",
+                  self._sentence(rng, skills, skill_density)]
+
+        return {
+            "id": f"candidate_{index}",
+            "name": name,
+            "text": "\n".join(lines),
+            "skills": skills,
+            "experience_years": years,
+            "education_level": education,
+            "email": email,
+        }
+
+    def resume_texts(self, count, size="medium", skill_density=0.1):
+        return [self.resume(i, size, skill_density)["text"] for i in range(count)]
+
+    def candidates(self, count, size="small", skill_density=0.1):
+        return [self.resume(i, size, skill_density) for i in range(count)]
+
+    def jd(self, index, skill_count=5, words=250):
+        """Return a job description dict for vacancy `index`"""
+        rng = self._rng("jd", index)
+        skills = rng.sample(SKILLS, min(skill_count, len(SKILLS)))
+        years = rng.randint(0, 8)
+        body = [self._sentence(rng, skills, 0.05) for _ in range(max(1, words // 14))]
+        text = "\n".join([
+            f"Senior Engineer #{index}",
+            "We are looking for an engineer to join our platform team.",
+            f"Requirements: {', '.join(skills)}.",
+            f"Minimum {years} years experience.",
+            rng.choice(["Bachelor degree in Computer Science required.", "Master degree preferred.", ""]),
+            "Responsibilities: " + " ".join(body),
+            "You will be responsible for building reliable services.",
+        ])
+        return {"id": f"vacancy_{index}", "title": f"Senior Engineer #{index}", "text": text}
+
+    def jd_texts(self, count, skill_count=5, words=250):
+        return [self.jd(i, skill_count, words)["text"] for i in range(count)]
+
+    def resume_file(self, index, fmt="txt", size="medium", skill_density=0.1):
+        """Return (filename, bytes) for resume `index` rendered as txt, pdf or docx"""
+        text = self.resume(index, size, skill_density)["text"]
+        if fmt == "txt":
+            return f"resume_{index}.txt", text.encode("utf-8")
+        if fmt == "pdf":
+            return f"resume_{index}.pdf", render_pdf(text)
+        if fmt == "docx":
+            return f"resume_{index}.docx", render_docx(text)
+        raise ValueError(f"Unsupported format '{fmt}'")
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(text, lines_per_page=55):
+    """Render plain text as a minimal Helvetica PDF that PyPDF2 can read back"""
+    lines = [line.encode("latin-1", errors="replace").decode("latin-1") for line in text.split("\n")]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []
+    font_id = 3
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id, page_lines in zip(page_ids, pages):
+        stream = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        stream_bytes = stream.encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {page_id + 1} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream_bytes)} >>\nstream\n".encode() + stream_bytes + b"\nendstream"
+        )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref_offset = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def render_docx(text):
+    """Render plain text as a DOCX document (requires python-docx)"""
+    import docx
+
+    document = docx.Document()
+    # Fixed metadata so the output is byte-stable for a given text
+    document.core_properties.author = "benchmark"
+    document.core_properties.created = datetime(2000, 1, 1)
+    document.core_properties.modified = datetime(2000, 1, 1)
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Load generator for the ml-service HTTP API.
+
+Replays a weighted mix of resume uploads, resume text analysis, JD analysis
+and candidate matching against a running service (or one it spawns with
+uvicorn) and reports throughput, p50/p95/p99 latency, error rates and server
+RSS over time.
+
+Open-loop mode (--rate) issues requests on a Poisson schedule regardless of
+how fast the server answers, and measures latency from the scheduled send
+time, so queueing collapse shows up as exploding tail latency instead of
+being hidden by a slowing client. Closed-loop mode (--concurrency) keeps a
+fixed number of requests in flight.
+
+Usage:
+    python benchmarks/loadtest.py --spawn --workers 1 --rate 5 10 20 40 --duration 30
+    python benchmarks/loadtest.py --url http://localhost:8000 --concurrency 16 --duration 60 \\
+        --mix upload=1,text=3,jd=2,match=1 --output load.json
+
+    # Throughput/latency trade-off of the NLP micro-batcher
+    python benchmarks/loadtest.py --spawn --mix text=1,jd=1 --concurrency 1 16 64 --duration 20 \\
+        --sweep NLP_BATCH_MAX_WAIT_MS=0,2,5,10 NLP_BATCH_MAX_SIZE=8,32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator
+
+ML_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = "upload=1,text=3,jd=2,match=1"
+
+
+def parse_mix(value):
+    """Parse 'upload=1,text=3' into relative weights per request kind"""
+    weights = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in REQUEST_BUILDERS:
+            raise argparse.ArgumentTypeError(f"Unknown request kind '{kind}'. Choose from {sorted(REQUEST_BUILDERS)}")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+class Payloads:
+    """Pre-generated request bodies so the client spends no time building inputs"""
+
+    def __init__(self, seed, count, candidates_per_match):
+        generator = CorpusGenerator(seed)
+        formats = ["pdf", "docx", "txt"]
+        self.uploads = [generator.resume_file(i, formats[i % len(formats)], "medium") for i in range(count)]
+        self.texts = generator.resume_texts(count, size="medium")
+        self.jds = generator.jd_texts(count)
+        pool = generator.candidates(candidates_per_match * 4, size="small")
+        self.matches = [
+            {"jd_text": self.jds[i], "candidate_resumes": pool[(i * candidates_per_match) % len(pool):][:candidates_per_match]}
+            for i in range(count)
+        ]
+
+
+def _upload(client, payloads, rng):
+    name, content = rng.choice(payloads.uploads)
+    return client.post("/analyze-resume", files={"file": (name, content)})
+
+
+def _text(client, payloads, rng):
+    return client.post("/analyze-resume-text", json={"text": rng.choice(payloads.texts)})
+
+
+def _jd(client, payloads, rng):
+    return client.post("/analyze-jd", json={"text": rng.choice(payloads.jds)})
+
+
+def _match(client, payloads, rng):
+    return client.post("/match-candidates", json=rng.choice(payloads.matches))
+
+
+REQUEST_BUILDERS = {"upload": _upload, "text": _text, "jd": _jd, "match": _match}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = []  # (kind, latency_seconds, ok, status)
+
+    def add(self, kind, latency, ok, status):
+        self.samples.append((kind, latency, ok, status))
+
+
+async def _send(client, kind, payloads, rng, recorder, scheduled):
+    status = None
+    try:
+        response = await REQUEST_BUILDERS[kind](client, payloads, rng)
+        status = response.status_code
+        ok = 200 <= status < 300
+    except httpx.HTTPError as e:
+        ok = False
+        status = type(e).__name__
+    recorder.add(kind, time.perf_counter() - scheduled, ok, status)
+
+
+async def run_open_loop(client, rate, duration, mix, payloads, rng):
+    """Poisson arrivals at `rate` req/s for `duration` seconds"""
+    recorder = Recorder()
+    kinds, weights = list(mix), list(mix.values())
+    tasks = set()
+    start = time.perf_counter()
+    next_send = start
+    while next_send - start < duration:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = rng.choices(kinds, weights)[0]
+        task = asyncio.create_task(_send(client, kind, payloads, rng, recorder, next_send))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_send += rng.expovariate(rate)
+    send_window = time.perf_counter() - start
+    if tasks:
+        await asyncio.wait(tasks)
+    return recorder, send_window, time.perf_counter() - start
+
+
+async def run_closed_loop(client, concurrency, duration, mix, payloads, rng):
+    """`concurrency` workers each sending back-to-back requests for `duration` seconds"""
+    recorder = Recorder()
+    kinds, weights = list(mix), list(mix.values())
+    start = time.perf_counter()
+
+    async def worker():
+        while time.perf_counter() - start < duration:
+            kind = rng.choices(kinds, weights)[0]
+            await _send(client, kind, payloads, rng, recorder, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return recorder, elapsed, elapsed
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def summarise(samples, elapsed):
+    latencies = sorted(latency for _, latency, _, _ in samples)
+    errors = sum(1 for _, _, ok, _ in samples if not ok)
+    statuses = {}
+    for _, _, _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else None,
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "p50_ms": _ms(percentile(latencies, 0.50)),
+        "p95_ms": _ms(percentile(latencies, 0.95)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+        "mean_ms": _ms(statistics.fmean(latencies)) if latencies else None,
+        "max_ms": _ms(latencies[-1]) if latencies else None,
+        "statuses": statuses,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def read_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return None
+    return None
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except (FileNotFoundError, PermissionError):
+        return []
+
+
+async def sample_rss(root_pid, interval, timeline, stop):
+    """Record RSS of the server process and its direct children (uvicorn workers)"""
+    start = time.perf_counter()
+    while not stop.is_set():
+        pids = [root_pid] + child_pids(root_pid)
+        per_process = {str(pid): read_rss_kb(pid) for pid in pids}
+        timeline.append({
+            "t": round(time.perf_counter() - start, 2),
+            "rss_mb": {pid: round(kb / 1024, 1) for pid, kb in per_process.items() if kb is not None},
+        })
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def spawn_server(port, workers, env_overrides):
+    env = dict(os.environ, **env_overrides)
+    command = [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1",
+               "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=ML_SERVICE_DIR, env=env, start_new_session=True)
+
+
+async def wait_until_healthy(client, timeout, server=None):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Spawned service exited with code {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Service did not become healthy within {timeout}s")
+
+
+def parse_sweep(values):
+    """Expand ['A=1,2', 'B=x'] into the cartesian product of server environments"""
+    variants = [{}]
+    for value in values:
+        key, _, options = value.partition("=")
+        variants = [dict(variant, **{key: option}) for variant in variants for option in options.split(",")]
+    return variants
+
+
+async def scrape_batch_sizes(client):
+    """Mean items per micro-batch by batcher, from the service's /metrics"""
+    sums, counts = {}, {}
+    try:
+        text = (await client.get("/metrics")).text
+    except httpx.HTTPError:
+        return {}
+    for line in text.splitlines():
+        for suffix, target in (("ml_batch_size_sum", sums), ("ml_batch_size_count", counts)):
+            if line.startswith(suffix + "{"):
+                labels, _, value = line.rpartition(" ")
+                target[labels[len(suffix):]] = float(value)
+    return {labels: round(sums[labels] / counts[labels], 2) for labels in sums if counts.get(labels)}
+
+
+async def run_phases(client, args, payloads, rng, rss_pid, server_env):
+    phases = []
+    levels = [("rate", rate) for rate in args.rate] or [("concurrency", c) for c in args.concurrency]
+    for mode, level in levels:
+        timeline, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(sample_rss(rss_pid, args.rss_interval, timeline, stop)) if rss_pid else None
+        batches_before = await scrape_batch_sizes(client)
+
+        print(f"🚀 {mode}={level} for {args.duration}s {server_env or ''}", file=sys.stderr)
+        if mode == "rate":
+            recorder, send_window, elapsed = await run_open_loop(client, level, args.duration, args.mix, payloads, rng)
+        else:
+            recorder, send_window, elapsed = await run_closed_loop(client, level, args.duration, args.mix, payloads, rng)
+
+        stop.set()
+        if sampler:
+            await sampler
+
+        phase = {
+            "mode": mode,
+            "level": level,
+            "server_env": server_env,
+            "elapsed_seconds": round(elapsed, 2),
+            # Drain time beyond the send window: a large value means the server fell behind
+            "drain_seconds": round(elapsed - send_window, 2),
+            "overall": summarise(recorder.samples, elapsed),
+            "by_kind": {
+                kind: summarise([s for s in recorder.samples if s[0] == kind], elapsed)
+                for kind in args.mix
+            },
+            # Lifetime mean, so with several phases per server it includes the earlier ones
+            "mean_batch_size": await scrape_batch_sizes(client) or batches_before,
+            "rss_timeline": timeline,
+        }
+        phases.append(phase)
+        print_phase(phase)
+    return phases
+
+
+async def main_async(args):
+    rng = random.Random(args.seed)
+    print("📦 Generating payloads...", file=sys.stderr)
+    payloads = Payloads(args.seed, args.payloads, args.candidates_per_match)
+
+    base_env = dict(kv.split("=", 1) for kv in args.server_env)
+    variants = parse_sweep(args.sweep) if args.sweep else [{}]
+    if len(variants) > 1 and not args.spawn:
+        raise SystemExit("--sweep needs --spawn so the service can be restarted per variant")
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    report = {"config": vars(args), "phases": []}
+    for variant in variants:
+        server = None
+        url = args.url
+        if args.spawn:
+            url = f"http://127.0.0.1:{args.port}"
+            server = spawn_server(args.port, args.workers, dict(base_env, **variant))
+
+        try:
+            async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+                await wait_until_healthy(client, args.startup_timeout, server)
+                rss_pid = server.pid if server else args.pid
+                report["phases"].extend(await run_phases(client, args, payloads, rng, rss_pid, variant))
+        finally:
+            if server and server.poll() is None:
+                os.killpg(server.pid, signal.SIGTERM)
+                server.wait(timeout=30)
+
+    if len(variants) > 1:
+        print_tradeoff(report["phases"])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def print_tradeoff(phases):
+    """One line per (server variant, load level): throughput against tail latency"""
+    print("\nThroughput / latency trade-off")
+    print(f"  {'server env':<44} {'level':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'batch':>6}")
+    for phase in phases:
+        overall = phase["overall"]
+        env = " ".join(f"{key}={value}" for key, value in phase["server_env"].items()) or "(default)"
+        batch = next(iter(phase["mean_batch_size"].values()), None)
+        print(f"  {env:<44} {phase['level']:>7} {overall['throughput_rps'] or 0:>8} {overall['p50_ms'] or 0:>9} "
+              f"{overall['p95_ms'] or 0:>9} {overall['p99_ms'] or 0:>9} {batch if batch is not None else '-':>6}")
+
+
+def print_phase(phase):
+    overall = phase["overall"]
+    print(f"\n{phase['mode']}={phase['level']}: {overall['requests']} requests, "
+          f"{overall['throughput_rps']} req/s, errors {overall['error_rate']:.1%}, "
+          f"drain {phase['drain_seconds']}s")
+    print(f"  {'kind':<8} {'reqs':>6} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for kind, stats in [("all", overall)] + list(phase["by_kind"].items()):
+        print(f"  {kind:<8} {stats['requests']:>6} {stats['throughput_rps'] or 0:>8} "
+              f"{stats['error_rate'] * 100:>6.1f} {stats['p50_ms'] or 0:>9} {stats['p95_ms'] or 0:>9} {stats['p99_ms'] or 0:>9}")
+    if phase.get("mean_batch_size"):
+        print(f"  mean micro-batch size: {phase['mean_batch_size']}")
+    if phase["rss_timeline"]:
+        peak = max(sum(sample["rss_mb"].values()) for sample in phase["rss_timeline"])
+        print(f"  peak server RSS (all processes): {peak:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running service")
+    target.add_argument("--spawn", action="store_true", help="start uvicorn app:app locally for the test")
+    load = parser.add_mutually_exclusive_group(required=True)
+    load.add_argument("--rate", type=float, nargs="+", default=[], help="open-loop arrival rates (req/s), one phase each")
+    load.add_argument("--concurrency", type=int, nargs="+", default=[], help="closed-loop in-flight requests, one phase each")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per phase")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"weighted traffic mix (default {DEFAULT_MIX})")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--server-env", nargs="*", default=[], help="KEY=VALUE environment for the spawned server")
+    parser.add_argument("--sweep", nargs="*", default=[],
+                        help="KEY=V1,V2 server settings to compare; the service is restarted for every combination")
+    parser.add_argument("--pid", type=int, help="server PID to sample RSS from when using --url")
+    parser.add_argument("--rss-interval", type=float, default=1.0)
+    parser.add_argument("--payloads", type=int, default=50, help="distinct payloads per request kind")
+    parser.add_argument("--candidates-per-match", type=int, default=50)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the full JSON report here")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
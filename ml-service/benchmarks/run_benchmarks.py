@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the ml-service analyzers and matcher.
+
+Runs text extraction (txt/pdf/docx), ResumeAnalyzer.analyze, JDAnalyzer.analyze,
+CandidateMatcher.match and reverse vacancy matching over a deterministic
+synthetic corpus, writes machine-readable JSON and optionally compares it to a
+stored baseline, exiting non-zero when any benchmark's throughput drops by more
+than the threshold.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.15
+    python benchmarks/run_benchmarks.py --only match --sizes 100 10000 100000
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator
+
+
+def measure(fn, items, repeat):
+    """Run fn `repeat` times; return timing stats with items/sec based on the median"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        "items": items,
+        "repeat": repeat,
+        "best_seconds": round(min(timings), 6),
+        "median_seconds": round(median, 6),
+        "items_per_second": round(items / median, 3) if median > 0 else None,
+    }
+
+
+def bench_extraction(generator, args):
+    from resume_analyzer import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer()
+    results = {}
+    for fmt in ("txt", "pdf", "docx"):
+        for size in args.resume_sizes:
+            files = [generator.resume_file(i, fmt, size) for i in range(args.files)]
+            results[f"extract/{fmt}/{size}"] = measure(
+                lambda: [analyzer.extract_text_from_bytes(content, name) for name, content in files],
+                len(files), args.repeat
+            )
+    return results
+
+
+def bench_resume_analysis(generator, args):
+    from resume_analyzer import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer()
+    results = {}
+    for size in args.resume_sizes:
+        for density in args.skill_densities:
+            texts = [generator.resume(i, size, density)["text"] for i in range(args.files)]
+            results[f"analyze_resume/{size}/density={density}"] = measure(
+                lambda: [analyzer.analyze(text) for text in texts], len(texts), args.repeat
+            )
+    return results
+
+
+def bench_jd_analysis(generator, args):
+    from jd_analyzer import JDAnalyzer
+
+    analyzer = JDAnalyzer()
+    results = {}
+    for words in (100, 400, 1500):
+        texts = generator.jd_texts(args.files, words=words)
+        results[f"analyze_jd/words={words}"] = measure(
+            lambda: [analyzer.analyze(text) for text in texts], len(texts), args.repeat
+        )
+    return results
+
+
+def bench_matching(generator, args):
+    from candidate_matcher import CandidateMatcher
+
+    matcher = CandidateMatcher()
+    jd_text = generator.jd(0)["text"]
+    results = {}
+    pool = generator.candidates(max(args.sizes), size="small")
+    for size in args.sizes:
+        candidates = pool[:size]
+        # Large pools take long enough that a single run is representative
+        repeat = args.repeat if size <= 10000 else 1
+        results[f"match/candidates={size}"] = measure(
+            lambda: matcher.match(jd_text, candidates), size, repeat
+        )
+    return results
+
+
+def bench_reverse_matching(generator, args):
+    from candidate_matcher import CandidateMatcher
+    from vacancy_index import VacancyIndex
+
+    index = VacancyIndex(CandidateMatcher())
+    index.upsert([generator.jd(i) for i in range(args.vacancies)])
+    index._ensure_built()
+    resumes = generator.candidates(100, size="small")
+    return {
+        f"match_vacancies/resumes=100/vacancies={args.vacancies}": measure(
+            lambda: index.match(resumes, top_k=10), len(resumes) * args.vacancies, args.repeat
+        )
+    }
+
+
+BENCHMARKS = {
+    "extract": bench_extraction,
+    "analyze_resume": bench_resume_analysis,
+    "analyze_jd": bench_jd_analysis,
+    "match": bench_matching,
+    "match_vacancies": bench_reverse_matching,
+}
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions where throughput fell more than `threshold` below the baseline"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference or not reference.get("items_per_second") or not result.get("items_per_second"):
+            continue
+        ratio = result["items_per_second"] / reference["items_per_second"]
+        result["baseline_ratio"] = round(ratio, 3)
+        if ratio < 1 - threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset of benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000],
+                        help="candidate pool sizes for matching")
+    parser.add_argument("--resume-sizes", nargs="+", default=["small", "medium", "large"])
+    parser.add_argument("--skill-densities", type=float, nargs="+", default=[0.02, 0.1, 0.3])
+    parser.add_argument("--files", type=int, default=50, help="documents per extraction/analysis benchmark")
+    parser.add_argument("--vacancies", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed fractional throughput drop before failing (default 0.2)")
+    parser.add_argument("--save-baseline", help="write these results as the new baseline")
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"▶ {name}", file=sys.stderr)
+        for case, result in BENCHMARKS[name](generator, args).items():
+            results[case] = result
+            print(f"  {case:<45} {result['items_per_second']:>14,.1f} items/s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = [{"name": name, "ratio": round(ratio, 3)} for name, ratio in regressions]
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(payload + "\n")
+
+    for name, ratio in regressions:
+        print(f"❌ Regression: {name} at {ratio:.0%} of baseline throughput", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start cost and per-worker memory of the ml-service.
+
+Reports `import app` wall time (from `python -X importtime`), model warm-up
+time, and for serve.py with N workers the RSS / PSS / shared memory of each
+worker with and without --preload. PSS splits shared pages between the
+processes that map them, so it shows how much each worker really costs.
+
+Usage:
+    python benchmarks/startup_report.py --workers 4
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+ML_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time_ms(module="app"):
+    """Cumulative import time of `module` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ML_SERVICE_DIR, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    return None
+
+
+def warm_up_seconds():
+    code = "import time, app; t = time.perf_counter(); app.warm_up(); print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ML_SERVICE_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def smaps_rollup_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def worker_memory(workers, preload, port):
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port),
+               "--host", "127.0.0.1", "--log-level", "warning", "--preload" if preload else "--no-preload"]
+    master = subprocess.Popen(command, cwd=ML_SERVICE_DIR, stdout=subprocess.DEVNULL, start_new_session=True)
+    try:
+        deadline = time.time() + 180
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.5)
+        # Give every worker time to finish its own warm-up when not preloading
+        time.sleep(5 if not preload else 1)
+
+        with open(f"/proc/{master.pid}/task/{master.pid}/children") as f:
+            children = [int(pid) for pid in f.read().split()]
+        rows = []
+        for pid in [master.pid] + children:
+            memory = smaps_rollup_kb(pid)
+            rows.append({
+                "pid": pid,
+                "role": "master" if pid == master.pid else "worker",
+                "rss_mb": memory.get("Rss", 0) / 1024,
+                "pss_mb": memory.get("Pss", 0) / 1024,
+                "shared_mb": (memory.get("Shared_Clean", 0) + memory.get("Shared_Dirty", 0)) / 1024,
+            })
+        return rows
+    finally:
+        os.killpg(master.pid, signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    print(f"import app:   {import_time_ms():.0f} ms")
+    print(f"warm_up():    {warm_up_seconds() * 1000:.0f} ms")
+
+    for preload in (False, True):
+        rows = worker_memory(args.workers, preload, args.port)
+        print(f"\nserve.py --workers {args.workers} {'--preload' if preload else '--no-preload'}")
+        print(f"  {'role':<7} {'pid':>7} {'RSS MB':>8} {'PSS MB':>8} {'shared MB':>10}")
+        for row in rows:
+            print(f"  {row['role']:<7} {row['pid']:>7} {row['rss_mb']:>8.1f} {row['pss_mb']:>8.1f} {row['shared_mb']:>10.1f}")
+        print(f"  total PSS: {sum(row['pss_mb'] for row in rows):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Offline bulk shortlisting: the ml-service pipeline without HTTP.
+
+Walks a directory or a .zip/.tar(.gz) archive of resumes and runs
+extract_text_from_bytes -> ResumeAnalyzer.analyze -> match scoring against
+one or more JDs on a process pool. Results are written as Parquet:
+
+    OUTPUT/
+        job.json                 inputs and settings; a restart must match them
+        parts/resumes-NNNNNN.parquet   one row per resume (features, status)
+        parts/scores-NNNNNN.parquet    one row per (resume, JD) pair
+        resumes.parquet, scores.parquet, shortlist.parquet   merged at the end
+
+Files are processed in fixed chunks of --chunk-size, in a stable order (sorted
+for directories, archive order for archives). A chunk is done once its resumes
+part exists; its scores part is written first (each to a temporary name,
+then renamed), so an interrupted run picks up where it stopped when started again with the same
+arguments.
+
+Similarity uses a TF-IDF vectorizer fitted once on the JDs (with the same
+settings as CandidateMatcher), so a resume's scores do not depend on which
+other resumes share its chunk. Bonus terms and the final score use the same
+MatchScorer as the API (--scoring takes a scoring config JSON file).
+
+Usage:
+    python bulk_shortlist.py resumes/ --jd jd/backend.txt --jd jd/data.txt --output out/
+    python bulk_shortlist.py resumes.zip --jd-dir jds/ --output out/ --workers 8 --top-k 100
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".doc", ".txt")
+
+_worker = None
+
+
+class ResumeSource:
+    """Resume files of a directory or archive, listed in a stable order"""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.isdir(path):
+            self.kind = "directory"
+        elif zipfile.is_zipfile(path):
+            self.kind = "zip"
+        elif tarfile.is_tarfile(path):
+            self.kind = "tar"
+        else:
+            raise ValueError(f"{path} is neither a directory nor a zip/tar archive")
+        self.names = self._list()
+
+    def _list(self):
+        if self.kind == "directory":
+            names = []
+            for root, _, files in os.walk(self.path):
+                for name in files:
+                    if name.lower().endswith(RESUME_EXTENSIONS):
+                        names.append(os.path.relpath(os.path.join(root, name), self.path))
+            return sorted(names)
+        if self.kind == "zip":
+            with zipfile.ZipFile(self.path) as archive:
+                return sorted(
+                    info.filename for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(RESUME_EXTENSIONS)
+                )
+        with tarfile.open(self.path) as archive:
+            # Archive order, so compressed tars are read in one sequential pass
+            return [
+                member.name for member in archive
+                if member.isfile() and member.name.lower().endswith(RESUME_EXTENSIONS)
+            ]
+
+    def fingerprint(self):
+        return hashlib.sha256("\n".join(self.names).encode("utf-8")).hexdigest()[:16]
+
+    def chunks(self, chunk_size, pending):
+        """(chunk number, [(name, bytes)]) for every chunk number in `pending`"""
+        if self.kind == "tar":
+            yield from self._tar_chunks(chunk_size, pending)
+            return
+
+        archive = zipfile.ZipFile(self.path) if self.kind == "zip" else None
+        try:
+            for number in sorted(pending):
+                names = self.names[number * chunk_size:(number + 1) * chunk_size]
+                if archive is not None:
+                    yield number, [(name, archive.read(name)) for name in names]
+                else:
+                    yield number, [(name, self._read_file(name)) for name in names]
+        finally:
+            if archive is not None:
+                archive.close()
+
+    def _read_file(self, name):
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def _tar_chunks(self, chunk_size, pending):
+        position = {name: i for i, name in enumerate(self.names)}
+        current, files = None, []
+        with tarfile.open(self.path) as archive:
+            for member in archive:
+                i = position.get(member.name)
+                if i is None or i // chunk_size not in pending:
+                    continue
+                if current is not None and i // chunk_size != current:
+                    yield current, files
+                    files = []
+                current = i // chunk_size
+                files.append((member.name, archive.extractfile(member).read()))
+        if files:
+            yield current, files
+
+
+class ShortlistWorker:
+    """Per-process pipeline state, created once by the pool initializer"""
+
+    def __init__(self, job):
+        from candidate_matcher import CandidateMatcher
+        from resume_analyzer import ResumeAnalyzer
+        from scoring import MatchScorer
+
+        self.job = job
+        self.analyzer = ResumeAnalyzer()
+        self.matcher = CandidateMatcher()
+        self.jd_ids = [jd["id"] for jd in job["jds"]]
+        jd_texts = [jd["text"] for jd in job["jds"]]
+
+        from sklearn.base import clone
+        self.vectorizer = clone(self.matcher.vectorizer).fit(jd_texts)
+        self.jd_matrix_t = self.vectorizer.transform(jd_texts).T.tocsr()
+        self.requirements = self.matcher._requirement_columns(
+            [self.matcher._jd_requirements(text) for text in jd_texts]
+        )
+        self.scorer = MatchScorer([job["scoring"]] * len(jd_texts))
+
+    def process(self, number, files):
+        import pandas as pd
+        from prescreen import ResumeRejected
+
+        resumes, profiles, rows = [], [], []
+        for name, content in files:
+            row = {"file": name, "candidate_id": name, "status": "ok", "reason": None}
+            try:
+                text = self.analyzer.extract_text_from_bytes(content, name)
+                analysis = self.analyzer.analyze(text)
+            except ResumeRejected as e:
+                row.update(status="rejected", reason=f"{e.tier}:{e.reason}")
+                resumes.append(row)
+                continue
+            except Exception as e:
+                row.update(status="error", reason=f"{type(e).__name__}: {e}")
+                resumes.append(row)
+                continue
+
+            profile = self.analyzer.candidate_profile(name, text, analysis)
+            row.update({
+                "overall_score": analysis["overall_score"],
+                "skills": profile["skills"],
+                "experience_years": float(profile["experience_years"]),
+                "education_level": profile["education_level"],
+                "email": profile["email"],
+                "minhash": analysis["minhash"],
+            })
+            resumes.append(row)
+            profiles.append(profile)
+            rows.append(name)
+
+        scores = []
+        if profiles:
+            vectors = self.vectorizer.transform([profile["text"] for profile in profiles])
+            # Both sides are L2-normalised, so the product is the cosine similarity
+            similarities = (vectors @ self.jd_matrix_t).toarray()
+            bonuses = self.scorer.bonus(self.matcher._candidate_columns(profiles), self.requirements)
+            totals = self.scorer.combine(similarities, bonuses)
+            for i, name in enumerate(rows):
+                for j, jd_id in enumerate(self.jd_ids):
+                    scores.append({
+                        "file": name, "jd_id": jd_id,
+                        "similarity_score": round(float(similarities[i, j]) * 100, 2),
+                        "comprehensive_score": round(float(totals[i, j]), 2),
+                    })
+
+        resume_columns = ["file", "candidate_id", "status", "reason", "overall_score", "skills",
+                          "experience_years", "education_level", "email", "minhash"]
+        score_columns = ["file", "jd_id", "similarity_score", "comprehensive_score"]
+        # Scores first: a chunk counts as done once its resumes part exists
+        write_part(pd.DataFrame(scores, columns=score_columns), self.job, "scores", number)
+        write_part(pd.DataFrame(resumes, columns=resume_columns), self.job, "resumes", number)
+        return number, len(files), len(profiles)
+
+
+def _init_worker(job):
+    global _worker
+    _worker = ShortlistWorker(job)
+
+
+def _process_chunk(number, files):
+    return _worker.process(number, files)
+
+
+def part_path(output, kind, number):
+    return os.path.join(output, "parts", f"{kind}-{number:06d}.parquet")
+
+
+def write_part(frame, job, kind, number):
+    path = part_path(job["output"], kind, number)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_jds(paths, directory):
+    files = list(paths or [])
+    if directory:
+        files += sorted(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(".txt")
+        )
+    if not files:
+        raise SystemExit("At least one --jd file or a --jd-dir is required")
+    jds = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            jds.append({"id": os.path.splitext(os.path.basename(path))[0], "text": f.read()})
+    return jds
+
+
+def prepare_job(args, source):
+    """Job description written to job.json; a restart must describe the same job"""
+    from scoring import validate_match_scoring
+
+    scoring = None
+    if args.scoring:
+        with open(args.scoring) as f:
+            scoring = json.load(f)
+    job = {
+        "source": os.path.abspath(args.source),
+        "source_fingerprint": source.fingerprint(),
+        "files": len(source.names),
+        "chunk_size": args.chunk_size,
+        "jds": load_jds(args.jd, args.jd_dir),
+        "scoring": validate_match_scoring(scoring),
+        "output": os.path.abspath(args.output),
+    }
+
+    os.makedirs(os.path.join(args.output, "parts"), exist_ok=True)
+    job_path = os.path.join(args.output, "job.json")
+    if os.path.exists(job_path):
+        with open(job_path) as f:
+            previous = json.load(f)
+        if previous != job:
+            raise SystemExit(
+                f"{args.output} holds a different job (changed source, JDs, scoring or chunk size); "
+                "use a new --output directory"
+            )
+    else:
+        with open(job_path, "w") as f:
+            json.dump(job, f)
+    return job
+
+
+def merge(job, top_k):
+    """Combine the parts into resumes.parquet, scores.parquet and a top-k shortlist per JD"""
+    import pandas as pd
+
+    output = job["output"]
+    chunk_count = (job["files"] + job["chunk_size"] - 1) // job["chunk_size"]
+    resumes = pd.concat([pd.read_parquet(part_path(output, "resumes", n)) for n in range(chunk_count)],
+                        ignore_index=True)
+    scores = pd.concat([pd.read_parquet(part_path(output, "scores", n)) for n in range(chunk_count)],
+                       ignore_index=True)
+    resumes.to_parquet(os.path.join(output, "resumes.parquet"), index=False)
+    scores.to_parquet(os.path.join(output, "scores.parquet"), index=False)
+
+    shortlist = (
+        scores.sort_values(["jd_id", "comprehensive_score", "file"], ascending=[True, False, True], kind="stable")
+        .groupby("jd_id", sort=False).head(top_k)
+    )
+    shortlist = shortlist.assign(rank=shortlist.groupby("jd_id").cumcount() + 1)
+    shortlist.to_parquet(os.path.join(output, "shortlist.parquet"), index=False)
+    return resumes, shortlist
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory or .zip/.tar/.tar.gz archive of resumes")
+    parser.add_argument("--jd", action="append", help="job description text file (repeatable)")
+    parser.add_argument("--jd-dir", help="directory of job description .txt files")
+    parser.add_argument("--output", required=True, help="output directory (reuse it to resume a run)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64, help="files per task and per checkpoint")
+    parser.add_argument("--scoring", help="match scoring config JSON file (default weights if omitted)")
+    parser.add_argument("--top-k", type=int, default=50, help="shortlist size per JD")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+
+    source = ResumeSource(args.source)
+    job = prepare_job(args, source)
+    chunk_count = (len(source.names) + args.chunk_size - 1) // args.chunk_size
+    pending = {n for n in range(chunk_count) if not os.path.exists(part_path(job["output"], "resumes", n))}
+    print(f"📂 {len(source.names):,} resumes in {chunk_count} chunks; "
+          f"{chunk_count - len(pending)} already done, {len(pending)} to go; {len(job['jds'])} JDs")
+
+    started = last_report = time.perf_counter()
+    done_files = analyzed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(job,)) as pool:
+        chunks = source.chunks(args.chunk_size, pending)
+        in_flight = set()
+        # Keep a bounded number of chunks (and their file bytes) in flight
+        for number, files in chunks:
+            in_flight.add(pool.submit(_process_chunk, number, files))
+            if len(in_flight) < 2 * args.workers:
+                continue
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                _, files_done, ok = future.result()
+                done_files += files_done
+                analyzed += ok
+            if time.perf_counter() - last_report >= args.report_every:
+                last_report = time.perf_counter()
+                elapsed = last_report - started
+                print(f"  {done_files:,} files, {done_files / elapsed:.1f} files/s", flush=True)
+        for future in in_flight:
+            _, files_done, ok = future.result()
+            done_files += files_done
+            analyzed += ok
+
+    elapsed = time.perf_counter() - started
+    rate = done_files / elapsed if elapsed > 0 else 0.0
+    print(f"✅ processed {done_files:,} files ({analyzed:,} analyzed) in {elapsed:.1f}s: {rate:.1f} files/s")
+
+    resumes, shortlist = merge(job, args.top_k)
+    rejected = int((resumes["status"] != "ok").sum())
+    print(f"📊 {len(resumes):,} resumes ({rejected:,} rejected or failed), "
+          f"shortlist of {len(shortlist):,} rows written to {job['output']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,657 @@
+"""
+Versioned, memory-mapped on-disk candidate index.
+
+Layout of an index directory (format version 3):
+
+    MANIFEST.json            segments, pool generation, next automatic candidate ID,
+                             vectorizer settings
+    vocabulary.json          term -> column mapping of the frozen TF-IDF vectorizer
+    idf.npy                  IDF weights (float64)
+    seg-000001/
+        meta.json            row count
+        indptr.npy           CSR row pointers (int64)
+        indices.npy          CSR term columns (int32)
+        data.npy             L2-normalised TF-IDF weights (float32)
+        skills.npy           packed skill bitsets, one row per candidate (uint8)
+        experience.npy       years of experience (float32)
+        education.npy        education level, see EDUCATION_HIERARCHY (int8)
+        has_email.npy        contact flag (bool)
+        minhash.npy          MinHash signatures for near-duplicate detection (uint32, NUM_PERM per row)
+        skill_indptr.npy     inverted skill index: rows having skill s are
+        skill_rows.npy       skill_rows[skill_indptr[s]:skill_indptr[s + 1]] (sorted, int32)
+        ids.npy              candidate IDs, UTF-8 fixed width (S)
+        ids_sorted.npy       IDs sorted, with ids_order.npy mapping back to rows,
+        ids_order.npy        so ID lookups are a binary search over the mapped file
+        live.npy             1 for live rows, 0 for deleted ones (updated in place)
+
+Every array is opened with np.load(mmap_mode=...), so opening even a
+1M-candidate index only parses headers, and queries page in the parts they
+touch. New candidates are written as new append-only segments; compact()
+merges segments and drops deleted rows. update() appends a candidate's new
+row and marks the old one deleted; rows are never rewritten, so readers
+never see a half-written one. MANIFEST.json is replaced atomically, so
+readers always see a consistent set of segments.
+
+ingest() appends like append() and also reports near-duplicates of the new
+candidates among the live ones, using an in-memory LSH index over the
+stored signatures (built on first use, kept current by this process's own
+writes and rebuilt when another process changed the pool).
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import minhash
+from candidate_matcher import TECHNICAL_SKILLS
+from metrics import stage
+from skill_filter import SkillPostings
+
+FORMAT_VERSION = 3
+SEGMENT_ARRAYS = (
+    "indptr", "indices", "data", "skills", "experience", "education",
+    "has_email", "minhash", "ids", "ids_sorted", "ids_order", "live",
+    "skill_indptr", "skill_rows"
+)
+
+
+class Segment:
+    """One immutable (apart from its live bitmap) block of candidate rows"""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.rows = self.meta["rows"]
+        self.arrays = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r+" if name == "live" else "r")
+            for name in SEGMENT_ARRAYS
+        }
+        self._matrix = None
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = csr_matrix(
+                (self.arrays["data"], self.arrays["indices"], self.arrays["indptr"]),
+                shape=(self.rows, self.meta["columns"]), copy=False
+            )
+        return self._matrix
+
+    def rows_matrix(self, start, end):
+        """CSR view of rows [start, end) over the mapped arrays (only the row pointers are copied)"""
+        indptr = self.arrays["indptr"]
+        lo, hi = int(indptr[start]), int(indptr[end])
+        return csr_matrix(
+            (self.arrays["data"][lo:hi], self.arrays["indices"][lo:hi], np.asarray(indptr[start:end + 1]) - lo),
+            shape=(end - start, self.meta["columns"]), copy=False
+        )
+
+    def live_count(self):
+        return int(np.count_nonzero(self.arrays["live"]))
+
+    @property
+    def postings(self):
+        return SkillPostings(self.arrays["skill_indptr"], self.arrays["skill_rows"])
+
+    def column(self, name, rows):
+        """Values of one feature column at the given rows"""
+        return np.asarray(self.arrays[name][rows])
+
+    def find(self, candidate_id):
+        """Row of a live candidate in this segment, or None"""
+        key = candidate_id.encode("utf-8")
+        ids_sorted = self.arrays["ids_sorted"]
+        position = int(np.searchsorted(ids_sorted, key))
+        if position < len(ids_sorted) and ids_sorted[position] == key:
+            row = int(self.arrays["ids_order"][position])
+            if self.arrays["live"][row]:
+                return row
+        return None
+
+    def columns(self, start, end):
+        """Candidate feature columns for rows [start, end) in CandidateMatcher._candidate_columns layout"""
+        skills = np.unpackbits(self.arrays["skills"][start:end], axis=1, count=len(TECHNICAL_SKILLS))
+        return {
+            "skills": skills.astype(np.float32),
+            "experience": np.asarray(self.arrays["experience"][start:end]),
+            "education": np.asarray(self.arrays["education"][start:end]),
+            "has_email": np.asarray(self.arrays["has_email"][start:end]),
+        }
+
+    def columns_at(self, rows):
+        """Like columns(), for an arbitrary sorted set of rows"""
+        skills = np.unpackbits(self.arrays["skills"][rows], axis=1, count=len(TECHNICAL_SKILLS))
+        return {
+            "skills": skills.astype(np.float32),
+            "experience": self.column("experience", rows),
+            "education": self.column("education", rows),
+            "has_email": self.column("has_email", rows),
+        }
+
+
+class CandidateIndex:
+    def __init__(self, path, matcher, segments, manifest, vectorizer):
+        self.path = path
+        self.matcher = matcher
+        self.segments = segments
+        self.manifest = manifest
+        self.vectorizer = vectorizer
+        self._lock = threading.Lock()
+        self._duplicates = None
+        self._duplicates_generation = None
+
+    # ------------------------------------------------------------------ open / create
+
+    @classmethod
+    def open(cls, path, matcher):
+        """Open an existing index; only headers and the small manifest are read"""
+        with open(os.path.join(path, "MANIFEST.json")) as f:
+            manifest = json.load(f)
+        if manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported candidate index format {manifest['format_version']}")
+
+        vectorizer = cls._load_vectorizer(path, matcher)
+        segments = [Segment(os.path.join(path, name)) for name in manifest["segments"]]
+        return cls(path, matcher, segments, manifest, vectorizer)
+
+    @classmethod
+    def create(cls, path, matcher, candidates, max_features=20000, append=True):
+        """Create an index, fitting the frozen TF-IDF vocabulary on the initial candidates (appended unless append=False)"""
+        from sklearn.base import clone
+
+        if os.path.exists(os.path.join(path, "MANIFEST.json")):
+            raise FileExistsError(f"A candidate index already exists at {path}")
+        os.makedirs(path, exist_ok=True)
+
+        vectorizer = clone(matcher.vectorizer).set_params(max_features=max_features)
+        vectorizer.fit([candidate.get('text', '') for candidate in candidates])
+
+        vocabulary = vectorizer.get_feature_names_out().tolist()
+        with open(os.path.join(path, "vocabulary.json"), "w") as f:
+            json.dump(vocabulary, f)
+        np.save(os.path.join(path, "idf.npy"), vectorizer.idf_)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "segments": [],
+            "next_segment": 1,
+            "next_candidate_id": 0,
+            "generation": 0,
+            "columns": len(vocabulary),
+            "skills": TECHNICAL_SKILLS,
+        }
+        cls._write_manifest(path, manifest)
+
+        index = cls(path, matcher, [], manifest, vectorizer)
+        if candidates and append:
+            index.append(candidates)
+        return index
+
+    @classmethod
+    def open_or_create(cls, path, matcher, candidates=None):
+        if os.path.exists(os.path.join(path, "MANIFEST.json")):
+            return cls.open(path, matcher)
+        return cls.create(path, matcher, candidates or [])
+
+    @staticmethod
+    def _load_vectorizer(path, matcher):
+        from sklearn.base import clone
+
+        with open(os.path.join(path, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        vectorizer = clone(matcher.vectorizer).set_params(max_features=len(vocabulary) or None)
+        vectorizer.vocabulary_ = {term: i for i, term in enumerate(vocabulary)}
+        vectorizer.idf_ = np.load(os.path.join(path, "idf.npy"), mmap_mode="r")
+        return vectorizer
+
+    @staticmethod
+    def _write_manifest(path, manifest):
+        tmp = os.path.join(path, f".MANIFEST.{os.getpid()}.json")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(path, "MANIFEST.json"))
+
+    @contextmanager
+    def _writer(self):
+        """Serialise writers across threads and processes"""
+        with self._lock, open(os.path.join(self.path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Pick up segments another process may have published meanwhile
+                self._reload()
+                generation = self.generation
+                yield
+                # Writes keep the LSH index in step, so it stays current if it was before them
+                if self._duplicates_generation == generation:
+                    self._duplicates_generation = self.generation
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _reload(self):
+        with open(os.path.join(self.path, "MANIFEST.json")) as f:
+            manifest = json.load(f)
+        if manifest["generation"] != self.manifest["generation"]:
+            known = {segment.name: segment for segment in self.segments}
+            self.segments = [
+                known.get(name) or Segment(os.path.join(self.path, name)) for name in manifest["segments"]
+            ]
+            self.manifest = manifest
+
+    @property
+    def generation(self):
+        """Pool version; bumped by every append, delete and compaction"""
+        return self.manifest["generation"]
+
+    def __len__(self):
+        return sum(segment.live_count() for segment in self.segments)
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, candidates):
+        """Write candidates as a new segment; existing IDs are replaced"""
+        if not candidates:
+            return 0
+        candidates = self._last_per_id(candidates)
+        with self._writer():
+            self._delete_locked(self._explicit_ids(candidates))
+            self._append_locked(candidates)
+        return len(candidates)
+
+    def ingest(self, candidates):
+        """Append candidates; returns {candidate_id: [(id, similarity)]} near-duplicates found among live candidates"""
+        if not candidates:
+            return {}
+        candidates = self._last_per_id(candidates)
+        with self._writer():
+            duplicates = self._duplicate_index_locked()
+            ids = self._candidate_ids(candidates)
+            signatures = self._signatures(candidates)
+            # Earlier candidates of the same batch count too
+            batch = minhash.NearDuplicateIndex(threshold=duplicates.threshold, capacity=len(candidates))
+            found = {}
+            for candidate_id, signature in zip(ids, signatures):
+                matches = duplicates.query(signature, exclude=candidate_id) + batch.query(signature, exclude=candidate_id)
+                if matches:
+                    found[candidate_id] = sorted(matches, key=lambda match: -match[1])
+                batch.add(candidate_id, signature)
+
+            self._delete_locked(self._explicit_ids(candidates))
+            self._append_locked(candidates, signatures)
+        return found
+
+    def near_duplicates(self, text=None, signature=None, exclude=None):
+        """Live candidates whose resumes are near-duplicates of a text (or of a MinHash signature)"""
+        if signature is None:
+            signature = minhash.signature(text or '')
+        self.refresh()
+        with self._lock:
+            return self._duplicate_index_locked().query(signature, exclude=exclude)
+
+    def _duplicate_index_locked(self):
+        """LSH index over every live candidate's signature, rebuilt when the pool changed elsewhere"""
+        if self._duplicates is None or self._duplicates_generation != self.generation:
+            with stage("candidate_index", "lsh_build"):
+                duplicates = minhash.NearDuplicateIndex(capacity=max(1, sum(s.rows for s in self.segments)))
+                for segment in self.segments:
+                    live = np.flatnonzero(segment.arrays["live"])
+                    ids = [candidate_id.decode("utf-8") for candidate_id in segment.arrays["ids"][live]]
+                    duplicates.add_many(ids, segment.arrays["minhash"][live])
+            self._duplicates = duplicates
+            self._duplicates_generation = self.generation
+        return self._duplicates
+
+    def _signatures(self, candidates):
+        """MinHash signatures of candidates: the analysis's "minhash" when given, else computed from text"""
+        return np.array([
+            minhash.decode(candidate['minhash']) if candidate.get('minhash')
+            else minhash.signature(candidate.get('text', ''))
+            for candidate in candidates
+        ], dtype=np.uint32).reshape(-1, minhash.NUM_PERM)
+
+    def _candidate_ids(self, candidates):
+        """IDs of candidates; those without one get candidate_<n> from the manifest's counter"""
+        next_id = self._next_candidate_id()
+        return [
+            f"candidate_{next_id + i}" if candidate.get('id') is None else str(candidate['id'])
+            for i, candidate in enumerate(candidates)
+        ]
+
+    @staticmethod
+    def _explicit_ids(candidates):
+        """IDs the caller gave (0 and "" included), whose existing rows a write replaces"""
+        return [str(candidate['id']) for candidate in candidates if candidate.get('id') is not None]
+
+    @staticmethod
+    def _last_per_id(candidates):
+        """Candidates with each explicit ID kept once, the last one given winning"""
+        last = {str(candidate['id']): i for i, candidate in enumerate(candidates) if candidate.get('id') is not None}
+        return [
+            candidate for i, candidate in enumerate(candidates)
+            if candidate.get('id') is None or last[str(candidate['id'])] == i
+        ]
+
+    def _next_candidate_id(self):
+        # The counter only grows, so compact() dropping rows never hands out a live ID again;
+        # indexes written before it existed continue after the highest automatic ID they hold
+        if "next_candidate_id" in self.manifest:
+            return self.manifest["next_candidate_id"]
+        highest = -1
+        for segment in self.segments:
+            for candidate_id in segment.arrays["ids"]:
+                prefix, _, number = candidate_id.decode("utf-8").partition("candidate_")
+                if not prefix and number.isdigit():
+                    highest = max(highest, int(number))
+        return max(highest + 1, sum(segment.rows for segment in self.segments))
+
+    def _append_locked(self, candidates, signatures=None):
+        name = f"seg-{self.manifest['next_segment']:06d}"
+        ids = self._candidate_ids(candidates)
+        if signatures is None:
+            signatures = self._signatures(candidates)
+        self._write_segment(name, candidates, ids, signatures)
+        if self._duplicates is not None:
+            self._duplicates.add_many(ids, signatures)
+
+        manifest = dict(self.manifest)
+        manifest["segments"] = manifest["segments"] + [name]
+        manifest["next_segment"] += 1
+        manifest["next_candidate_id"] = self._next_candidate_id() + len(candidates)
+        manifest["generation"] += 1
+        self._write_manifest(self.path, manifest)
+        self.manifest = manifest
+        self.segments.append(Segment(os.path.join(self.path, name)))
+
+    def update(self, candidate):
+        """Replace one candidate with a new row; returns 'appended'
+
+        The row is written as a new segment and the old one marked deleted, like
+        append(). Rewriting the old row in place would go through several mapped
+        files one after another, so a concurrent search (in this or another
+        process) could score a half-written vector.
+        """
+        with self._writer():
+            self._delete_locked([str(candidate['id'])])
+            self._append_locked([candidate])
+        return "appended"
+
+    def delete(self, candidate_ids):
+        """Mark candidates as deleted; space is reclaimed by compact()"""
+        with self._writer():
+            removed = self._delete_locked(candidate_ids)
+            if removed:
+                manifest = dict(self.manifest, generation=self.manifest["generation"] + 1)
+                self._write_manifest(self.path, manifest)
+                self.manifest = manifest
+        return removed
+
+    def _delete_locked(self, candidate_ids):
+        removed = 0
+        for candidate_id in candidate_ids:
+            for segment in self.segments:
+                row = segment.find(str(candidate_id))
+                if row is not None:
+                    segment.arrays["live"][row] = 0
+                    removed += 1
+                    if self._duplicates is not None:
+                        self._duplicates.remove([str(candidate_id)])
+        for segment in self.segments:
+            segment.arrays["live"].flush()
+        return removed
+
+    def compact(self):
+        """Merge every segment into one, dropping deleted rows"""
+        with self._writer():
+            if len(self.segments) <= 1 and all(s.live_count() == s.rows for s in self.segments):
+                return False
+
+            name = f"seg-{self.manifest['next_segment']:06d}"
+            self._write_merged_segment(name)
+
+            old = [segment.name for segment in self.segments]
+            manifest = dict(self.manifest)
+            manifest["segments"] = [name]
+            manifest["next_segment"] += 1
+            manifest["generation"] += 1
+            self._write_manifest(self.path, manifest)
+            self.manifest = manifest
+            self.segments = [Segment(os.path.join(self.path, name))]
+
+            # Readers still mapping old segments keep their pages until they close them
+            for segment_name in old:
+                shutil.rmtree(os.path.join(self.path, segment_name), ignore_errors=True)
+        return True
+
+    def _write_segment(self, name, candidates, ids, signatures):
+        matrix = self.vectorizer.transform([candidate.get('text', '') for candidate in candidates]).tocsr()
+        columns = self.matcher._candidate_columns(candidates)
+        self._save_segment(name, {
+            "indptr": matrix.indptr.astype(np.int64),
+            "indices": matrix.indices.astype(np.int32),
+            "data": matrix.data.astype(np.float32),
+            "skills": np.packbits(columns["skills"].astype(bool), axis=1),
+            "experience": columns["experience"].astype(np.float32),
+            "education": columns["education"],
+            "has_email": columns["has_email"],
+            "minhash": signatures,
+            "ids": np.array([candidate_id.encode("utf-8") for candidate_id in ids]),
+        })
+
+    def _write_merged_segment(self, name):
+        parts = {key: [] for key in (
+            "indptr", "indices", "data", "skills", "experience", "education", "has_email", "minhash", "ids"
+        )}
+        offset = 0
+        for segment in self.segments:
+            live = np.flatnonzero(segment.arrays["live"])
+            if len(live) == 0:
+                continue
+            matrix = segment.matrix[live]
+            matrix.eliminate_zeros()
+            parts["indptr"].append(matrix.indptr[1:].astype(np.int64) + offset)
+            parts["indices"].append(matrix.indices.astype(np.int32))
+            parts["data"].append(matrix.data.astype(np.float32))
+            offset += matrix.nnz
+            for key in ("skills", "experience", "education", "has_email", "minhash", "ids"):
+                parts[key].append(np.asarray(segment.arrays[key][live]))
+
+        if parts["ids"]:
+            arrays = {key: np.concatenate(values) for key, values in parts.items()}
+            arrays["indptr"] = np.concatenate([[0], arrays["indptr"]]).astype(np.int64)
+        else:
+            arrays = {
+                "indptr": np.zeros(1, dtype=np.int64), "indices": np.zeros(0, dtype=np.int32),
+                "data": np.zeros(0, dtype=np.float32),
+                "skills": np.zeros((0, (len(TECHNICAL_SKILLS) + 7) // 8), dtype=np.uint8),
+                "experience": np.zeros(0, dtype=np.float32), "education": np.zeros(0, dtype=np.int8),
+                "has_email": np.zeros(0, dtype=bool), "minhash": np.zeros((0, minhash.NUM_PERM), dtype=np.uint32),
+                "ids": np.zeros(0, dtype="S1"),
+            }
+        self._save_segment(name, arrays)
+
+    def _save_segment(self, name, arrays):
+        staging = os.path.join(self.path, f".{name}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        ids = arrays["ids"]
+        order = np.argsort(ids, kind="stable")
+        postings = SkillPostings.from_skill_matrix(
+            np.unpackbits(arrays["skills"], axis=1, count=len(TECHNICAL_SKILLS))
+        )
+        arrays = dict(arrays, ids_sorted=ids[order], ids_order=order.astype(np.int64),
+                      live=np.ones(len(ids), dtype=np.uint8),
+                      skill_indptr=postings.indptr, skill_rows=postings.rows)
+        for array_name, array in arrays.items():
+            np.save(os.path.join(staging, array_name + ".npy"), np.ascontiguousarray(array))
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump({"rows": int(len(ids)), "columns": self.manifest["columns"],
+                       "format_version": FORMAT_VERSION}, f)
+        os.rename(staging, os.path.join(self.path, name))
+
+    # ------------------------------------------------------------------ reads
+
+    def refresh(self):
+        """Pick up segments published by other processes"""
+        with self._lock:
+            self._reload()
+
+    def search(self, jd_text, top_k=50, chunk_size=65536, scorer=None, filters=None):
+        """Top candidates for a JD, scored like CandidateMatcher.match against the frozen vocabulary
+
+        With `filters` (a skill_filter.CandidateFilter), only the candidates
+        passing it are vectorized and scored.
+        """
+        self.refresh()
+        segments = self.segments
+        scorer = scorer or self.matcher.scorer
+
+        with stage("candidate_index", "vectorize"):
+            query = self.vectorizer.transform([jd_text]).toarray().ravel().astype(np.float32)
+            requirements = self.matcher._requirement_columns([self.matcher._jd_requirements(jd_text)])
+
+        best_scores = np.empty(0)
+        best_similarities = np.empty(0)
+        best_refs = np.empty((0, 2), dtype=np.int64)
+
+        with stage("candidate_index", "score"):
+            for segment_number, segment in enumerate(segments):
+                for rows, similarities, columns in self._blocks(segment, query, chunk_size, filters):
+                    bonuses = self.matcher._bonus_matrix(columns, requirements, scorer)
+                    scores = scorer.combine(similarities[:, None], bonuses)[:, 0]
+
+                    keep = min(top_k, len(scores))
+                    top = np.argpartition(-scores, keep - 1)[:keep]
+                    refs = np.column_stack([np.full(len(top), segment_number), rows[top]])
+
+                    best_scores = np.concatenate([best_scores, scores[top]])
+                    best_similarities = np.concatenate([best_similarities, similarities[top]])
+                    best_refs = np.concatenate([best_refs, refs])
+                    if len(best_scores) > top_k:
+                        keep_best = np.argpartition(-best_scores, top_k - 1)[:top_k]
+                        best_scores = best_scores[keep_best]
+                        best_similarities = best_similarities[keep_best]
+                        best_refs = best_refs[keep_best]
+
+        order = np.argsort(-best_scores, kind="stable")
+        jd_skills = {TECHNICAL_SKILLS[j] for j in np.flatnonzero(requirements["skills"][0])}
+        return [
+            self._format_hit(segments[best_refs[i][0]], best_refs[i][1], best_scores[i], best_similarities[i], jd_skills)
+            for i in order
+        ]
+
+    def _blocks(self, segment, query, chunk_size, filters=None):
+        """(rows, similarities, feature columns) of a segment's live (and filter-passing) candidates, by chunk"""
+        if not filters:
+            for start in range(0, segment.rows, chunk_size):
+                end = min(start + chunk_size, segment.rows)
+                live = np.asarray(segment.arrays["live"][start:end], dtype=bool)
+                if not live.any():
+                    continue
+                rows = np.arange(start, end)
+                similarities = segment.rows_matrix(start, end) @ query
+                columns = segment.columns(start, end)
+                if not live.all():
+                    rows, similarities = rows[live], similarities[live]
+                    columns = {name: column[live] for name, column in columns.items()}
+                yield rows, similarities, columns
+            return
+
+        selected = self.filter_rows(segment, filters)
+        for start in range(0, segment.rows, chunk_size):
+            end = min(start + chunk_size, segment.rows)
+            lo, hi = np.searchsorted(selected, [start, end])
+            rows = selected[lo:hi]
+            if not len(rows):
+                continue
+            if 4 * len(rows) >= end - start:
+                # Dense selection: scoring the zero-copy slice and picking rows beats gathering them
+                offsets = rows - start
+                similarities = (segment.rows_matrix(start, end) @ query)[offsets]
+                columns = {name: column[offsets] for name, column in segment.columns(start, end).items()}
+            else:
+                similarities = segment.matrix[rows] @ query
+                columns = segment.columns_at(rows)
+            yield rows, similarities, columns
+
+    def filter_rows(self, segment, filters):
+        """Sorted live rows of a segment that pass a CandidateFilter, from the skill postings and columns"""
+        with stage("candidate_index", "filter"):
+            return filters.select(segment.postings, segment.arrays["live"], segment.column)
+
+    def similarity_columns(self, jd_text):
+        """(ids, similarities, feature columns) of every live candidate against a JD, for re-ranking"""
+        self.refresh()
+        query = self.vectorizer.transform([jd_text]).toarray().ravel().astype(np.float32)
+
+        ids, similarities, parts = [], [], []
+        for segment in self.segments:
+            live = np.flatnonzero(np.asarray(segment.arrays["live"], dtype=bool))
+            if not len(live):
+                continue
+            similarities.append((segment.rows_matrix(0, segment.rows) @ query)[live])
+            columns = segment.columns(0, segment.rows)
+            parts.append({name: column[live] for name, column in columns.items()})
+            ids.extend(candidate_id.decode("utf-8") for candidate_id in segment.arrays["ids"][live])
+
+        if not parts:
+            return [], np.zeros(0), self.matcher._candidate_columns([])
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        return ids, np.concatenate(similarities).astype(np.float64), columns
+
+    def get(self, candidate_id):
+        """Stored features of one live candidate, or None"""
+        self.refresh()
+        for segment in self.segments:
+            row = segment.find(str(candidate_id))
+            if row is not None:
+                return self._row_features(segment, row)
+        return None
+
+    def _row_features(self, segment, row):
+        skill_bits = np.unpackbits(segment.arrays["skills"][row], count=len(TECHNICAL_SKILLS))
+        return {
+            "id": segment.arrays["ids"][row].decode("utf-8"),
+            "skills": [TECHNICAL_SKILLS[j] for j in np.flatnonzero(skill_bits)],
+            "experience_years": float(segment.arrays["experience"][row]),
+            "education_level": int(segment.arrays["education"][row]),
+            "has_email": bool(segment.arrays["has_email"][row]),
+        }
+
+    def _format_hit(self, segment, row, score, similarity, jd_skills):
+        features = self._row_features(segment, int(row))
+        candidate_skills = set(features["skills"])
+        if jd_skills:
+            overlap = candidate_skills & jd_skills
+            skills_match = {
+                "matched_skills": sorted(overlap),
+                "missing_skills": sorted(jd_skills - candidate_skills),
+                "match_percentage": len(overlap) / len(jd_skills) * 100
+            }
+        else:
+            skills_match = "No specific skills mentioned in JD"
+        return {
+            "candidate_id": features["id"],
+            "similarity_score": round(float(similarity) * 100, 2),
+            "comprehensive_score": round(float(score), 2),
+            "skills_match": skills_match,
+            "experience_years": features["experience_years"],
+            "recommendation": self.matcher._generate_recommendation(score)
+        }
+
+    def stats(self):
+        return {
+            "generation": self.generation,
+            "segments": [{"name": s.name, "rows": s.rows, "live": s.live_count()} for s in self.segments],
+            "candidates": len(self),
+            "vocabulary_size": self.manifest["columns"],
+        }
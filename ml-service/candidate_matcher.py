@@ -1,140 +1,296 @@
 import numpy as np
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
 import json
+import time
+from metrics import stage
+from nlp_loader import load_spacy_model
+from scoring import MatchScorer
+from skill_resolver import SkillResolver
+import minhash
+
+# Common technical skills looked for in job descriptions
+TECHNICAL_SKILLS = [
+    "python", "java", "javascript", "react", "angular", "vue", "node.js",
+    "express", "django", "flask", "mysql", "postgresql", "mongodb",
+    "aws", "azure", "docker", "kubernetes", "git", "jenkins"
+]
+
+# Candidates counted or formatted between deadline checks: the first chunk is
+# MIN_MATCH_CHUNK, later ones sized to fit the time left, up to MATCH_CHUNK_SIZE
+MIN_MATCH_CHUNK = 16
+MATCH_CHUNK_SIZE = 200
+# Share of the budget that counting terms leaves for building the TF-IDF matrix, scoring and formatting
+MATCH_FINISH_SHARE = 0.25
+
+EDUCATION_HIERARCHY = {
+    'high school': 1,
+    'bachelor': 2,
+    'master': 3,
+    'phd': 4
+}
 
 class CandidateMatcher:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.vectorizer = TfidfVectorizer(
-            stop_words='english',
-            max_features=1000,
-            ngram_range=(1, 2)
-        )
+    def __init__(self, fuzzy_skills=False):
+        self._vectorizer = None
+        # Default weights; per-request configs compile their own MatchScorer (see scoring.py)
+        self.scorer = MatchScorer()
+        # Typo-tolerant JD skill lookup ("Kubernates", "Postgre SQL"); None for exact matching only
+        self.skill_resolver = SkillResolver(TECHNICAL_SKILLS) if fuzzy_skills else None
+        self._fuzzy_jd_skills = {}
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first use (matching itself does not need it)"""
+        try:
+            return load_spacy_model("en_core_web_sm")
+        except OSError:
+            return None
+    
+    @property
+    def vectorizer(self):
+        """Unfitted TF-IDF template; sklearn is imported on first use"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(
+                stop_words='english',
+                max_features=1000,
+                ngram_range=(1, 2)
+            )
+        return self._vectorizer
         
-    def match(self, jd_text, candidate_resumes):
-        """Match candidates to job description"""
+    def match(self, jd_text, candidate_resumes, scorer=None, collapse_duplicates=False, filters=None, deadline=None):
+        """Match candidates to job description, scored with `scorer` (default weights if None)
+
+        Candidates failing `filters` (a skill_filter.CandidateFilter) are
+        dropped before TF-IDF, so they neither get scored nor shape the vocabulary.
+
+        With a `deadline` (deadline.Deadline), work is done in chunks: once it
+        expires the best-so-far ranking is returned and deadline.partial
+        records how many candidates were scored and returned; once it is
+        cancelled, RequestCancelled is raised.
+        """
         if not candidate_resumes:
             return []
         
+        if filters:
+            with stage("match", "filter"):
+                candidate_resumes = self._apply_filters(candidate_resumes, filters)
+            if not candidate_resumes:
+                return []
+        
+        duplicates = {}
+        if collapse_duplicates:
+            with stage("match", "dedupe"):
+                candidate_resumes, duplicates = self._collapse_duplicates(candidate_resumes)
+        
+        # Filtering or collapsing may already have used up the budget
+        if self._out_of_time(deadline):
+            deadline.mark_partial(candidates=len(candidate_resumes), scored=0, returned=0)
+            return []
+        
         # Prepare texts for vectorization
         texts = [jd_text] + [resume.get('text', '') for resume in candidate_resumes]
         
+        from sklearn.metrics.pairwise import cosine_similarity
+        
         # Create TF-IDF vectors
         try:
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
+            with stage("match", "vectorize"):
+                tfidf_matrix = self._fit_tfidf(texts, deadline)
         except ValueError:
             # Fallback if vectorization fails
             return self._fallback_matching(jd_text, candidate_resumes)
         
-        # Calculate similarities
-        jd_vector = tfidf_matrix[0:1]
-        candidate_vectors = tfidf_matrix[1:]
-        
-        similarities = cosine_similarity(jd_vector, candidate_vectors).flatten()
+        # Out of time while counting: rank the candidates counted so far
+        scored = tfidf_matrix.shape[0] - 1
+        if not scored:
+            deadline.mark_partial(candidates=len(candidate_resumes), scored=0, returned=0)
+            return []
         
-        # Create matching results
-        matches = []
-        for i, similarity in enumerate(similarities):
-            candidate = candidate_resumes[i]
-            match_score = self._calculate_comprehensive_score(
-                similarity, 
-                candidate, 
-                jd_text
-            )
+        # Calculate similarities
+        with stage("match", "similarity"):
+            jd_vector = tfidf_matrix[0:1]
+            candidate_vectors = tfidf_matrix[1:]
             
-            matches.append({
-                "candidate_id": candidate.get('id', f"candidate_{i}"),
-                "name": candidate.get('name', f"Candidate {i+1}"),
-                "similarity_score": round(similarity * 100, 2),
-                "comprehensive_score": round(match_score, 2),
-                "skills_match": self._analyze_skills_match(candidate, jd_text),
-                "experience_match": self._analyze_experience_match(candidate, jd_text),
-                "recommendation": self._generate_recommendation(match_score)
-            })
-        
-        # Sort by comprehensive score
-        matches.sort(key=lambda x: x['comprehensive_score'], reverse=True)
+            similarities = cosine_similarity(jd_vector, candidate_vectors).flatten()
+        
+        with stage("match", "bonuses"):
+            scorer = scorer or self.scorer
+            requirement_columns = self._requirement_columns([self._jd_requirements(jd_text)])
+            bonuses = scorer.bonus(self._candidate_columns(candidate_resumes[:scored]), requirement_columns)
+            scores = scorer.combine(similarities[:, None], bonuses)[:, 0]
+        
+        # Sort by comprehensive score (stable, so ties keep submission order)
+        with stage("match", "sort"):
+            keys = [round(float(score), 2) for score in scores]
+            order = sorted(range(scored), key=keys.__getitem__, reverse=True)
+        
+        # Create matching results best first, so running out of time still returns the top of the ranking
+        with stage("match", "details"):
+            matches = []
+            # The top MIN_MATCH_CHUNK are formatted even out of time, so a scored ranking is never empty
+            for start, stop in self._chunks(scored, deadline, minimum=MIN_MATCH_CHUNK):
+                for i in order[start:stop]:
+                    matches.append(self._format_match(candidate_resumes[i], i, similarities[i], scores[i], jd_text))
+                    if i in duplicates:
+                        matches[-1]["duplicates"] = duplicates[i]
+        
+        if deadline is not None and len(matches) < len(candidate_resumes):
+            deadline.mark_partial(candidates=len(candidate_resumes), scored=scored, returned=len(matches))
         
         return matches
     
-    def _calculate_comprehensive_score(self, similarity, candidate, jd_text):
-        """Calculate comprehensive matching score"""
-        base_score = similarity * 100
-        
-        # Skills bonus (up to 20 points)
-        skills_bonus = self._calculate_skills_bonus(candidate, jd_text)
-        
-        # Experience bonus (up to 15 points)
-        experience_bonus = self._calculate_experience_bonus(candidate, jd_text)
-        
-        # Education bonus (up to 10 points)
-        education_bonus = self._calculate_education_bonus(candidate, jd_text)
-        
-        # Contact info bonus (up to 5 points)
-        contact_bonus = 5 if candidate.get('email') else 0
-        
-        total_score = base_score + skills_bonus + experience_bonus + education_bonus + contact_bonus
-        
-        return min(total_score, 100)
+    def _format_match(self, candidate, i, similarity, score, jd_text):
+        """Result entry of the candidate at position i of the pool"""
+        match_score = float(score)
+        return {
+            "candidate_id": candidate.get('id', f"candidate_{i}"),
+            "name": candidate.get('name', f"Candidate {i+1}"),
+            "similarity_score": round(similarity * 100, 2),
+            "comprehensive_score": round(match_score, 2),
+            "skills_match": self._analyze_skills_match(candidate, jd_text),
+            "experience_match": self._analyze_experience_match(candidate, jd_text),
+            "recommendation": self._generate_recommendation(match_score)
+        }
     
-    def _calculate_skills_bonus(self, candidate, jd_text):
-        """Calculate skills matching bonus"""
-        candidate_skills = set(candidate.get('skills', []))
-        jd_skills = self._extract_skills_from_jd(jd_text)
-        
-        if not jd_skills:
-            return 0
-        
-        # Calculate skills overlap
-        overlap = len(candidate_skills.intersection(jd_skills))
-        total_required = len(jd_skills)
-        
-        if total_required == 0:
-            return 0
-        
-        match_percentage = overlap / total_required
+    @staticmethod
+    def _out_of_time(deadline):
+        """True once the deadline expired; raises RequestCancelled if the client went away"""
+        if deadline is None:
+            return False
+        deadline.check_cancelled()
+        return deadline.expired()
+    
+    def _chunks(self, total, deadline, minimum=0, reserve=0.0):
+        """(start, stop) ranges over `total` items, checking the deadline before each
+
+        The first chunk is the first `minimum` items, yielded without a check
+        (MIN_MATCH_CHUNK items, checked, if minimum is 0). Each later chunk is
+        sized from the previous chunk's time per item to fit the time left, and
+        at most twice the previous size, so work stops at most about one small
+        chunk past the deadline. With a `reserve` (seconds), it stops once only
+        that much time is left.
+        """
+        if deadline is None or deadline.expires_at is None:
+            for start in range(0, total, MATCH_CHUNK_SIZE):
+                if self._out_of_time(deadline):
+                    return
+                yield start, min(total, start + MATCH_CHUNK_SIZE)
+            return
+        
+        start, size = 0, minimum or MIN_MATCH_CHUNK
+        while start < total:
+            if (start or not minimum) and (self._out_of_time(deadline) or deadline.remaining() <= reserve):
+                return
+            stop = min(total, start + size)
+            began = time.perf_counter()
+            yield start, stop
+            per_item = (time.perf_counter() - began) / (stop - start)
+            fits = (deadline.remaining() - reserve) / per_item if per_item else MATCH_CHUNK_SIZE
+            size = int(min(MATCH_CHUNK_SIZE, max(MIN_MATCH_CHUNK, 2 * (stop - start)), max(MIN_MATCH_CHUNK, fits)))
+            start = stop
+    
+    def _fit_tfidf(self, texts, deadline=None):
+        """TF-IDF matrix of texts, identical to the vectorizer's fit_transform
+
+        Without a deadline this is a fresh clone's fit_transform (so concurrent
+        matches don't share fitted state). With one, terms are counted
+        in chunks (see _chunks), repeating sklearn's steps exactly, and
+        counting stops while MATCH_FINISH_SHARE of the time left remains for
+        the rest of the match; the matrix then covers only the JD and the
+        candidate texts counted so far.
+        """
+        from sklearn.base import clone
+        
+        vectorizer = clone(self.vectorizer)
+        if deadline is None:
+            return vectorizer.fit_transform(texts)
+        
+        from scipy.sparse import csr_matrix
+        from sklearn.feature_extraction.text import TfidfTransformer
+        
+        analyze = vectorizer.build_analyzer()
+        vocabulary, indices, values, indptr = {}, [], [], [0]
+        reserve = MATCH_FINISH_SHARE * (deadline.remaining() or 0.0)
+        # texts[0] is the JD, which is always counted
+        for start, stop in self._chunks(len(texts), deadline, minimum=1, reserve=reserve):
+            for text in texts[start:stop]:
+                counts = {}
+                for feature in analyze(text):
+                    column = vocabulary.setdefault(feature, len(vocabulary))
+                    counts[column] = counts.get(column, 0) + 1
+                indices.extend(counts)
+                values.extend(counts.values())
+                indptr.append(len(indices))
+        if not vocabulary:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        
+        counts = csr_matrix(
+            (np.asarray(values, dtype=np.float64), np.asarray(indices, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int32)),
+            shape=(len(indptr) - 1, len(vocabulary))
+        )
+        counts.sort_indices()
+        # Columns in alphabetical term order, then the max_features most frequent terms
+        terms = sorted(vocabulary)
+        column_map = np.empty(len(terms), dtype=counts.indices.dtype)
+        for new_column, term in enumerate(terms):
+            column_map[vocabulary[term]] = new_column
+        counts.indices = column_map.take(counts.indices, mode="clip")
+        if vectorizer.max_features is not None and len(terms) > vectorizer.max_features:
+            frequencies = np.asarray(counts.sum(axis=0)).ravel()
+            counts = counts[:, np.sort((-frequencies).argsort()[:vectorizer.max_features])]
+        return TfidfTransformer().fit_transform(counts)
+    
+    def _apply_filters(self, candidate_resumes, filters):
+        """Candidates passing a CandidateFilter, with default IDs/names pinned to their original positions"""
+        keep = filters.mask(self._candidate_columns(candidate_resumes))
+        return [
+            dict(c, id=c.get('id', f"candidate_{i}"), name=c.get('name', f"Candidate {i+1}"))
+            for i, c in enumerate(candidate_resumes) if keep[i]
+        ]
+    
+    def _collapse_duplicates(self, candidate_resumes):
+        """Keep the first submission of each near-duplicate group; map kept position -> other IDs"""
+        signatures = [
+            minhash.decode(c['minhash']) if c.get('minhash') else minhash.signature(c.get('text', ''))
+            for c in candidate_resumes
+        ]
+        # Pin default IDs/names to the original positions before the list shrinks
+        candidates = [
+            dict(c, id=c.get('id', f"candidate_{i}"), name=c.get('name', f"Candidate {i+1}"))
+            for i, c in enumerate(candidate_resumes)
+        ]
         
-        # Bonus: 20 points for 100% match, 0 for 0% match
-        return match_percentage * 20
+        kept, duplicates = [], {}
+        for group in minhash.duplicate_groups(signatures):
+            if len(group) > 1:
+                duplicates[len(kept)] = [candidates[position]['id'] for position in group[1:]]
+            kept.append(candidates[group[0]])
+        return kept, duplicates
     
     def _extract_skills_from_jd(self, jd_text):
         """Extract skills mentioned in job description"""
-        # Common technical skills
-        technical_skills = [
-            "python", "java", "javascript", "react", "angular", "vue", "node.js",
-            "express", "django", "flask", "mysql", "postgresql", "mongodb",
-            "aws", "azure", "docker", "kubernetes", "git", "jenkins"
-        ]
-        
         found_skills = []
         jd_lower = jd_text.lower()
         
-        for skill in technical_skills:
+        for skill in TECHNICAL_SKILLS:
             if skill in jd_lower:
                 found_skills.append(skill)
         
+        if self.skill_resolver is not None:
+            found_skills.extend(self._fuzzy_skills_from_jd(jd_text))
+        
         return set(found_skills)
     
-    def _calculate_experience_bonus(self, candidate, jd_text):
-        """Calculate experience matching bonus"""
-        candidate_exp = candidate.get('experience_years', 0)
-        required_exp = self._extract_required_experience(jd_text)
-        
-        if required_exp == 0:
-            return 0
-        
-        if candidate_exp >= required_exp:
-            # Bonus for meeting or exceeding requirements
-            return 15
-        elif candidate_exp >= required_exp * 0.7:
-            # Partial bonus for close match
-            return 10
-        else:
-            # No bonus for insufficient experience
-            return 0
+    def _fuzzy_skills_from_jd(self, jd_text):
+        """Skills resolved from misspellings; memoized per JD since match() asks once per candidate"""
+        skills = self._fuzzy_jd_skills.get(jd_text)
+        if skills is None:
+            if len(self._fuzzy_jd_skills) >= 256:
+                self._fuzzy_jd_skills.clear()
+            skills = self._fuzzy_jd_skills[jd_text] = self.skill_resolver.find(jd_text)
+        return skills
     
     def _extract_required_experience(self, jd_text):
         """Extract required experience from job description"""
@@ -153,37 +309,13 @@ class CandidateMatcher:
         
         return 0
     
-    def _calculate_education_bonus(self, candidate, jd_text):
-        """Calculate education matching bonus"""
-        candidate_education = candidate.get('education_level', '').lower()
-        jd_education = self._extract_required_education(jd_text)
-        
-        if not jd_education:
-            return 0
-        
-        education_hierarchy = {
-            'high school': 1,
-            'bachelor': 2,
-            'master': 3,
-            'phd': 4
-        }
-        
-        candidate_level = 0
-        for level, value in education_hierarchy.items():
-            if level in candidate_education:
-                candidate_level = value
-                break
-        
-        required_level = 0
-        for level, value in education_hierarchy.items():
-            if level in jd_education.lower():
-                required_level = value
-                break
-        
-        if candidate_level >= required_level:
-            return 10
-        else:
-            return 0
+    def _education_level(self, education_text):
+        """Map free-text education to its rank in the education hierarchy"""
+        education_lower = education_text.lower()
+        for level, value in EDUCATION_HIERARCHY.items():
+            if level in education_lower:
+                return value
+        return 0
     
     def _extract_required_education(self, jd_text):
         """Extract required education from job description"""
@@ -234,6 +366,59 @@ class CandidateMatcher:
             "gap": required_exp - candidate_exp
         }
     
+    def _jd_requirements(self, jd_text):
+        """Extract the JD requirements used by the bonus terms"""
+        jd_education = self._extract_required_education(jd_text)
+        return {
+            "skills": self._extract_skills_from_jd(jd_text),
+            "experience": self._extract_required_experience(jd_text),
+            # -1 means the JD has no education requirement (no bonus at all)
+            "education": self._education_level(jd_education) if jd_education else -1
+        }
+    
+    def _requirement_columns(self, requirements):
+        """Stack JD requirements into arrays with one row per job description"""
+        skill_ids = {skill: i for i, skill in enumerate(TECHNICAL_SKILLS)}
+        skills = np.zeros((len(requirements), len(TECHNICAL_SKILLS)), dtype=np.float32)
+        for row, requirement in enumerate(requirements):
+            for skill in requirement["skills"]:
+                skills[row, skill_ids[skill]] = 1
+        
+        return {
+            "skills": skills,
+            "skill_count": skills.sum(axis=1),
+            "experience": np.array([r["experience"] for r in requirements], dtype=np.float32),
+            "education": np.array([r["education"] for r in requirements], dtype=np.int8)
+        }
+    
+    def _candidate_columns(self, candidates):
+        """Build candidate feature columns for vectorized bonus computation"""
+        skill_ids = {skill: i for i, skill in enumerate(TECHNICAL_SKILLS)}
+        skills = np.zeros((len(candidates), len(TECHNICAL_SKILLS)), dtype=np.float32)
+        experience = np.zeros(len(candidates))
+        education = np.zeros(len(candidates), dtype=np.int8)
+        has_email = np.zeros(len(candidates), dtype=bool)
+        
+        for row, candidate in enumerate(candidates):
+            for skill in candidate.get('skills') or []:
+                column = skill_ids.get(skill)
+                if column is not None:
+                    skills[row, column] = 1
+            experience[row] = candidate.get('experience_years') or 0
+            education[row] = self._education_level(candidate.get('education_level') or '')
+            has_email[row] = bool(candidate.get('email'))
+        
+        return {
+            "skills": skills,
+            "experience": experience,
+            "education": education,
+            "has_email": has_email
+        }
+    
+    def _bonus_matrix(self, candidate_columns, requirement_columns, scorer=None):
+        """Bonus points for every (candidate, JD) pair under a scoring config (default weights if None)"""
+        return (scorer or self.scorer).bonus(candidate_columns, requirement_columns)
+    
     def _generate_recommendation(self, score):
         """Generate recommendation based on score"""
         if score >= 90:
@@ -0,0 +1,195 @@
+"""
+Cheap-prefilter / expensive-rerank cascade.
+
+The whole pool is ranked with the local CandidateMatcher scoring; only the
+top-K, plus any candidate within `margin` points of the K-th local score, is
+sent to an expensive scorer (an LLM analysis, typically). Forwarded candidates
+are re-ordered by the expensive score and placed ahead of the rest, which
+keep their local order.
+
+Expensive scores are cached by (scorer, resume hash, JD hash), so re-running
+a vacancy or re-submitting a resume does not pay for the same call twice.
+
+Scorers implement `name` and `async score(resume_text, jd_text) -> dict` with
+an "overall" score on 0-100:
+
+- StubScorer: deterministic local scores after a fixed delay (tests, load tests)
+- HttpScorer: POSTs {"resume_text", "jd_text"} to a URL; accepts the backend's
+  analyzeResume result ({"analysis": {"scores": {"overall"}}}) or a bare
+  {"scores": {"overall"}} / {"overall"}
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+
+from coalescing import SingleFlight, content_key
+from metrics import CASCADE_CANDIDATES, record_cache, stage
+
+
+class StubScorer:
+    """Local stand-in for an expensive scorer; scores are a stable function of the texts"""
+
+    name = "stub"
+
+    def __init__(self, latency_seconds=0.0):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    async def score(self, resume_text, jd_text):
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        digest = content_key(resume_text, jd_text)
+        return {"overall": round(int(digest[:8], 16) / 0xFFFFFFFF * 100, 2)}
+
+
+class HttpScorer:
+    """Expensive scorer behind an HTTP endpoint"""
+
+    def __init__(self, url, timeout_seconds=60.0):
+        self.url = url
+        self.name = url
+        self.timeout_seconds = timeout_seconds
+        self._client = None
+
+    async def score(self, resume_text, jd_text):
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+        response = await self._client.post(self.url, json={"resume_text": resume_text, "jd_text": jd_text})
+        response.raise_for_status()
+        body = response.json()
+
+        analysis = body.get("analysis", body)
+        overall = analysis.get("scores", analysis).get("overall")
+        if overall is None:
+            raise ValueError(f"Expensive scorer response has no overall score: {str(body)[:200]}")
+        return dict(analysis, overall=float(overall))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def build_scorer(spec, timeout_seconds=60.0, stub_latency_seconds=0.0):
+    """Scorer from a CASCADE_SCORER value: 'stub' or an http(s) URL"""
+    if not spec or spec == "stub":
+        return StubScorer(latency_seconds=stub_latency_seconds)
+    if spec.startswith(("http://", "https://")):
+        return HttpScorer(spec, timeout_seconds=timeout_seconds)
+    raise ValueError(f"Unknown cascade scorer '{spec}'; use 'stub' or an http(s) URL")
+
+
+class ExpensiveScoreCache:
+    """LRU of expensive scorer responses keyed by (scorer, resume hash, JD hash)"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            record_cache("cascade", result is not None)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Cascade:
+    def __init__(self, scorer, cache=None, max_concurrency=4):
+        self.scorer = scorer
+        self.cache = cache if cache is not None else ExpensiveScoreCache()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight = SingleFlight("cascade")
+
+    @staticmethod
+    def forwarded_count(matches, top_k, margin):
+        """How many of the locally ranked matches go to the expensive scorer"""
+        if not matches or top_k < 1:
+            return 0
+        cutoff = matches[min(top_k, len(matches)) - 1]["comprehensive_score"] - margin
+        count = min(top_k, len(matches))
+        while count < len(matches) and matches[count]["comprehensive_score"] >= cutoff:
+            count += 1
+        return count
+
+    async def rerank(self, jd_text, candidates, matches, top_k=10, margin=0.0):
+        """Re-order locally ranked `matches` of `candidates`; returns (matches, stats)"""
+        texts = {
+            str(candidate.get('id', f"candidate_{i}")): candidate.get('text') or ''
+            for i, candidate in enumerate(candidates)
+        }
+        forwarded = self.forwarded_count(matches, top_k, margin)
+        jd_hash = content_key(jd_text)
+
+        stats = {"pool": len(candidates), "ranked": len(matches), "forwarded": forwarded,
+                 "cache_hits": 0, "expensive_calls": 0, "shared_calls": 0, "failed": 0}
+
+        async def score(match):
+            resume_text = texts.get(str(match["candidate_id"]), '')
+            key = (self.scorer.name, content_key(resume_text), jd_hash)
+            result = self.cache.get(key)
+            if result is not None:
+                stats["cache_hits"] += 1
+                return result
+            started = False
+            
+            def start():
+                nonlocal started
+                started = True
+                return self._call(key, resume_text, jd_text)
+            
+            try:
+                # Identical resumes in flight (same request or concurrent ones) share one call
+                return await self._inflight.do(content_key(*key), start)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"⚠️ Expensive scorer failed for {match['candidate_id']}: {e}")
+                return None
+            finally:
+                # Every call this request waited on counts, including ones another request started
+                stats["expensive_calls"] += 1
+                if not started:
+                    stats["shared_calls"] += 1
+
+        with stage("cascade", "expensive"):
+            results = await asyncio.gather(*(score(match) for match in matches[:forwarded]))
+
+        head = []
+        for match, result in zip(matches[:forwarded], results):
+            match = dict(match, expensive_score=None if result is None else result["overall"])
+            if result is not None:
+                match["expensive_analysis"] = result
+            head.append(match)
+        # Failed calls fall back to the local score, below every expensively scored match
+        head.sort(key=lambda m: (m["expensive_score"] is not None, m["expensive_score"] or 0, m["comprehensive_score"]),
+                  reverse=True)
+
+        stats["avoided_calls"] = stats["pool"] - forwarded
+        CASCADE_CANDIDATES.inc(self.scorer.name, "failed", amount=stats["failed"])
+        CASCADE_CANDIDATES.inc(self.scorer.name, "cached", amount=stats["cache_hits"])
+        CASCADE_CANDIDATES.inc(self.scorer.name, "avoided", amount=stats["pool"] - forwarded)
+        return head + matches[forwarded:], stats
+
+    async def _call(self, key, resume_text, jd_text):
+        async with self._semaphore:
+            # Counted once per call made, however many requests share it
+            CASCADE_CANDIDATES.inc(self.scorer.name, "called")
+            result = await self.scorer.score(resume_text, jd_text)
+        self.cache.put(key, result)
+        return result
@@ -0,0 +1,54 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+Concurrent calls with the same key await one computation and share its
+result (or exception). The key is dropped as soon as the computation
+finishes, so this deduplicates bursts and retries without caching results.
+"""
+
+import asyncio
+import hashlib
+
+from metrics import COALESCED_REQUESTS
+
+
+def content_key(*parts):
+    """Stable hash of request content"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, group):
+        self.group = group
+        self._inflight = {}
+
+    async def do(self, key, fn):
+        """Await fn() once per key; callers arriving while it runs share the result"""
+        task = self._inflight.get(key)
+        if task is None:
+            COALESCED_REQUESTS.inc(self.group, "leader")
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            COALESCED_REQUESTS.inc(self.group, "follower")
+
+        # Shielded so one disconnecting client does not cancel the work others wait on
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def in_flight(self):
+        return len(self._inflight)
+
+    def deduplicated(self):
+        """Requests that were served by another request's computation"""
+        return COALESCED_REQUESTS.value(self.group, "follower")
@@ -0,0 +1,82 @@
+"""
+Per-request deadlines and cancellation.
+
+The caller sends its remaining time budget in the X-Request-Timeout-Ms
+header (relative, so client and server clocks need not agree). The budget
+starts when the endpoint builds the Deadline, after the request body was
+received and parsed, so that time is not counted. The Deadline is passed
+down to CandidateMatcher.match and ResumeAnalyzer.analyze, which check it
+between chunks of work:
+
+- once it expires, match stops and returns the best-so-far ranking of the
+  candidates scored so far (recording what it skipped in `partial`), while
+  analyze raises DeadlineExceeded since half an analysis is not useful
+- once it is cancelled (the client disconnected), the next check raises
+  RequestCancelled, so the worker thread is freed instead of finishing
+  work nobody will read
+"""
+
+import threading
+import time
+
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before the work finished"""
+
+
+class RequestCancelled(Exception):
+    """The client went away; the work should stop"""
+
+
+class Deadline:
+    def __init__(self, timeout_seconds=None):
+        self.expires_at = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+        self._cancelled = threading.Event()
+        # Set by the work when it returned early: what was done out of what was asked
+        self.partial = None
+
+    @classmethod
+    def from_headers(cls, headers):
+        """Deadline from X-Request-Timeout-Ms, or one that never expires without the header"""
+        value = headers.get(DEADLINE_HEADER)
+        if value is None:
+            return cls()
+        try:
+            milliseconds = float(value)
+        except ValueError:
+            raise ValueError(f"{DEADLINE_HEADER} must be a number of milliseconds, got {value!r}")
+        if not milliseconds > 0:
+            raise ValueError(f"{DEADLINE_HEADER} must be positive, got {value!r}")
+        return cls(milliseconds / 1000)
+
+    def remaining(self):
+        """Seconds left, or None without a deadline"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Make the next check raise RequestCancelled (safe to call from another thread)"""
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise RequestCancelled("Client disconnected")
+
+    def check(self, during="request"):
+        """Raise RequestCancelled or DeadlineExceeded if the work should stop"""
+        self.check_cancelled()
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded during {during}")
+
+    def mark_partial(self, **progress):
+        self.partial = progress
@@ -1,13 +1,17 @@
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-import spacy
 import json
+from metrics import stage
+from nlp_loader import load_spacy_model
 
 class JDAnalyzer:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
         self.requirement_keywords = self._load_requirement_keywords()
         self.seniority_indicators = self._load_seniority_indicators()
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first use"""
+        return load_spacy_model("en_core_web_sm")
         
     def _load_requirement_keywords(self):
         """Load keywords for different requirement categories"""
@@ -28,20 +32,23 @@ class JDAnalyzer:
             "management": ["manager", "director", "head", "vp", "cto", "ceo"]
         }
     
-    def analyze(self, jd_text):
-        """Analyze job description and extract key information"""
-        doc = self.nlp(jd_text.lower())
-        
-        analysis = {
-            "overall_complexity": 0,
-            "required_skills": self._extract_required_skills(doc),
-            "experience_requirements": self._extract_experience_requirements(jd_text),
-            "seniority_level": self._determine_seniority_level(jd_text),
-            "key_responsibilities": self._extract_responsibilities(jd_text),
-            "qualifications": self._extract_qualifications(jd_text),
-            "company_culture": self._analyze_company_culture(jd_text),
-            "difficulty_score": 0
-        }
+    def analyze(self, jd_text, doc=None):
+        """Analyze job description and extract key information; `doc` is a pre-parsed spaCy doc of jd_text.lower()"""
+        if doc is None:
+            with stage("jd", "spacy"):
+                doc = self.nlp(jd_text.lower())
+        
+        with stage("jd", "requirements"):
+            analysis = {
+                "overall_complexity": 0,
+                "required_skills": self._extract_required_skills(doc),
+                "experience_requirements": self._extract_experience_requirements(jd_text),
+                "seniority_level": self._determine_seniority_level(jd_text),
+                "key_responsibilities": self._extract_responsibilities(jd_text),
+                "qualifications": self._extract_qualifications(jd_text),
+                "company_culture": self._analyze_company_culture(jd_text),
+                "difficulty_score": 0
+            }
         
         # Calculate difficulty score
         analysis["difficulty_score"] = self._calculate_difficulty_score(analysis)
@@ -174,38 +181,6 @@ class JDAnalyzer:
         return min(base_score, 100)
 
 
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
-import json
-
-class CandidateMatcher:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.vectorizer = TfidfVectorizer(
-            stop_words='english',
-            max_features=1000,
-            ngram_range=(1, 2)
-        )
-        
-    def match(self, jd_text, candidate_resumes):
-        """Match candidates to job description"""
-        if not candidate_resumes:
-            return []
-        
-        # Prepare texts for vectorization
-        texts = [jd_text] + [resume.get('text', '') for resume in candidate_resumes]
-        
-        # Create TF-IDF vectors
-        try:
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-        except ValueError:
-            # Fallback if vectorization fails
-            return self._fallback_matching(jd_text, candidate_resumes)
-        
-        # Calculate similarities
-        jd_vector = tfidf_matrix[0:1]
-        candidate_vectors = tfidf_matrix[1:]
-        
 
+# CandidateMatcher used to be duplicated here; keep the old import path working
+from candidate_matcher import CandidateMatcher  # noqa: E402,F401
@@ -0,0 +1,269 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock,
+so recording a sample costs about a microsecond and can stay on in production.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds (Prometheus client defaults plus a sub-millisecond bucket)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_sample(labels, value))
+        return lines
+
+    def _render_sample(self, labels, value):
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, plus sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self, *labels):
+        """Return (count, sum) for one label set"""
+        state = self._values.get(self._key(labels))
+        if state is None:
+            return 0, 0.0
+        return state[2], state[1]
+
+    def _render_sample(self, labels, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            lines.append(
+                f"{self.name}_bucket{_format_labels(self.labelnames, labels, ('le', _format_value(bound)))} {cumulative}"
+            )
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """Register a callable run before each scrape, e.g. to refresh gauges"""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "ml_http_requests_total", "HTTP requests by endpoint and status code", ("method", "endpoint", "status")
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    "ml_http_request_duration_seconds", "HTTP request latency by endpoint", ("method", "endpoint")
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "ml_http_requests_in_progress", "HTTP requests currently being served"
+)
+STAGE_LATENCY = REGISTRY.histogram(
+    "ml_stage_duration_seconds", "Time spent in each pipeline stage", ("pipeline", "stage")
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "ml_cache_requests_total", "Cache lookups by cache name and result (hit/miss)", ("cache", "result")
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "ml_cache_hit_ratio", "Lifetime hit ratio per cache", ("cache",)
+)
+EXECUTOR_QUEUE_DEPTH = REGISTRY.gauge(
+    "ml_executor_queue_depth", "Tasks submitted to the analysis executor but not yet started"
+)
+EXECUTOR_ACTIVE = REGISTRY.gauge(
+    "ml_executor_active_tasks", "Tasks currently running on the analysis executor"
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "ml_batch_size", "Items per dispatched micro-batch", ("batcher",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+BATCH_WAIT = REGISTRY.histogram(
+    "ml_batch_wait_seconds", "Time an item waited in a micro-batcher before its batch was dispatched", ("batcher",)
+)
+RESUME_REJECTIONS = REGISTRY.counter(
+    "ml_resume_rejections_total", "Resumes rejected as invalid, by screening tier (sniff/head/full) and reason",
+    ("tier", "reason")
+)
+RESUME_REJECT_LATENCY = REGISTRY.histogram(
+    "ml_resume_reject_duration_seconds", "Time from receiving a resume to rejecting it, by screening tier", ("tier",)
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "ml_coalesced_requests_total",
+    "Requests by single-flight group and role (leader computed, follower shared a leader's result)",
+    ("group", "role")
+)
+CASCADE_CANDIDATES = REGISTRY.counter(
+    "ml_cascade_candidates_total",
+    "Cascade candidates by expensive scorer and outcome (called, failed, cached, avoided: ranked out locally)",
+    ("scorer", "outcome")
+)
+RANKING_CACHE_EVENTS = REGISTRY.counter(
+    "ml_ranking_cache_events_total",
+    "Ranking cache lookups by outcome (hit, update: changed applicants rescored, miss, rebuild) and entries "
+    "invalidated or evicted",
+    ("event",)
+)
+DEADLINE_OUTCOMES = REGISTRY.counter(
+    "ml_deadline_outcomes_total",
+    "Requests cut short, by endpoint and outcome (partial: best-so-far returned, exceeded, cancelled: client disconnected)",
+    ("endpoint", "outcome")
+)
+
+
+def _refresh_cache_hit_ratio():
+    totals = {}
+    with CACHE_REQUESTS._lock:
+        for (cache, result), count in CACHE_REQUESTS._values.items():
+            hits, lookups = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (count if result == "hit" else 0), lookups + count)
+    for cache, (hits, lookups) in totals.items():
+        CACHE_HIT_RATIO.set(hits / lookups if lookups else 0, cache)
+
+
+REGISTRY.add_collector(_refresh_cache_hit_ratio)
+
+
+def stage(pipeline, name):
+    """Context manager timing one stage of a pipeline"""
+    return STAGE_LATENCY.time(pipeline, name)
+
+
+def record_cache(cache, hit):
+    """Count a cache lookup as a hit or a miss"""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def record_rejection(tier, reason, seconds):
+    """Count a rejected resume and how long it took to reject"""
+    RESUME_REJECTIONS.inc(tier, reason)
+    RESUME_REJECT_LATENCY.observe(seconds, tier)
@@ -0,0 +1,208 @@
+"""
+MinHash signatures and an LSH index for near-duplicate resumes.
+
+A signature is NUM_PERM minimum hashes over the resume's word 3-shingles;
+the fraction of equal positions in two signatures estimates the Jaccard
+similarity of their shingle sets. NearDuplicateIndex splits signatures into
+BANDS bands of ROWS values: two resumes become candidates when any band is
+identical (likely above ~0.5 similarity with 16x4), and candidates are kept
+when their estimated similarity reaches the threshold (default 0.8).
+Texts without any words get EMPTY_SIGNATURE, which is never indexed and
+matches nothing, so textless resumes are not all duplicates of each other.
+
+Band keys are kept in sorted NumPy arrays per band (plus a small unsorted
+tail of recent inserts), so a lookup is BANDS binary searches and a million
+signatures take a few hundred MB rather than millions of Python objects.
+"""
+
+import base64
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 31) - 1
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[+#.][a-z0-9+#]*)?")
+
+_rng = np.random.RandomState(20240601)
+# Fixed permutations so signatures are comparable across processes and restarts
+PERM_A = _rng.randint(1, MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+PERM_B = _rng.randint(0, MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+BAND_MULTIPLIERS = (_rng.randint(1, 1 << 62, size=ROWS, dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+
+# Hashes are reduced modulo the prime, so no text with shingles reaches this value
+EMPTY_SIGNATURE = np.full(NUM_PERM, MERSENNE_PRIME, dtype=np.uint32)
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the distinct word 3-shingles of a text"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint32 values) of a text; EMPTY_SIGNATURE when it has no words"""
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return EMPTY_SIGNATURE.copy()
+    # a*h + b < 2^63 for 31-bit a, b and 32-bit h, so uint64 never overflows
+    permuted = (PERM_A[:, None] * hashes[None, :] + PERM_B[:, None]) % MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def encode(sig):
+    """Compact string form of a signature for JSON responses"""
+    return base64.b64encode(np.asarray(sig, dtype="<u4").tobytes()).decode("ascii")
+
+
+def decode(value):
+    """Signature from encode() output; raises ValueError when malformed"""
+    try:
+        sig = np.frombuffer(base64.b64decode(value, validate=True), dtype="<u4")
+    except (TypeError, ValueError):
+        raise ValueError("Malformed minhash signature")
+    if len(sig) != NUM_PERM:
+        raise ValueError(f"A minhash signature has {NUM_PERM} values, got {len(sig)}")
+    return sig.astype(np.uint32)
+
+
+def is_empty(signatures):
+    """Whether each signature (or the single one given) is EMPTY_SIGNATURE"""
+    return (np.asarray(signatures) == MERSENNE_PRIME).all(axis=-1)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures (0 if either text had no words)"""
+    if is_empty(a) or is_empty(b):
+        return 0.0
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def band_keys(signatures):
+    """(n, BANDS) uint64 bucket keys of (n, NUM_PERM) signatures"""
+    signatures = np.asarray(signatures, dtype=np.uint64).reshape(-1, BANDS, ROWS)
+    # Wrapping multiply-add over the band's values; equal bands give equal keys
+    return (signatures * BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures with ids; re-adding an id replaces its signature"""
+
+    def __init__(self, threshold=0.8, capacity=1024, min_tail=4096):
+        self.threshold = threshold
+        self.min_tail = min_tail
+        self.ids = []
+        self._rows = {}
+        self._signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        self._keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._count = 0
+        self._sorted_count = 0
+        self._sorted_keys = [np.zeros(0, dtype=np.uint64) for _ in range(BANDS)]
+        self._sorted_rows = [np.zeros(0, dtype=np.int64) for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, item_id, sig):
+        self.add_many([item_id], np.asarray(sig)[None, :])
+
+    def add_many(self, item_ids, signatures):
+        """Add signatures without querying (bulk load)"""
+        signatures = np.asarray(signatures, dtype=np.uint32).reshape(-1, NUM_PERM)
+        end = self._count + len(signatures)
+        if end > len(self._signatures):
+            capacity = max(end, 2 * len(self._signatures))
+            self._signatures = self._grow(self._signatures, capacity)
+            self._keys = self._grow(self._keys, capacity)
+            self._live = self._grow(self._live, capacity)
+        self._signatures[self._count:end] = signatures
+        self._keys[self._count:end] = band_keys(signatures)
+        # Empty signatures keep their id (so it can be replaced or removed) but are never matched
+        self._live[self._count:end] = ~is_empty(signatures)
+        for row, item_id in enumerate(item_ids, start=self._count):
+            replaced = self._rows.get(item_id)
+            if replaced is not None:
+                self._live[replaced] = False
+            self._rows[item_id] = row
+        self.ids.extend(item_ids)
+        self._count = end
+        # Re-sort once the tail is large relative to the index (amortised O(log n) per insert)
+        if self._count - self._sorted_count > max(self.min_tail, self._sorted_count // 8):
+            self._sort()
+
+    def remove(self, item_ids):
+        for item_id in item_ids:
+            row = self._rows.pop(item_id, None)
+            if row is not None:
+                self._live[row] = False
+
+    def query(self, sig, exclude=None):
+        """[(id, estimated similarity)] of indexed signatures at or above the threshold, best first"""
+        sig = np.asarray(sig, dtype=np.uint32)
+        if is_empty(sig):
+            return []
+        keys = band_keys(sig[None, :])[0]
+
+        rows = [np.flatnonzero((self._keys[self._sorted_count:self._count] == keys).any(axis=1)) + self._sorted_count]
+        for band in range(BANDS):
+            sorted_keys = self._sorted_keys[band]
+            lo = np.searchsorted(sorted_keys, keys[band], side="left")
+            hi = np.searchsorted(sorted_keys, keys[band], side="right")
+            if hi > lo:
+                rows.append(self._sorted_rows[band][lo:hi])
+        rows = np.unique(np.concatenate(rows))
+        rows = rows[self._live[rows]]
+        if not len(rows):
+            return []
+
+        scores = (self._signatures[rows] == sig).mean(axis=1)
+        keep = scores >= self.threshold
+        matches = sorted(zip(rows[keep].tolist(), scores[keep].tolist()), key=lambda item: -item[1])
+        return [(self.ids[row], round(score, 3)) for row, score in matches if self.ids[row] != exclude]
+
+    def add_and_query(self, item_id, sig):
+        """Near-duplicates of a new signature among those already indexed, then index it"""
+        duplicates = self.query(sig)
+        self.add(item_id, sig)
+        return duplicates
+
+    def _sort(self):
+        keys = self._keys[:self._count]
+        for band in range(BANDS):
+            order = np.argsort(keys[:, band], kind="stable")
+            self._sorted_keys[band] = keys[order, band]
+            self._sorted_rows[band] = order
+        self._sorted_count = self._count
+
+    @staticmethod
+    def _grow(array, capacity):
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+
+def duplicate_groups(signatures, threshold=0.8):
+    """Group positions of near-duplicate signatures; every group lists its first position first"""
+    index = NearDuplicateIndex(threshold=threshold, capacity=max(1, len(signatures)))
+    representative = list(range(len(signatures)))
+    for position, sig in enumerate(signatures):
+        matches = index.query(sig)
+        if matches:
+            # Join the group of the earliest matching submission
+            representative[position] = representative[min(row for row, _ in matches)]
+        index.add(position, sig)
+
+    groups = {}
+    for position, root in enumerate(representative):
+        groups.setdefault(root, []).append(position)
+    return list(groups.values())
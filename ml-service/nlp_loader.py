@@ -0,0 +1,29 @@
+"""
+Process-wide spaCy model cache.
+
+spaCy (and the model itself) is only imported on first use, and every
+analyzer shares the same pipeline instead of loading its own copy.
+"""
+
+import threading
+
+_lock = threading.Lock()
+_models = {}
+
+
+def load_spacy_model(name="en_core_web_sm"):
+    """Load a spaCy pipeline once per process; raises OSError if the model is not installed"""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _models:
+            import spacy
+            _models[name] = spacy.load(name)
+        return _models[name]
+
+
+def loaded_models():
+    """Names of the pipelines loaded so far"""
+    return list(_models)
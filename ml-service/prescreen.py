@@ -0,0 +1,155 @@
+"""
+Cheap tiered pre-screen for uploaded resumes.
+
+Tier 1 ("sniff") looks only at the raw bytes: known non-document magic
+numbers (images, archives, executables), content that does not match its
+extension and, for text files, the printable-character ratio. Tier 2
+("head") extracts just the first PRESCREEN_HEAD_KB of text (the first
+PRESCREEN_PAGES pages of a PDF) and runs the resume validity check on it.
+Full extraction and spaCy only run for uploads that pass both; whatever
+slips through is still caught by the full check in ResumeAnalyzer.analyze
+("full" tier).
+"""
+
+import io
+import os
+
+NON_TECH_INDICATORS = [
+    "recipe", "cooking", "ingredients", "tablespoon", "teaspoon", "bake", "fry",
+    "menu", "restaurant", "dish", "cuisine", "chef", "kitchen",
+    "fiction", "chapter", "novel", "story", "once upon a time",
+    "lyrics", "verse", "chorus", "song"
+]
+
+RESUME_INDICATORS = [
+    "experience", "education", "skills", "work", "job", "project",
+    "university", "college", "degree", "company", "position", "role",
+    "email", "@", "phone", "linkedin", "github", "objective", "summary"
+]
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+RTF_MAGIC = b"{\\rtf"
+
+# Formats that are never a resume, whatever the file is called
+JUNK_MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", "PNG image"),
+    (b"\xff\xd8\xff", "JPEG image"),
+    (b"GIF87a", "GIF image"),
+    (b"GIF89a", "GIF image"),
+    (b"\x7fELF", "executable"),
+    (b"\x1f\x8b", "gzip archive"),
+    (b"7z\xbc\xaf\x27\x1c", "7z archive"),
+    (b"Rar!\x1a\x07", "RAR archive"),
+    (b"ID3", "audio file"),
+    (b"OggS", "audio file"),
+]
+
+
+def is_windows_executable(content):
+    """A DOS/PE executable: "MZ" alone also starts ordinary text, so the PE header it points to must be there too"""
+    if not content.startswith(b"MZ") or len(content) < 0x40:
+        return False
+    offset = int.from_bytes(content[0x3c:0x40], "little")
+    return content[offset:offset + 4] == b"PE\x00\x00"
+
+
+class ResumeRejected(ValueError):
+    """A document rejected as not being a usable resume; `tier` names the check that rejected it"""
+
+    def __init__(self, message, tier, reason):
+        super().__init__(message)
+        self.tier = tier
+        self.reason = reason
+
+
+def find_indicators(text_lower, indicators, enough=None):
+    """Indicators occurring in the text, stopping once `enough` were found"""
+    found = []
+    for indicator in indicators:
+        if indicator in text_lower:
+            found.append(indicator)
+            if enough is not None and len(found) >= enough:
+                break
+    return found
+
+
+class Prescreener:
+    def __init__(self):
+        self.head_bytes = int(float(os.getenv("PRESCREEN_HEAD_KB", "16")) * 1024)
+        self.pages = int(os.getenv("PRESCREEN_PAGES", "2"))
+        self.min_printable = float(os.getenv("PRESCREEN_MIN_PRINTABLE", "0.85"))
+
+    def sniff(self, content, filename):
+        """Tier 1: reject from the raw bytes alone"""
+        if not content:
+            raise ResumeRejected("The uploaded file is empty.", "sniff", "empty")
+
+        kind = next((kind for magic, kind in JUNK_MAGIC if content.startswith(magic)), None)
+        if kind is None and is_windows_executable(content):
+            kind = "executable"
+        if kind is not None:
+            raise ResumeRejected(
+                f"The uploaded file is a {kind}, not a resume. Please upload a PDF, DOC, DOCX, or TXT file.",
+                "sniff", "binary"
+            )
+
+        extension = os.path.splitext(filename or "")[1].lower()
+        if extension == ".pdf" and PDF_MAGIC not in content[:1024]:
+            raise ResumeRejected("The uploaded file is not a valid PDF document.", "sniff", "mismatch")
+        if extension == ".docx" and not content.startswith(ZIP_MAGIC):
+            raise ResumeRejected("The uploaded file is not a valid DOCX document.", "sniff", "mismatch")
+
+        if extension in (".pdf", ".docx") or content.startswith((OLE_MAGIC, RTF_MAGIC)):
+            return
+
+        sample = content[:self.head_bytes]
+        if b"\x00" in sample:
+            raise ResumeRejected("The uploaded file contains binary data, not resume text.", "sniff", "binary")
+        text = sample.decode("utf-8", errors="replace")
+        printable = sum(1 for ch in text if ch.isprintable() or ch.isspace())
+        if printable / len(text) < self.min_printable:
+            raise ResumeRejected("The uploaded file does not contain readable text.", "sniff", "unprintable")
+
+    def head_text(self, content, filename):
+        """Tier 2 input: (text of the first pages / KB, whether that is the whole document)"""
+        extension = os.path.splitext(filename or "")[1].lower()
+        if extension == ".pdf":
+            import PyPDF2
+
+            try:
+                reader = PyPDF2.PdfReader(io.BytesIO(content))
+                pages = reader.pages
+                text = "\n".join(pages[i].extract_text() or "" for i in range(min(self.pages, len(pages))))
+            except Exception:
+                raise ResumeRejected(
+                    "The PDF could not be read. Please upload an unencrypted, uncorrupted file.", "head", "unreadable"
+                )
+            return text[:self.head_bytes], len(pages) <= self.pages and len(text) <= self.head_bytes
+
+        if extension == ".docx":
+            paragraphs, complete = docx_paragraphs(content, limit=self.head_bytes)
+            return "\n".join(paragraphs), complete
+
+        return content[:self.head_bytes].decode("utf-8", errors="ignore"), len(content) <= self.head_bytes
+
+
+def docx_paragraphs(content, limit=None):
+    """Paragraph texts of a DOCX (up to about `limit` characters) and whether all were read"""
+    import docx
+
+    try:
+        document = docx.Document(io.BytesIO(content))
+    except Exception:
+        raise ResumeRejected(
+            "The DOCX file could not be read. Please upload an uncorrupted file.", "head", "unreadable"
+        )
+
+    paragraphs, size = [], 0
+    for paragraph in document.paragraphs:
+        if limit is not None and size >= limit:
+            return paragraphs, False
+        paragraphs.append(paragraph.text)
+        size += len(paragraph.text) + 1
+    return paragraphs, True
@@ -0,0 +1,179 @@
+"""
+Opt-in request profiling and slow-request capture.
+
+Enable with PROFILING_ENABLED=1. A request is profiled with cProfile when it
+sends the `X-Profile: 1` header or is picked by PROFILE_SAMPLE_RATE (0-1).
+Any request slower than PROFILE_SLOW_MS (and every header-forced request)
+writes `<id>.json` with its input fingerprint and timings, plus `<id>.prof`
+(load with `python -m pstats` or snakeviz) when it was profiled, into
+PROFILE_DIR.
+"""
+
+import cProfile
+import hashlib
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def _env_flag(name, default="0"):
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+
+class ProfiledRequest:
+    """Profiling state for one request"""
+
+    def __init__(self, profiler, endpoint, sampled, forced):
+        self.profiler = profiler
+        self.endpoint = endpoint
+        self.sampled = sampled
+        self.forced = forced
+        self.profile = cProfile.Profile() if sampled else None
+        self.profiled = False
+        self.started = time.perf_counter()
+        self.input = None
+        self.input_meta = {}
+
+    def set_input(self, data, **meta):
+        """Remember the request input so slow requests can be fingerprinted"""
+        self.input = data
+        self.input_meta = meta
+
+    def wrap(self, fn):
+        """Wrap a blocking callable so it runs under this request's profiler"""
+        if self.profile is None:
+            return fn
+
+        def profiled(*args, **kwargs):
+            # cProfile hooks are process-wide on Python 3.12+, so profile one request at a time
+            if not self.profiler._active.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            try:
+                self.profile.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.profile.disable()
+                    self.profiled = True
+            finally:
+                self.profiler._active.release()
+
+        return profiled
+
+    def finish(self, status):
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        if self.forced or elapsed_ms >= self.profiler.slow_ms:
+            try:
+                self.profiler.dump(self, elapsed_ms, status)
+            except Exception as e:
+                print(f"⚠️  Could not write request profile: {e}")
+
+
+class RequestProfiler:
+    def __init__(self, enabled=None, sample_rate=None, slow_ms=None, output_dir=None, header="x-profile"):
+        self.enabled = _env_flag("PROFILING_ENABLED") if enabled is None else enabled
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0")) if sample_rate is None else sample_rate
+        self.slow_ms = float(os.getenv("PROFILE_SLOW_MS", "1000")) if slow_ms is None else slow_ms
+        self.output_dir = output_dir or os.getenv("PROFILE_DIR", "profiles")
+        self.header = header.lower()
+        self._active = threading.Lock()
+
+    @contextmanager
+    def request(self, endpoint, headers):
+        """Track one request; dumps its profile on exit if it was slow"""
+        if not self.enabled:
+            yield _DISABLED
+            return
+
+        forced = headers.get(self.header, "").lower() in ("1", "true", "yes")
+        sampled = forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        profiled_request = ProfiledRequest(self, endpoint, sampled, forced)
+        status = "ok"
+        try:
+            yield profiled_request
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            profiled_request.finish(status)
+
+    def dump(self, profiled_request, elapsed_ms, status):
+        """Write the fingerprint (and profile, if one was taken) for a request"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        fingerprint = fingerprint_input(profiled_request.input, **profiled_request.input_meta)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        capture_id = f"{stamp}-{profiled_request.endpoint}-{fingerprint.get('sha256', 'none')[:12]}"
+
+        record = {
+            "id": capture_id,
+            "endpoint": profiled_request.endpoint,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "status": status,
+            "forced": profiled_request.forced,
+            "profiled": profiled_request.profiled,
+            "input": fingerprint,
+        }
+
+        if profiled_request.profiled:
+            profile_path = os.path.join(self.output_dir, capture_id + ".prof")
+            profiled_request.profile.dump_stats(profile_path)
+            record["profile_path"] = profile_path
+            record["top_functions"] = _top_functions(profiled_request.profile)
+
+        with open(os.path.join(self.output_dir, capture_id + ".json"), "w") as f:
+            json.dump(record, f, indent=2)
+        print(f"🐢 Slow request captured: {capture_id} ({elapsed_ms:.0f} ms)")
+
+
+class _DisabledRequest:
+    sampled = False
+    forced = False
+
+    def set_input(self, data, **meta):
+        pass
+
+    def wrap(self, fn):
+        return fn
+
+
+_DISABLED = _DisabledRequest()
+
+
+def fingerprint_input(data, filename=None, **meta):
+    """Hash, size and (for PDFs) page count of a request input, without keeping its content"""
+    if data is None:
+        return dict(meta)
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="replace")
+
+    fingerprint = {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size_bytes": len(data),
+        **meta,
+    }
+    if filename:
+        fingerprint["extension"] = os.path.splitext(filename)[1].lower()
+        if fingerprint["extension"] == ".pdf":
+            fingerprint["page_count"] = _pdf_page_count(data)
+    return fingerprint
+
+
+def _pdf_page_count(content):
+    try:
+        import PyPDF2
+        return len(PyPDF2.PdfReader(io.BytesIO(content)).pages)
+    except Exception:
+        return None
+
+
+def _top_functions(profile, limit=25):
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue().splitlines()
@@ -0,0 +1,283 @@
+"""
+Cached rankings of vacancies' applicant pools.
+
+Reopening a vacancy's applicant list ranks the same pool against the same JD
+again. RankingCache keeps each ranking under three versions: the vacancy
+profile (a hash of the JD text), the candidate pool (a hash of every
+applicant's ID and scored fields, in pool order) and the scoring config (MatchScorer's
+config version).
+
+- Nothing changed: the cached ranking is returned as is.
+- The pool changed: the cached ranking is diffed against the submitted pool
+  by applicant ID. New or edited applicants are scored with the entry's
+  fitted TF-IDF vectorizer and inserted into the sorted ranking; withdrawn
+  ones are removed. Adding one applicant scores one row.
+- The JD changed: every ranking of that vacancy is dropped and rebuilt;
+  other vacancies keep theirs. An edited scoring config has a new version,
+  so it gets its own entry.
+
+A new entry is built like CandidateMatcher.match (TF-IDF fitted on the JD and
+the whole pool), so its ranking is identical. Rows scored later reuse that
+vocabulary and IDF, as the candidate index does, so they can differ slightly
+from a fresh match; an entry is rebuilt once more than REBUILD_FRACTION of
+the pool it was built from, and more than REBUILD_MIN_CHANGES applicants,
+have changed.
+
+Entries are evicted least recently used beyond max_entries rankings or
+max_rows applicants in total.
+"""
+
+import bisect
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from coalescing import content_key
+from metrics import RANKING_CACHE_EVENTS, record_cache, stage
+
+# Applicant fields besides the text that a match result depends on
+SCORED_FIELDS = ("name", "skills", "experience_years", "education_level")
+
+# Share of the original pool that may be added, edited or removed before an entry is rebuilt
+REBUILD_FRACTION = 0.25
+# Changes always allowed before the fraction applies, so small pools are not rebuilt on every new applicant
+REBUILD_MIN_CHANGES = 10
+
+
+def vacancy_version(jd_text):
+    return content_key(jd_text)[:16]
+
+
+def candidate_versions(candidates):
+    """Applicant ID -> hash of its scored fields; every applicant needs a unique 'id'"""
+    versions = {}
+    for candidate in candidates:
+        if candidate.get('id') is None:
+            raise ValueError("Cached rankings need an 'id' for every candidate")
+        candidate_id = str(candidate['id'])
+        if candidate_id in versions:
+            raise ValueError(f"Candidate '{candidate_id}' appears more than once in the pool")
+        fields = json.dumps([candidate.get(field) for field in SCORED_FIELDS], default=str)
+        versions[candidate_id] = content_key(str(candidate.get('text') or ''), fields)[:16]
+    return versions
+
+
+def pool_version(versions):
+    # In pool order: reordering applicants changes how match() breaks ties
+    return content_key(*(f"{candidate_id}:{version}" for candidate_id, version in versions.items()))[:16]
+
+
+class CachedRanking:
+    """One vacancy's ranking under one scoring config, kept sorted as applicants come and go"""
+
+    def __init__(self, matcher, jd_text, scorer, candidates, versions):
+        from sklearn.base import clone
+
+        self.matcher = matcher
+        self.jd_text = jd_text
+        self.scorer = scorer
+        self.vacancy_version = vacancy_version(jd_text)
+        self.requirement_columns = matcher._requirement_columns([matcher._jd_requirements(jd_text)])
+        self.built_size = len(candidates)
+        self.changed = 0
+        self.lock = threading.Lock()
+        # candidate ID -> (version, sort key, match); the ranking is the sorted list of keys
+        self.rows = {}
+        self.order = []
+
+        with stage("ranking_cache", "vectorize"):
+            texts = [jd_text] + [candidate.get('text', '') for candidate in candidates]
+            self.vectorizer = clone(matcher.vectorizer)
+            try:
+                tfidf_matrix = self.vectorizer.fit_transform(texts)
+                self.jd_vector = tfidf_matrix[0:1]
+                candidate_vectors = tfidf_matrix[1:]
+            except ValueError:
+                # Empty vocabulary (e.g. only stop words); similarity is 0 everywhere
+                self.vectorizer = None
+                candidate_vectors = None
+        self._insert(candidates, range(len(candidates)), versions, candidate_vectors, initial=True)
+        self.pool_version = pool_version(versions)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def diff(self, versions):
+        """(IDs new or edited since the cached pool, IDs no longer in it)"""
+        changed = [
+            candidate_id for candidate_id, version in versions.items()
+            if candidate_id not in self.rows or self.rows[candidate_id][0] != version
+        ]
+        removed = [candidate_id for candidate_id in self.rows if candidate_id not in versions]
+        return changed, removed
+
+    def needs_rebuild(self, changes):
+        return self.changed + changes > max(REBUILD_MIN_CHANGES, REBUILD_FRACTION * self.built_size)
+
+    def update(self, candidates, versions, changed, removed):
+        """Rescore only the changed applicants and drop the removed ones"""
+        changed_ids = set(changed)
+        # Positions in the whole pool, which match() uses for default names
+        positions = [i for i, candidate in enumerate(candidates) if str(candidate['id']) in changed_ids]
+        changed_candidates = [candidates[i] for i in positions]
+        for candidate_id in removed + [candidate_id for candidate_id in changed if candidate_id in self.rows]:
+            self._remove(candidate_id)
+        if changed_candidates:
+            with stage("ranking_cache", "vectorize"):
+                candidate_vectors = None
+                if self.vectorizer is not None:
+                    candidate_vectors = self.vectorizer.transform([c.get('text', '') for c in changed_candidates])
+            self._insert(changed_candidates, positions, versions, candidate_vectors)
+        self._reposition(candidates)
+        self.changed += len(changed) + len(removed)
+        self.pool_version = pool_version(versions)
+
+    def ranking(self, top_k=None):
+        """Matches best first, in the shape CandidateMatcher.match returns"""
+        keys = self.order if top_k is None else self.order[:top_k]
+        return [self.rows[key[2]][2] for key in keys]
+
+    def _insert(self, candidates, positions, versions, candidate_vectors, initial=False):
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        with stage("ranking_cache", "score"):
+            if candidate_vectors is None:
+                similarities = np.zeros(len(candidates))
+            else:
+                similarities = cosine_similarity(self.jd_vector, candidate_vectors).flatten()
+            bonuses = self.scorer.bonus(self.matcher._candidate_columns(candidates), self.requirement_columns)
+            scores = self.scorer.combine(similarities[:, None], bonuses)[:, 0]
+
+        with stage("ranking_cache", "insert"):
+            keys = []
+            for i, (candidate, position) in enumerate(zip(candidates, positions)):
+                candidate_id = str(candidate['id'])
+                match = self.matcher._format_match(candidate, position, similarities[i], scores[i], self.jd_text)
+                # Best score first; equal scores keep pool order, as in match()
+                key = (-match["comprehensive_score"], position, candidate_id)
+                self.rows[candidate_id] = (versions[candidate_id], key, match)
+                keys.append(key)
+            if initial:
+                self.order = sorted(keys)
+            else:
+                for key in keys:
+                    bisect.insort(self.order, key)
+
+    def _reposition(self, candidates):
+        """Re-key applicants whose pool position moved, so ties and default names follow the pool as in match()"""
+        moved = False
+        for position, candidate in enumerate(candidates):
+            candidate_id = str(candidate['id'])
+            version, key, match = self.rows[candidate_id]
+            if key[1] != position:
+                if 'name' not in candidate:
+                    match = dict(match, name=f"Candidate {position + 1}")
+                self.rows[candidate_id] = (version, (key[0], position, candidate_id), match)
+                moved = True
+        if moved:
+            self.order = sorted(key for _, key, _ in self.rows.values())
+
+    def _remove(self, candidate_id):
+        _, key, _ = self.rows.pop(candidate_id)
+        del self.order[bisect.bisect_left(self.order, key)]
+
+
+class RankingCache:
+    """Rankings by (vacancy ID, scoring version), evicted least recently used"""
+
+    def __init__(self, matcher, max_entries=128, max_rows=500000):
+        self.matcher = matcher
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rank(self, vacancy_id, jd_text, candidates, scorer=None, top_k=None):
+        """A vacancy's ranking, reusing or incrementally updating the cached one; returns (matches, info)"""
+        scorer = scorer or self.matcher.scorer
+        key = (str(vacancy_id), scorer.versions[0])
+        versions = candidate_versions(candidates)
+        vacancy = vacancy_version(jd_text)
+        pool = pool_version(versions)
+
+        with self._lock:
+            # If the JD was edited, this vacancy's rankings are dropped; every other vacancy keeps its own
+            self._invalidate(key[0], keep_version=vacancy)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        scored, removed = 0, 0
+        if entry is None:
+            outcome = "miss"
+        else:
+            with entry.lock:
+                if entry.pool_version == pool:
+                    outcome = "hit"
+                else:
+                    changed, removed_ids = entry.diff(versions)
+                    if entry.needs_rebuild(len(changed) + len(removed_ids)):
+                        outcome = "rebuild"
+                    else:
+                        outcome = "update"
+                        entry.update(candidates, versions, changed, removed_ids)
+                        scored, removed = len(changed), len(removed_ids)
+                if outcome != "rebuild":
+                    matches = entry.ranking(top_k)
+
+        if outcome in ("miss", "rebuild"):
+            entry = CachedRanking(self.matcher, jd_text, scorer, candidates, versions)
+            scored = len(candidates)
+            with entry.lock:
+                matches = entry.ranking(top_k)
+            self._store(key, entry)
+
+        record_cache("ranking", outcome in ("hit", "update"))
+        RANKING_CACHE_EVENTS.inc(outcome)
+        return matches, {
+            "cache": outcome,
+            "vacancy_version": vacancy,
+            "pool_version": pool,
+            "scoring_version": key[1],
+            "candidates": len(versions),
+            "scored": scored,
+            "removed": removed,
+        }
+
+    def invalidate(self, vacancy_id, keep_version=None):
+        """Drop a vacancy's rankings (except those built from the JD version `keep_version`); returns how many"""
+        with self._lock:
+            return self._invalidate(str(vacancy_id), keep_version)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "rows": sum(len(entry) for entry in self._entries.values()),
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+            }
+
+    def _invalidate(self, vacancy_id, keep_version=None):
+        stale = [
+            key for key, entry in self._entries.items()
+            if key[0] == vacancy_id and entry.vacancy_version != keep_version
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            RANKING_CACHE_EVENTS.inc("invalidated", amount=len(stale))
+        return len(stale)
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            rows = sum(len(cached) for cached in self._entries.values())
+            # The newest entry is kept even if it alone exceeds max_rows
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or rows > self.max_rows):
+                _, evicted = self._entries.popitem(last=False)
+                rows -= len(evicted)
+                RANKING_CACHE_EVENTS.inc("evicted")
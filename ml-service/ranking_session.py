@@ -0,0 +1,191 @@
+"""
+What-if re-ranking of one vacancy's candidate pool.
+
+Creating a session computes the expensive parts once: TF-IDF similarities
+between the JD and every candidate, and the candidate feature columns used by
+the bonus terms. Changing the requirements (required skills, minimum years,
+education level) or the scoring config only changes the bonus terms, so a
+re-rank is one vectorized MatchScorer pass plus a top-K selection.
+
+Sessions are held in memory by the worker that created them.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from candidate_matcher import TECHNICAL_SKILLS, EDUCATION_HIERARCHY
+from metrics import record_cache, stage
+
+
+class RankingSession:
+    """Cached similarities and feature columns of one vacancy's candidate pool"""
+
+    def __init__(self, matcher, jd_text, ids, names, similarities, columns):
+        self.matcher = matcher
+        self.jd_text = jd_text
+        self.ids = ids
+        self.names = names
+        self.similarities = similarities
+        self.columns = columns
+        self.requirements = matcher._jd_requirements(jd_text)
+        self.created_at = time.time()
+        self.reranks = 0
+
+    @classmethod
+    def from_candidates(cls, matcher, jd_text, candidates):
+        """Session over inline candidates; TF-IDF is fitted like CandidateMatcher.match"""
+        from sklearn.base import clone
+
+        texts = [jd_text] + [candidate.get('text', '') for candidate in candidates]
+        with stage("ranking_session", "vectorize"):
+            try:
+                tfidf_matrix = clone(matcher.vectorizer).fit_transform(texts)
+                # Rows are L2-normalised, so the dot product is the cosine similarity
+                similarities = (tfidf_matrix[1:] @ tfidf_matrix[0].T).toarray().ravel()
+            except ValueError:
+                # Empty vocabulary (e.g. only stop words); similarity is 0 everywhere
+                similarities = np.zeros(len(candidates))
+
+        with stage("ranking_session", "features"):
+            columns = matcher._candidate_columns(candidates)
+
+        ids = [candidate.get('id', f"candidate_{i}") for i, candidate in enumerate(candidates)]
+        names = [candidate.get('name', f"Candidate {i+1}") for i, candidate in enumerate(candidates)]
+        return cls(matcher, jd_text, ids, names, similarities, columns)
+
+    @classmethod
+    def from_index(cls, index, jd_text):
+        """Session over every live candidate of a CandidateIndex"""
+        with stage("ranking_session", "vectorize"):
+            ids, similarities, columns = index.similarity_columns(jd_text)
+        return cls(index.matcher, jd_text, ids, None, similarities, columns)
+
+    def __len__(self):
+        return len(self.similarities)
+
+    def requirement_overrides(self, skills=None, experience_years=None, education=None):
+        """The JD requirements with the given fields replaced; raises ValueError on unknown values"""
+        requirements = dict(self.requirements)
+        if skills is not None:
+            skills = {str(skill).lower() for skill in skills}
+            unknown = skills - set(TECHNICAL_SKILLS)
+            if unknown:
+                raise ValueError(f"Unknown skills {sorted(unknown)}; supported: {TECHNICAL_SKILLS}")
+            requirements["skills"] = skills
+        if experience_years is not None:
+            if experience_years < 0:
+                raise ValueError("experience_years must not be negative")
+            requirements["experience"] = experience_years
+        if education is not None:
+            education = education.strip().lower()
+            if education in ("", "none"):
+                requirements["education"] = -1
+            elif education in EDUCATION_HIERARCHY:
+                requirements["education"] = EDUCATION_HIERARCHY[education]
+            else:
+                raise ValueError(f"Unknown education level '{education}'; use one of {list(EDUCATION_HIERARCHY)} or 'none'")
+        return requirements
+
+    def rerank(self, requirements=None, scorer=None, top_k=50):
+        """Top candidates under changed requirements and/or scoring; similarities are reused"""
+        requirements = requirements or self.requirements
+        scorer = scorer or self.matcher.scorer
+        self.reranks += 1
+
+        with stage("ranking_session", "bonuses"):
+            requirement_columns = self.matcher._requirement_columns([requirements])
+            bonuses = scorer.bonus(self.columns, requirement_columns)
+            scores = scorer.combine(self.similarities[:, None], bonuses)[:, 0]
+
+        with stage("ranking_session", "top_k"):
+            top_k = max(1, min(top_k, len(scores)))
+            top = np.argpartition(-scores, top_k - 1)[:top_k] if top_k < len(scores) else np.arange(len(scores))
+            order = top[np.argsort(-scores[top], kind="stable")]
+            return [self._format_hit(row, scores[row], requirements["skills"]) for row in order]
+
+    def _format_hit(self, row, score, jd_skills):
+        candidate_skills = {TECHNICAL_SKILLS[j] for j in np.flatnonzero(self.columns["skills"][row])}
+        if jd_skills:
+            overlap = candidate_skills & jd_skills
+            skills_match = {
+                "matched_skills": sorted(overlap),
+                "missing_skills": sorted(jd_skills - candidate_skills),
+                "match_percentage": len(overlap) / len(jd_skills) * 100
+            }
+        else:
+            skills_match = "No specific skills mentioned in JD"
+
+        hit = {
+            "candidate_id": self.ids[row],
+            "similarity_score": round(float(self.similarities[row]) * 100, 2),
+            "comprehensive_score": round(float(score), 2),
+            "skills_match": skills_match,
+            "experience_years": float(self.columns["experience"][row]),
+            "recommendation": self.matcher._generate_recommendation(score)
+        }
+        if self.names is not None:
+            hit["name"] = self.names[row]
+        return hit
+
+    def describe(self):
+        requirements = self.requirements
+        return {
+            "candidates": len(self),
+            "requirements": {
+                "skills": sorted(requirements["skills"]),
+                "experience_years": requirements["experience"],
+                "education": requirements["education"],
+            },
+            "reranks": self.reranks,
+            "age_seconds": round(time.time() - self.created_at, 1),
+        }
+
+
+class RankingSessionStore:
+    """Recently used ranking sessions, bounded in count and idle time"""
+
+    def __init__(self, max_sessions=16, ttl_seconds=1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = (session, time.monotonic())
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id):
+        """The session, or None when unknown or expired"""
+        with self._lock:
+            self._expire()
+            entry = self._sessions.get(session_id)
+            record_cache("ranking_session", entry is not None)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (entry[0], time.monotonic())
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if last_used >= cutoff:
+                break
+            del self._sessions[session_id]
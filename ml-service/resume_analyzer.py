@@ -1,22 +1,47 @@
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
 import json
 import os
+import hashlib
+from deadline import DeadlineExceeded, RequestCancelled
+from metrics import stage
+from nlp_loader import load_spacy_model
+import minhash
+from scoring import ResumeScorer
+from skill_resolver import SkillResolver
+from prescreen import (
+    Prescreener, ResumeRejected, NON_TECH_INDICATORS, RESUME_INDICATORS, find_indicators, docx_paragraphs
+)
 
 
 class ResumeAnalyzer:
-    def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            print("✅ spaCy model loaded successfully")
-        except OSError:
-            print("⚠️  spaCy model 'en_core_web_sm' not found. Using fallback analysis.")
-            self.nlp = None
+    EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A|a]{2,}\b'
+    PHONE_PATTERN = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+    EDUCATION_KEYWORDS = ["bachelor", "master", "phd", "degree", "university", "college"]
+    
+    def __init__(self, fuzzy_skills=False):
+        self._nlp = None
+        self._nlp_loaded = False
         
         self.skills_keywords = self._load_skills_keywords()
+        # Typo-tolerant keyword lookup ("Pyhton", "Kubernates"); None for exact matching only
+        self.skill_resolver = SkillResolver(self._skill_keyword_list()) if fuzzy_skills else None
         self.experience_patterns = self._load_experience_patterns()
+        self.prescreener = Prescreener()
+        # Weights of the overall score (DEFAULT_RESUME_SCORING unless configured)
+        self.resume_scorer = ResumeScorer()
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first use"""
+        if not self._nlp_loaded:
+            try:
+                self._nlp = load_spacy_model("en_core_web_sm")
+                print("✅ spaCy model loaded successfully")
+            except OSError:
+                print("⚠️  spaCy model 'en_core_web_sm' not found. Using fallback analysis.")
+                self._nlp = None
+            self._nlp_loaded = True
+        return self._nlp
         
     def _load_skills_keywords(self):
         """Load comprehensive skills keywords for better extraction"""
@@ -41,10 +66,32 @@ class ResumeAnalyzer:
         """Extract text from uploaded resume file"""
         try:
             content = await file.read()
-            
-            if file.filename.endswith('.txt'):
+        except Exception as e:
+            print(f"Error extracting text from file: {e}")
+            return "Error extracting text from file. Please try again."
+        
+        return self.extract_text_from_bytes(content, file.filename)
+    
+    def extract_text_from_bytes(self, content, filename):
+        """Pre-screen, then extract text from raw resume file content (blocking, safe to run off the event loop)"""
+        with stage("resume", "prescreen"):
+            self.prescreen(content, filename)
+        with stage("resume", "extraction"):
+            return self._extract_text(content, filename)
+    
+    def prescreen(self, content, filename):
+        """Raise ResumeRejected for uploads that are clearly not resumes, before full extraction"""
+        self.prescreener.sniff(content, filename)
+        head, complete = self.prescreener.head_text(content, filename)
+        validity_check = self._check_resume_validity(head, complete=complete)
+        if not validity_check["valid"]:
+            raise ResumeRejected(validity_check["message"], "head", validity_check["reason"])
+    
+    def _extract_text(self, content, filename):
+        try:
+            if filename.endswith('.txt'):
                 return content.decode('utf-8')
-            elif file.filename.endswith('.pdf'):
+            elif filename.endswith('.pdf'):
                 # Use PyPDF2 for PDF files
                 try:
                     import PyPDF2
@@ -72,6 +119,9 @@ class ResumeAnalyzer:
                             continue
                     # If all fail, return a basic message
                     return "PDF content could not be extracted. Please ensure PyPDF2 is installed."
+            elif filename.endswith('.docx'):
+                paragraphs, _ = docx_paragraphs(content)
+                return "\n".join(paragraphs).strip()
             else:
                 # For other file types, try different encodings
                 for encoding in ['utf-8', 'latin-1', 'cp1252']:
@@ -87,59 +137,237 @@ class ResumeAnalyzer:
             print(f"Error extracting text from file: {e}")
             return "Error extracting text from file. Please try again."
     
-    def analyze(self, text):
-        """Analyze resume text and return comprehensive analysis"""
+    def analyze(self, text, deadline=None):
+        """Analyze resume text and return comprehensive analysis
+
+        A `deadline` (deadline.Deadline) is checked between stages and sections,
+        raising DeadlineExceeded or RequestCancelled instead of finishing late.
+        """
         try:
-            # Check if text extraction was successful
-            if not text or text.startswith("Error") or text.startswith("PDF content could not be extracted"):
-                print(f"Text extraction failed or returned invalid content: {text[:100] if text else 'Empty'}...")
-                raise ValueError("Resume text could not be extracted. Please ensure the file is a valid PDF, DOC, DOCX, or TXT file.")
+            self._validate_text(text)
             
-            # Validate resume content
-            validity_check = self._check_resume_validity(text)
-            if not validity_check["valid"]:
-                raise ValueError(validity_check["message"])
+            # Skills only depend on which keywords occur, so no spaCy parse is needed here
+            with stage("resume", "sections"):
+                sections = []
+                for name, body in self._split_sections(text):
+                    if deadline is not None:
+                        deadline.check("sections")
+                    sections.append(self._analyze_section(name, body))
             
-            if self.nlp:
-                doc = self.nlp(text.lower())
-                skills_analysis = self._analyze_skills(doc)
-            else:
-                # Fallback analysis without spaCy
-                skills_analysis = self._analyze_skills_fallback(text)
+            if deadline is not None:
+                deadline.check("scoring")
+            return self._assemble_analysis(text, sections, self.nlp is not None)
+        except (ValueError, DeadlineExceeded, RequestCancelled) as e:
+            # Re-raise ValueError with the message
+            raise e
+        except Exception as e:
+            print(f"Error in analyze method: {str(e)}")
+            raise ValueError(f"Failed to analyze resume: {str(e)}")
+    
+    def reanalyze(self, text, previous_analysis):
+        """Re-analyze an updated resume, recomputing only sections whose hash is not in the previous analysis"""
+        try:
+            self._validate_text(text)
             
-            # Extract basic information
-            analysis = {
-                "overall_score": 0,
-                "skills_analysis": skills_analysis,
-                "experience_analysis": self._analyze_experience(text),
-                "education_analysis": self._analyze_education(text),
-                "contact_info": self._extract_contact_info(text),
-                "summary": self._generate_summary(text),
-                "recommendations": []
+            known = {
+                section["hash"]: section
+                for section in (previous_analysis or {}).get("sections") or []
+                if section.get("hash") and section.get("features")
             }
             
-            # Calculate overall score
-            analysis["overall_score"] = self._calculate_overall_score(analysis)
-            
-            # Generate recommendations
-            analysis["recommendations"] = self._generate_recommendations(analysis)
-            
-            # Add warning if score is very low (likely not a tech resume)
-            if analysis["overall_score"] < 20 and analysis["skills_analysis"].get("total_count", 0) == 0:
-                analysis["warning"] = "This resume contains no recognizable technical skills. If you're applying for a technical position, consider highlighting your relevant technical skills and experience."
+            sections, recomputed = [], []
+            with stage("resume", "sections"):
+                for name, body in self._split_sections(text):
+                    section_hash = self._section_hash(body)
+                    previous = known.get(section_hash)
+                    if previous is not None:
+                        sections.append({"name": name, "hash": section_hash, "features": previous["features"]})
+                    else:
+                        sections.append(self._analyze_section(name, body, section_hash))
+                        recomputed.append(name)
             
+            # Skills only depend on which keywords occur, so no spaCy parse is needed here
+            analysis = self._assemble_analysis(text, sections, self.nlp is not None)
+            analysis["reanalysis"] = {
+                "recomputed_sections": recomputed,
+                "reused_sections": len(sections) - len(recomputed)
+            }
             return analysis
         except ValueError as e:
-            # Re-raise ValueError with the message
             raise e
         except Exception as e:
-            print(f"Error in analyze method: {str(e)}")
+            print(f"Error in reanalyze method: {str(e)}")
             raise ValueError(f"Failed to analyze resume: {str(e)}")
     
-    def _analyze_skills(self, doc):
+    def candidate_profile(self, candidate_id, text, analysis):
+        """Candidate record in the shape CandidateMatcher and the candidate index expect"""
+        skills_analysis = analysis["skills_analysis"]
+        if "all_skills" in skills_analysis:
+            skills = skills_analysis["all_skills"]
+        else:
+            skills = [skill for category in skills_analysis["categories"].values() for skill in category["skills"]]
+        
+        education = set()
+        for section in analysis.get("sections") or []:
+            education.update(section["features"]["education"])
+        education_level = next((level for level in ("phd", "master", "bachelor") if level in education), "")
+        
+        return {
+            "id": candidate_id,
+            "text": text,
+            "skills": [skill.lower() for skill in skills],
+            "experience_years": analysis["experience_analysis"]["years"],
+            "education_level": education_level,
+            "email": analysis["contact_info"]["email"]
+        }
+    
+    def _validate_text(self, text):
+        """Raise ResumeRejected unless the text is a usable resume"""
+        # Check if text extraction was successful
+        if not text or text.startswith("Error") or text.startswith("PDF content could not be extracted"):
+            print(f"Text extraction failed or returned invalid content: {text[:100] if text else 'Empty'}...")
+            raise ResumeRejected(
+                "Resume text could not be extracted. Please ensure the file is a valid PDF, DOC, DOCX, or TXT file.",
+                "full", "extraction"
+            )
+        
+        # Validate resume content
+        with stage("resume", "validity"):
+            validity_check = self._check_resume_validity(text)
+        if not validity_check["valid"]:
+            raise ResumeRejected(validity_check["message"], "full", validity_check["reason"])
+    
+    def _assemble_analysis(self, text, sections, use_nlp):
+        """Build the analysis from per-section features and the whole-text ones"""
+        features = self._merge_features([section["features"] for section in sections])
+        features.update(self._document_features(text))
+        
+        with stage("resume", "skills"):
+            if use_nlp:
+                skills_analysis = self._analyze_skills(features)
+            else:
+                # Fallback analysis without spaCy
+                skills_analysis = self._analyze_skills_fallback(features)
+        
+        with stage("resume", "experience"):
+            experience_analysis = self._analyze_experience(features)
+        
+        with stage("resume", "profile"):
+            education_analysis = self._analyze_education(features)
+            contact_info = self._extract_contact_info(features)
+            summary = self._generate_summary(text)
+        
+        # Extract basic information
+        analysis = {
+            "overall_score": 0,
+            "skills_analysis": skills_analysis,
+            "experience_analysis": experience_analysis,
+            "education_analysis": education_analysis,
+            "contact_info": contact_info,
+            "summary": summary,
+            "recommendations": []
+        }
+        
+        with stage("resume", "scoring"):
+            # Calculate overall score
+            analysis["overall_score"] = self._calculate_overall_score(analysis)
+            
+            # Generate recommendations
+            analysis["recommendations"] = self._generate_recommendations(analysis)
+        
+        # Add warning if score is very low (likely not a tech resume)
+        if analysis["overall_score"] < 20 and analysis["skills_analysis"].get("total_count", 0) == 0:
+            analysis["warning"] = "This resume contains no recognizable technical skills. If you're applying for a technical position, consider highlighting your relevant technical skills and experience."
+        
+        with stage("resume", "minhash"):
+            # Lets ingest and matching spot near-duplicate resumes (see minhash.py)
+            analysis["minhash"] = minhash.encode(minhash.signature(text))
+        
+        # Section hashes and features let a later reanalyze() skip unchanged sections
+        analysis["sections"] = sections
+        return analysis
+    
+    def _split_sections(self, text):
+        """Split resume text into (name, text) sections at heading lines; text before the first heading is 'header'"""
+        headings = self._load_section_headings()
+        sections = [["header", []]]
+        for line in text.split("\n"):
+            name = headings.get(line.strip().rstrip(":").strip().lower())
+            if name is not None:
+                sections.append([name, []])
+            sections[-1][1].append(line)
+        return [(name, "\n".join(lines)) for name, lines in sections if any(line.strip() for line in lines)]
+    
+    def _load_section_headings(self):
+        """Map heading lines (lower-cased) to section names"""
+        return {
+            heading: name
+            for name, headings in {
+                "summary": ["summary", "professional summary", "objective", "career objective", "profile", "about me"],
+                "experience": ["experience", "work experience", "professional experience", "employment", "work history"],
+                "education": ["education", "academic background", "qualifications"],
+                "skills": ["skills", "technical skills", "core competencies", "technologies"],
+                "projects": ["projects", "personal projects"],
+                "certifications": ["certifications", "certificates", "achievements", "awards"],
+                "contact": ["contact", "contact information"],
+            }.items()
+            for heading in headings
+        }
+    
+    def _section_hash(self, section_text):
+        return hashlib.sha256(section_text.encode("utf-8")).hexdigest()[:16]
+    
+    def _analyze_section(self, name, section_text, section_hash=None):
+        return {
+            "name": name,
+            "hash": section_hash or self._section_hash(section_text),
+            "features": self._section_features(section_text)
+        }
+    
+    def _section_features(self, section_text):
+        """Keyword, pattern and education features of one section, in a form that merges across sections
+
+        These only match within a line, so they never span a heading; see _document_features for the rest.
+        """
+        text_lower = section_text.lower()
+        misspelled = set(self.skill_resolver.find(section_text)) if self.skill_resolver is not None else ()
+        
+        return {
+            "keywords": [
+                keyword for keyword in self._skill_keyword_list() if keyword in text_lower or keyword in misspelled
+            ],
+            "patterns": [pattern for pattern in self._load_additional_skill_patterns() if pattern in text_lower],
+            "education": [keyword for keyword in self.EDUCATION_KEYWORDS if keyword in text_lower],
+        }
+    
+    def _merge_features(self, section_features):
+        """Combine per-section features"""
+        merged = {"keywords": set(), "patterns": set(), "education": set()}
+        for features in section_features:
+            merged["keywords"].update(features["keywords"])
+            merged["patterns"].update(features["patterns"])
+            merged["education"].update(features["education"])
+        return merged
+    
+    def _document_features(self, text):
+        """Experience, email and phone matches, searched over the whole text since they can cross a heading line"""
+        experience = []
+        for pattern in self.experience_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            experience.append(match.group(1) if match else None)
+        return {
+            "experience": experience,
+            "email": re.findall(self.EMAIL_PATTERN, text)[:1],
+            "phone": re.findall(self.PHONE_PATTERN, text)[:1]
+        }
+    
+    def _skill_keyword_list(self):
+        return list(dict.fromkeys(keyword for keywords in self.skills_keywords.values() for keyword in keywords))
+    
+    def _analyze_skills(self, features):
         """Analyze and categorize skills from the resume text"""
         skills_keywords = self._load_skills_keywords()
-        text_lower = doc.text.lower()
+        present = features["keywords"]
         
         # Initialize skills categories
         skills_by_category = {category: [] for category in skills_keywords.keys()}
@@ -148,20 +376,14 @@ class ResumeAnalyzer:
         # Extract skills by category
         for category, keywords in skills_keywords.items():
             for keyword in keywords:
-                if keyword in text_lower:
-                    # Handle variations and plurals
-                    variations = [keyword, keyword + 's', keyword.replace(' ', ''), keyword.replace(' ', '-')]
-                    for variation in variations:
-                        if variation in text_lower:
-                            # Get the actual skill name from the text (preserve case)
-                            skill_name = self._extract_skill_name(text_lower, variation)
-                            if skill_name and skill_name not in skills_by_category[category]:
-                                skills_by_category[category].append(skill_name)
-                                all_skills.append(skill_name)
-                            break
+                if keyword in present:
+                    skill_name = self._extract_skill_name(keyword)
+                    if skill_name and skill_name not in skills_by_category[category]:
+                        skills_by_category[category].append(skill_name)
+                        all_skills.append(skill_name)
         
         # Additional skill extraction for specific patterns
-        additional_skills = self._extract_additional_skills(text_lower)
+        additional_skills = self._extract_additional_skills(features["patterns"])
         all_skills.extend(additional_skills)
         
         # Remove duplicates while preserving order
@@ -187,14 +409,8 @@ class ResumeAnalyzer:
             'total_count': total_skills
         }
     
-    def _extract_skill_name(self, text_lower, keyword):
-        """Extract the actual skill name from the text"""
-        # Find the position of the keyword
-        pos = text_lower.find(keyword)
-        if pos == -1:
-            return None
-        
-        # Look for the skill name in the original text context
+    def _extract_skill_name(self, keyword):
+        """Display name for a matched skill keyword"""
         # This is a simplified approach - in production you might want more sophisticated text processing
         skill_name = keyword.title() if keyword.islower() else keyword
         
@@ -214,12 +430,9 @@ class ResumeAnalyzer:
         
         return skill_name
     
-    def _extract_additional_skills(self, text_lower):
-        """Extract additional skills that might not be in the predefined keywords"""
-        additional_skills = []
-        
-        # Look for specific patterns in the text
-        patterns = [
+    def _load_additional_skill_patterns(self):
+        """Phrases for skills that are not in the predefined keywords"""
+        return [
             r'generative ai',
             r'ai/ml',
             r'machine learning',
@@ -241,33 +454,39 @@ class ResumeAnalyzer:
             r'engineering',
             r'problem-solving',
             r'fast learning',
-            r'adaptability'
+            r'adaptability',
+            r'dbms concepts',
+            r'database concepts'
         ]
+    
+    def _extract_additional_skills(self, present_patterns):
+        """Extract additional skills that might not be in the predefined keywords"""
+        additional_skills = []
         
-        for pattern in patterns:
-            if pattern in text_lower:
+        for pattern in self._load_additional_skill_patterns():
+            if pattern in present_patterns and pattern not in ('dbms concepts', 'database concepts'):
                 # Convert pattern to readable skill name
                 skill_name = pattern.replace('/', ' & ').replace('_', ' ').title()
                 additional_skills.append(skill_name)
         
         # Special handling for database concepts
-        if 'dbms concepts' in text_lower or 'database concepts' in text_lower:
+        if 'dbms concepts' in present_patterns or 'database concepts' in present_patterns:
             additional_skills.append('Database Concepts')
         
         # Special handling for Google Cloud specialization
-        if 'google cloud skills boost' in text_lower:
+        if 'google cloud skills boost' in present_patterns:
             additional_skills.extend(['Google Cloud', 'Cloud Skills', 'AI Specialization'])
         
         return additional_skills
     
-    def _analyze_experience(self, text):
+    def _analyze_experience(self, features):
         """Analyze work experience"""
         experience_years = 0
         
-        for pattern in self.experience_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                experience_years = max(experience_years, int(matches[0]))
+        # First match of the first pattern that matches anywhere
+        for match in features["experience"]:
+            if match is not None:
+                experience_years = max(experience_years, int(match))
                 break
         
         return {
@@ -287,32 +506,20 @@ class ResumeAnalyzer:
         else:
             return "Expert"
     
-    def _analyze_education(self, text):
+    def _analyze_education(self, features):
         """Analyze education background"""
-        education_keywords = ["bachelor", "master", "phd", "degree", "university", "college"]
-        education_score = 0
-        
-        for keyword in education_keywords:
-            if keyword in text.lower():
-                education_score += 20
+        education_score = 20 * len(features["education"])
         
         return {
             "score": min(education_score, 100),
             "has_degree": education_score > 0
         }
     
-    def _extract_contact_info(self, text):
+    def _extract_contact_info(self, features):
         """Extract contact information"""
-        # Simple regex patterns for contact info
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A|a]{2,}\b'
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        
-        email = re.findall(email_pattern, text)
-        phone = re.findall(phone_pattern, text)
-        
         return {
-            "email": email[0] if email else None,
-            "phone": phone[0] if phone else None
+            "email": features["email"][0] if features["email"] else None,
+            "phone": features["phone"][0] if features["phone"] else None
         }
     
     def _generate_summary(self, text):
@@ -323,61 +530,26 @@ class ResumeAnalyzer:
         return " ".join(summary_sentences)
     
     def _calculate_overall_score(self, analysis):
-        """Calculate comprehensive overall resume score (0-100)"""
-        
-        # 1. SKILLS SCORE (35% weight) - Based on count and diversity
-        skills_score = 0
-        if analysis["skills_analysis"]:
-            total_skills = analysis["skills_analysis"].get("total_count", 0)
-            by_category = analysis["skills_analysis"].get("by_category", {})
-            total_categories = len(by_category)
-            
-            if total_categories > 0:
-                # Skill count score (max 50 points for 15+ skills)
-                skill_count_score = min(total_skills / 15, 1) * 50
-                
-                # Diversity score (max 50 points for skills in 4+ categories)
-                categories_with_skills = sum(1 for cat in by_category.values() if cat.get("count", 0) > 0)
-                diversity_score = min(categories_with_skills / 4, 1) * 50
-                
-                skills_score = (skill_count_score + diversity_score) * 0.35
-        
-        # 2. EXPERIENCE SCORE (30% weight) - Based on years and quality
-        experience_score = 0
-        if analysis["experience_analysis"]:
-            exp_base = analysis["experience_analysis"].get("score", 0)
-            years = analysis["experience_analysis"].get("years", 0)
-            
-            # Bonus for more years (up to 10 years)
-            years_bonus = min(years / 10, 1) * 20
-            experience_score = (exp_base + years_bonus) * 0.30
-        
-        # 3. EDUCATION SCORE (20% weight)
-        education_score = 0
-        if analysis["education_analysis"]:
-            edu_base = analysis["education_analysis"].get("score", 0)
-            has_degree = analysis["education_analysis"].get("has_degree", False)
-            
-            # Bonus for having a degree
-            degree_bonus = 20 if has_degree else 0
-            education_score = min(edu_base + degree_bonus, 100) * 0.20
-        
-        # 4. CONTACT & PROFESSIONALISM SCORE (15% weight)
-        contact_score = 0
-        if analysis["contact_info"]:
-            has_email = 40 if analysis["contact_info"].get("email") else 0
-            has_phone = 30 if analysis["contact_info"].get("phone") else 0
-            has_linkedin = 30 if analysis["contact_info"].get("linkedin") else 0
-            contact_score = (has_email + has_phone + has_linkedin) * 0.15
-        
-        # Calculate total score
-        total_score = skills_score + experience_score + education_score + contact_score
-        
-        # Ensure minimum score of 20 if resume has any content
-        if total_score < 20 and analysis["skills_analysis"].get("total_count", 0) > 0:
-            total_score = max(total_score, 25)
-        
-        return round(min(total_score, 100))
+        """Calculate comprehensive overall resume score (0-100) with the configured ResumeScorer"""
+        skills = analysis["skills_analysis"] or {}
+        by_category = skills.get("by_category", {})
+        experience = analysis["experience_analysis"] or {}
+        education = analysis["education_analysis"] or {}
+        contact = analysis["contact_info"] or {}
+        
+        score = self.resume_scorer.score({
+            "total_skills": [skills.get("total_count", 0)],
+            "category_count": [len(by_category)],
+            "categories_with_skills": [sum(1 for cat in by_category.values() if cat.get("count", 0) > 0)],
+            "experience_score": [experience.get("score", 0)],
+            "experience_years": [experience.get("years", 0)],
+            "education_score": [education.get("score", 0)],
+            "has_degree": [bool(education.get("has_degree", False))],
+            "has_email": [bool(contact.get("email"))],
+            "has_phone": [bool(contact.get("phone"))],
+            "has_linkedin": [bool(contact.get("linkedin"))],
+        })
+        return int(score[0])
     
     def _generate_recommendations(self, analysis):
         """Generate improvement recommendations"""
@@ -405,7 +577,7 @@ class ResumeAnalyzer:
         
         return recommendations
 
-    def _analyze_skills_fallback(self, text):
+    def _analyze_skills_fallback(self, features):
         """Fallback skills analysis without spaCy"""
         skills_found = {}
         total_skills = 0
@@ -413,7 +585,7 @@ class ResumeAnalyzer:
         for category, keywords in self.skills_keywords.items():
             category_skills = []
             for keyword in keywords:
-                if keyword.lower() in text.lower():
+                if keyword.lower() in features["keywords"]:
                     category_skills.append(keyword)
                     total_skills += 1
             
@@ -433,9 +605,9 @@ class ResumeAnalyzer:
         """Fallback analysis when main analysis fails - returns error instead of fake data"""
         raise ValueError("Unable to analyze resume. The resume content could not be properly extracted or is empty.")
 
-    def _check_resume_validity(self, text):
-        """Check if the resume is valid for technical job analysis"""
-        if not text or len(text.strip()) < 50:
+    def _check_resume_validity(self, text, complete=True):
+        """Check if the resume is valid for technical job analysis (complete=False: text is only the document's start)"""
+        if complete and (not text or len(text.strip()) < 50):
             return {
                 "valid": False,
                 "reason": "empty",
@@ -443,15 +615,8 @@ class ResumeAnalyzer:
             }
         
         # Check for non-technical/irrelevant content
-        non_tech_indicators = [
-            "recipe", "cooking", "ingredients", "tablespoon", "teaspoon", "bake", "fry",
-            "menu", "restaurant", "dish", "cuisine", "chef", "kitchen",
-            "fiction", "chapter", "novel", "story", "once upon a time",
-            "lyrics", "verse", "chorus", "song"
-        ]
-        
         text_lower = text.lower()
-        found_indicators = [ind for ind in non_tech_indicators if ind in text_lower]
+        found_indicators = find_indicators(text_lower, NON_TECH_INDICATORS, enough=3)
         
         if len(found_indicators) >= 3:
             return {
@@ -460,14 +625,12 @@ class ResumeAnalyzer:
                 "message": f"This document appears to be a {self._detect_document_type(text_lower)}, not a professional resume. Please upload a valid resume with your work experience, skills, and education."
             }
         
-        # Check for minimum resume-like content
-        resume_indicators = [
-            "experience", "education", "skills", "work", "job", "project",
-            "university", "college", "degree", "company", "position", "role",
-            "email", "@", "phone", "linkedin", "github", "objective", "summary"
-        ]
+        # More text could still add resume sections, so a partial document only fails the checks above
+        if not complete:
+            return {"valid": True, "reason": None, "message": None}
         
-        found_resume_content = sum(1 for ind in resume_indicators if ind in text_lower)
+        # Check for minimum resume-like content
+        found_resume_content = len(find_indicators(text_lower, RESUME_INDICATORS, enough=2))
         
         if found_resume_content < 2:
             return {
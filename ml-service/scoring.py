@@ -0,0 +1,283 @@
+"""
+Declarative scoring configuration compiled into vectorized NumPy expressions.
+
+A match scoring config describes how a candidate/JD pair is scored:
+
+    {
+        "similarity": 100,                        # points per unit of TF-IDF cosine similarity
+        "skills": 20,                             # points for covering every required skill (linear)
+        "experience": [[1.0, 15], [0.7, 10]],     # [ratio of required years, points], best tier wins
+        "education": 10,                          # points for meeting the required education level
+        "contact": 5,                             # points for having an email address
+        "cap": 100                                # maximum total score
+    }
+
+Omitted keys keep these defaults, which are the weights the service always
+used. compile_match_scoring() stacks one config per vacancy into parameter
+arrays, so a whole candidates x vacancies score matrix, each column with its
+own weights, is a single broadcasted NumPy pass.
+
+Resume scoring configs describe ResumeAnalyzer's overall score (the 35/30/20/15
+split) the same way; see DEFAULT_RESUME_SCORING.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+DEFAULT_MATCH_SCORING = {
+    "similarity": 100,
+    "skills": 20,
+    "experience": [[1.0, 15], [0.7, 10]],
+    "education": 10,
+    "contact": 5,
+    "cap": 100,
+}
+
+DEFAULT_RESUME_SCORING = {
+    "skills": {"weight": 0.35, "count_points": 50, "count_target": 15, "diversity_points": 50, "diversity_target": 4},
+    "experience": {"weight": 0.30, "years_points": 20, "years_target": 10},
+    "education": {"weight": 0.20, "degree_points": 20},
+    "contact": {"weight": 0.15, "email": 40, "phone": 30, "linkedin": 30},
+    # Resumes with at least one skill never score below this
+    "floor": 25,
+}
+
+CONFIG_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def _number(value, key):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Scoring config '{key}' must be a number")
+    if value < 0:
+        raise ValueError(f"Scoring config '{key}' must not be negative")
+    return float(value)
+
+
+def validate_match_scoring(config):
+    """Return a complete, normalised match scoring config; raises ValueError on bad input"""
+    config = config or {}
+    unknown = set(config) - set(DEFAULT_MATCH_SCORING) - {"name"}
+    if unknown:
+        raise ValueError(f"Unknown scoring config keys: {sorted(unknown)}")
+
+    merged = dict(DEFAULT_MATCH_SCORING, **{k: v for k, v in config.items() if k != "name"})
+    normalised = {key: _number(merged[key], key) for key in ("similarity", "skills", "education", "contact", "cap")}
+
+    tiers = merged["experience"]
+    if not isinstance(tiers, (list, tuple)) or not all(isinstance(t, (list, tuple)) and len(t) == 2 for t in tiers):
+        raise ValueError("Scoring config 'experience' must be a list of [ratio, points] pairs")
+    normalised["experience"] = sorted(
+        ([_number(ratio, "experience"), _number(points, "experience")] for ratio, points in tiers),
+        reverse=True
+    )
+    return normalised
+
+
+def config_version(config):
+    """Short content hash identifying a normalised config"""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def compile_match_scoring(configs):
+    """Stack normalised configs (one per vacancy column) into broadcastable parameter arrays"""
+    tier_count = max(len(config["experience"]) for config in configs)
+    # Missing tiers are padded with an unreachable ratio worth nothing
+    ratios = np.full((tier_count, len(configs)), np.inf)
+    points = np.zeros((tier_count, len(configs)))
+    for column, config in enumerate(configs):
+        for tier, (ratio, value) in enumerate(config["experience"]):
+            ratios[tier, column] = ratio
+            points[tier, column] = value
+
+    def column(key):
+        return np.array([config[key] for config in configs], dtype=np.float64)
+
+    return {
+        "similarity": column("similarity"),
+        "skills": column("skills"),
+        "education": column("education"),
+        "contact": column("contact"),
+        "cap": column("cap"),
+        "experience_ratios": ratios,
+        "experience_points": points,
+    }
+
+
+class MatchScorer:
+    """Compiled match scoring for one or many vacancy columns"""
+
+    def __init__(self, configs=None):
+        configs = [validate_match_scoring(config) for config in (configs or [None])]
+        self.configs = configs
+        self.versions = [config_version(config) for config in configs]
+        self.params = compile_match_scoring(configs)
+
+    def bonus(self, candidate_columns, requirement_columns):
+        """(candidates, vacancies) bonus points from CandidateMatcher feature columns"""
+        params = self.params
+
+        # Skills: linear in the fraction of required skills covered
+        overlap = candidate_columns["skills"] @ requirement_columns["skills"].T
+        skill_count = requirement_columns["skill_count"][None, :]
+        skills_bonus = np.divide(
+            overlap * params["skills"][None, :], skill_count,
+            out=np.zeros_like(overlap), where=skill_count > 0
+        )
+
+        # Experience: points of the best tier reached; nothing when the JD asks for none
+        candidate_exp = candidate_columns["experience"][:, None]
+        required_exp = requirement_columns["experience"][None, :]
+        experience_bonus = np.zeros(np.broadcast_shapes(candidate_exp.shape, required_exp.shape))
+        for tier in range(len(params["experience_ratios"]) - 1, -1, -1):
+            reached = candidate_exp >= required_exp * params["experience_ratios"][tier][None, :]
+            experience_bonus = np.where(reached, params["experience_points"][tier][None, :], experience_bonus)
+        experience_bonus = np.where(required_exp == 0, 0, experience_bonus)
+
+        # Education: -1 means the JD has no education requirement
+        candidate_edu = candidate_columns["education"][:, None]
+        required_edu = requirement_columns["education"][None, :]
+        education_bonus = np.where(
+            (required_edu >= 0) & (candidate_edu >= required_edu), params["education"][None, :], 0
+        )
+
+        contact_bonus = np.where(candidate_columns["has_email"][:, None], params["contact"][None, :], 0)
+
+        return skills_bonus + experience_bonus + education_bonus + contact_bonus
+
+    def combine(self, similarities, bonus):
+        """Final (candidates, vacancies) scores from cosine similarities and bonus points"""
+        params = self.params
+        return np.minimum(similarities * params["similarity"][None, :] + bonus, params["cap"][None, :])
+
+
+class ResumeScorer:
+    """Compiled overall resume score over columns of resume features"""
+
+    def __init__(self, config=None):
+        self.config = validate_resume_scoring(config)
+        self.version = config_version(self.config)
+
+    def score(self, features):
+        """Vectorized overall score; `features` maps names to equal-length arrays"""
+        config = self.config
+        skills, experience = config["skills"], config["experience"]
+        education, contact = config["education"], config["contact"]
+
+        total_skills = np.asarray(features["total_skills"], dtype=np.float64)
+        skills_score = np.where(
+            np.asarray(features["category_count"]) > 0,
+            (np.minimum(total_skills / skills["count_target"], 1) * skills["count_points"]
+             + np.minimum(np.asarray(features["categories_with_skills"]) / skills["diversity_target"], 1)
+             * skills["diversity_points"]) * skills["weight"],
+            0
+        )
+
+        years = np.asarray(features["experience_years"], dtype=np.float64)
+        experience_score = (
+            np.asarray(features["experience_score"]) + np.minimum(years / experience["years_target"], 1)
+            * experience["years_points"]
+        ) * experience["weight"]
+
+        education_score = np.minimum(
+            np.asarray(features["education_score"]) + np.where(features["has_degree"], education["degree_points"], 0),
+            100
+        ) * education["weight"]
+
+        contact_score = (
+            np.where(features["has_email"], contact["email"], 0)
+            + np.where(features["has_phone"], contact["phone"], 0)
+            + np.where(features["has_linkedin"], contact["linkedin"], 0)
+        ) * contact["weight"]
+
+        total = skills_score + experience_score + education_score + contact_score
+        total = np.where((total < 20) & (total_skills > 0), np.maximum(total, config["floor"]), total)
+        return np.round(np.minimum(total, 100))
+
+
+def validate_resume_scoring(config):
+    """Return a complete resume scoring config; raises ValueError on bad input"""
+    config = config or {}
+    unknown = set(config) - set(DEFAULT_RESUME_SCORING) - {"name"}
+    if unknown:
+        raise ValueError(f"Unknown resume scoring config keys: {sorted(unknown)}")
+
+    normalised = {}
+    for key, default in DEFAULT_RESUME_SCORING.items():
+        value = config.get(key, default)
+        if isinstance(default, dict):
+            if not isinstance(value, dict) or set(value) - set(default):
+                raise ValueError(f"Resume scoring config '{key}' accepts only {sorted(default)}")
+            normalised[key] = {
+                name: _number(value.get(name, default[name]), f"{key}.{name}") for name in default
+            }
+        else:
+            normalised[key] = _number(value, key)
+    return normalised
+
+
+class ScoringConfigStore:
+    """Named match scoring configs (per tenant or vacancy) kept as JSON files so every worker sees them"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        if not CONFIG_NAME.match(name or ""):
+            raise ValueError("Scoring config names may only use letters, digits, '.', '_' and '-'")
+        return os.path.join(self.directory, name + ".json")
+
+    def put(self, name, config):
+        normalised = validate_match_scoring(config)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(normalised, f)
+        os.replace(tmp, path)
+        return normalised
+
+    def get(self, name):
+        """Normalised config by name (re-read when its file changes); KeyError if unknown"""
+        path = self._path(name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise KeyError(name)
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is None or cached[0] != mtime:
+                with open(path) as f:
+                    cached = self._cache[name] = (mtime, json.load(f))
+            return cached[1]
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def names(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(entry[:-5] for entry in os.listdir(self.directory) if entry.endswith(".json"))
+
+    def resolve(self, scoring):
+        """A request's `scoring` value: None (defaults), a stored config name, or an inline config"""
+        if scoring is None:
+            return validate_match_scoring(None)
+        if isinstance(scoring, str):
+            try:
+                return self.get(scoring)
+            except KeyError:
+                raise ValueError(f"Unknown scoring config '{scoring}'")
+        if isinstance(scoring, dict):
+            return validate_match_scoring(scoring)
+        raise ValueError("scoring must be a config name or an inline config object")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Pre-forking server for the ml-service.
+
+The master process imports the app, optionally loads every model once
+(--preload), freezes the garbage collector so those objects are never
+touched again, binds the listening socket and forks N uvicorn workers.
+Workers share the model pages copy-on-write instead of each loading its own
+copy, and the master restarts any worker that dies. Mutable index state
+(e.g. the vacancy index) is published as memory-mapped snapshots under
+--shared-state that every worker attaches to (see shared_state.py).
+
+Usage:
+    python serve.py --workers 4 --preload
+    python serve.py --workers 2 --no-preload   # each worker loads models itself
+
+POSIX only (uses os.fork).
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock, args):
+    """Body of a forked worker: serve the already-imported app on the shared socket"""
+    import uvicorn
+    import app as service
+
+    # Children start with default signal handling; uvicorn installs its own graceful ones
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    gc.enable()
+
+    # Without --preload the app's lifespan hook loads the models in each worker;
+    # with it, warm-up finds everything already resident and returns immediately
+    config = uvicorn.Config(service.app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--preload", dest="preload", action="store_true", default=True,
+                        help="load models in the master before forking (default)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false")
+    parser.add_argument("--shared-state", default=os.getenv("ML_SHARED_STATE_DIR"),
+                        help="directory for shared index snapshots (default with >1 worker: /dev/shm/ml-service-<port>)")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    # Workers must agree on mutable index state, so share it whenever there is more than one
+    from shared_state import default_root
+    shared_state = args.shared_state or (default_root(f"ml-service-{args.port}") if args.workers > 1 else None)
+    if shared_state:
+        os.environ["ML_SHARED_STATE_DIR"] = shared_state
+
+    # Keep the collector from scattering refcount/GC-header writes over model pages while loading
+    gc.disable()
+    import app as service
+    if args.preload:
+        service.warm_up()
+
+    # Move everything allocated so far into the permanent generation so that
+    # collections in the workers never write to (and so never copy) these pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+    print(f"🌟 Master {os.getpid()} listening on {args.host}:{args.port} with {args.workers} workers "
+          f"({'preloaded' if args.preload else 'per-worker'} models, shared state: {shared_state or 'off'})")
+
+    workers = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(sock, args)
+            finally:
+                os._exit(0)
+        workers[pid] = time.time()
+        return pid
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"⚠️  Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+        if time.time() - started < 1:
+            # Crash loop protection
+            time.sleep(1)
+        spawn()
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Run a local sharded cluster: N shard nodes and one coordinator, each a
+separate uvicorn process on its own port.
+
+Shard i listens on --base-port + 1 + i with CANDIDATE_INDEX_DIR=<dir>/shard-i;
+the coordinator listens on --base-port with ML_SHARDS pointing at the shards.
+Index through the coordinator (POST /shards/candidates/index) and query it
+with POST /shards/candidates/search.
+
+Usage:
+    python serve_shards.py --shards 3 --base-port 8100 --dir data/shards
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_node(port, env, log_level="warning"):
+    """Start one uvicorn process serving app:app on 127.0.0.1:port"""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", log_level],
+        cwd=HERE, env=dict(os.environ, **env)
+    )
+
+
+def wait_healthy(port, timeout_seconds=120):
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Node on port {port} did not become healthy in {timeout_seconds} s")
+
+
+def start_cluster(shards, base_port, directory, shard_timeout_seconds=5.0, log_level="warning"):
+    """Start shard nodes and a coordinator; returns (coordinator process, [shard processes])"""
+    shard_processes = []
+    for i in range(shards):
+        env = {"CANDIDATE_INDEX_DIR": os.path.abspath(os.path.join(directory, f"shard-{i}")), "ML_LAZY_LOAD": "1"}
+        shard_processes.append(start_node(base_port + 1 + i, env, log_level))
+
+    shard_urls = ",".join(f"http://127.0.0.1:{base_port + 1 + i}" for i in range(shards))
+    coordinator = start_node(base_port, {
+        "ML_SHARDS": shard_urls, "ML_SHARD_TIMEOUT_SECONDS": str(shard_timeout_seconds), "ML_LAZY_LOAD": "1"
+    }, log_level)
+
+    for port in [base_port] + [base_port + 1 + i for i in range(shards)]:
+        wait_healthy(port)
+    return coordinator, shard_processes
+
+
+def stop_cluster(processes):
+    for process in processes:
+        if process.poll() is None:
+            # A paused shard (SIGSTOP in a test) must be resumed to handle SIGTERM
+            process.send_signal(signal.SIGCONT)
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--base-port", type=int, default=8100)
+    parser.add_argument("--dir", default=os.path.join("data", "shards"))
+    parser.add_argument("--shard-timeout", type=float, default=5.0)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    coordinator, shards = start_cluster(args.shards, args.base_port, args.dir, args.shard_timeout, args.log_level)
+    print(f"✅ Coordinator on http://127.0.0.1:{args.base_port} over {args.shards} shards "
+          f"(ports {args.base_port + 1}-{args.base_port + args.shards}); Ctrl+C to stop")
+    try:
+        while all(process.poll() is None for process in [coordinator] + shards):
+            time.sleep(1)
+        print("❌ A node exited; stopping the cluster")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_cluster([coordinator] + shards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Scatter-gather over candidate index shards.
+
+Candidates are partitioned by a stable hash of their ID across N ml-service
+instances, each an ordinary node with its own candidate index
+(CANDIDATE_INDEX_DIR). A coordinator node (ML_SHARDS=url,url,...) routes
+writes to the owning shard and fans a JD query out to every shard's
+/candidates/search. Each shard returns its own top-K, already sorted. The
+coordinator merges them with a heap and keeps the global top-K.
+
+A shard that does not answer within the timeout, or that fails, is left out.
+The response is then flagged partial and lists each shard's status.
+
+Each shard fixes its TF-IDF vocabulary from its own first batch. Hash
+partitioning gives every shard a similar sample of the pool, so scores are
+comparable across shards but not bit-identical to a single index.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+import zlib
+from urllib.parse import quote
+
+
+def shard_for(candidate_id, shard_count):
+    """Shard number owning a candidate ID (stable across processes and restarts)"""
+    return zlib.crc32(str(candidate_id).encode("utf-8")) % shard_count
+
+
+class ShardError(Exception):
+    """A shard rejected a request as invalid (its 4xx detail); not a reason to return partial results"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ShardCoordinator:
+    def __init__(self, shard_urls, timeout_seconds=5.0):
+        if not shard_urls:
+            raise ValueError("At least one shard URL is required")
+        self.shard_urls = [url.rstrip("/") for url in shard_urls]
+        self.timeout_seconds = timeout_seconds
+        self._client = None
+
+    def __len__(self):
+        return len(self.shard_urls)
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=None)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def partition(self, candidates):
+        """Candidates grouped by owning shard; every candidate needs an 'id'"""
+        groups = [[] for _ in self.shard_urls]
+        for candidate in candidates:
+            if candidate.get('id') is None:
+                raise ValueError("Sharded candidates need an 'id' to be routed")
+            groups[shard_for(candidate['id'], len(self.shard_urls))].append(candidate)
+        return groups
+
+    async def index(self, candidates, timeout_seconds=None):
+        """Send each candidate to its shard's /candidates/index"""
+        groups = self.partition(candidates)
+        requests = {
+            shard: ("POST", "/candidates/index", {"candidates": group})
+            for shard, group in enumerate(groups) if group
+        }
+        statuses, bodies = await self._scatter(requests, timeout_seconds or self.timeout_seconds * 6)
+        for shard, group in enumerate(groups):
+            statuses[shard]["sent"] = len(group)
+
+        near_duplicates = {}
+        for body in bodies.values():
+            near_duplicates.update(body["data"].get("near_duplicates") or {})
+        return {
+            "indexed": sum(len(groups[shard]) for shard in bodies),
+            "partial": self._partial(statuses, requests),
+            "shards": statuses,
+            # Within a shard only; duplicates routed to different shards are not compared
+            "near_duplicates": near_duplicates,
+        }
+
+    async def delete(self, candidate_id, timeout_seconds=None):
+        """Delete a candidate on its shard; True if it was indexed there"""
+        shard = shard_for(candidate_id, len(self.shard_urls))
+        statuses, bodies = await self._scatter(
+            {shard: ("DELETE", f"/candidates/{quote(str(candidate_id), safe='')}", None)}, timeout_seconds or self.timeout_seconds,
+            empty_statuses=(404,)
+        )
+        if statuses[shard]["status"] not in ("ok", "empty"):
+            raise ConnectionError(f"Shard {self.shard_urls[shard]}: {statuses[shard].get('error', statuses[shard]['status'])}")
+        return shard in bodies
+
+    async def search(self, jd_text, top_k=50, scoring=None, filters=None, timeout_seconds=None):
+        """Global top-K over every shard; shards that time out or fail are left out and flagged"""
+        payload = {"jd_text": jd_text, "top_k": top_k, "scoring": scoring, "filters": filters}
+        requests = {shard: ("POST", "/candidates/search", payload) for shard in range(len(self.shard_urls))}
+        # An empty shard answers 400 ("No candidates are indexed"); it simply contributes nothing
+        statuses, bodies = await self._scatter(requests, timeout_seconds or self.timeout_seconds, empty_statuses=(400,))
+
+        hits = {}
+        for shard, body in bodies.items():
+            hits[shard] = [dict(hit, shard=shard) for hit in body["data"]]
+            statuses[shard]["hits"] = len(hits[shard])
+
+        # Each shard's hits are sorted best first, so a k-way heap merge yields the global order
+        merged = heapq.merge(*hits.values(), key=lambda hit: -hit["comprehensive_score"])
+        return {
+            "data": list(itertools.islice(merged, top_k)),
+            "partial": self._partial(statuses, requests),
+            "shards": statuses,
+        }
+
+    async def status(self, timeout_seconds=None):
+        """Candidate index stats of every shard"""
+        requests = {shard: ("GET", "/candidates/index", None) for shard in range(len(self.shard_urls))}
+        statuses, bodies = await self._scatter(requests, timeout_seconds or self.timeout_seconds, empty_statuses=(404,))
+        for shard, body in bodies.items():
+            statuses[shard]["candidates"] = body["data"]["candidates"]
+            statuses[shard]["generation"] = body["data"]["generation"]
+        return {"partial": self._partial(statuses, requests), "shards": statuses}
+
+    async def _scatter(self, requests, timeout_seconds, empty_statuses=()):
+        """Send {shard: (method, path, json)} concurrently; returns (per-shard status, {shard: body} of successes)
+
+        A 422 from a shard is recorded in its status and raised as ShardError
+        once every send has finished, so no request is left running unawaited.
+        """
+        statuses = [{"shard": shard, "url": url, "status": "skipped"} for shard, url in enumerate(self.shard_urls)]
+        bodies = {}
+
+        async def send(shard, method, path, payload):
+            start = time.perf_counter()
+            status = statuses[shard]
+            try:
+                response = await asyncio.wait_for(
+                    self.client.request(method, self.shard_urls[shard] + path, json=payload), timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                status["status"] = "timeout"
+                return
+            except Exception as e:
+                status.update(status="error", error=f"{type(e).__name__}: {e}")
+                return
+            finally:
+                status["ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+            if response.status_code in empty_statuses:
+                status["status"] = "empty"
+            elif response.status_code == 422:
+                status.update(status="invalid", error=response.json().get("detail"))
+            elif response.status_code >= 400:
+                status.update(status="error", error=f"HTTP {response.status_code}: {response.text[:200]}")
+            else:
+                status["status"] = "ok"
+                bodies[shard] = response.json()
+
+        await asyncio.gather(*(send(shard, *request) for shard, request in requests.items()))
+        for status in statuses:
+            if status["status"] == "invalid":
+                raise ShardError(422, status["error"])
+        return statuses, bodies
+
+    @staticmethod
+    def _partial(statuses, requests):
+        return any(statuses[shard]["status"] in ("timeout", "error") for shard in requests)
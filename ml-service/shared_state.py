@@ -0,0 +1,136 @@
+"""
+Versioned, memory-mapped snapshots of read-only state shared between workers.
+
+A snapshot is a directory of `.npy` arrays plus `meta.json` (small metadata
+every reader needs) and an optional `documents.json` (bulk data only writers
+need). Readers open the arrays with `np.load(mmap_mode='r')`, so every worker
+maps the same page-cache pages (zero-copy; on /dev/shm this is plain shared
+memory). A writer builds the next version in a temporary directory, renames
+it into place and then atomically replaces the `CURRENT` pointer, so readers
+only ever see complete versions. Writers serialise on an flock.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def default_root(tag="ml-service"):
+    """Prefer /dev/shm (tmpfs) so snapshots live in shared memory"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, tag)
+
+
+class Snapshot:
+    """One attached, read-only version of a named state"""
+
+    def __init__(self, name, version, path):
+        self.name = name
+        self.version = version
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.arrays = {
+            array_name: np.load(os.path.join(path, array_name + ".npy"), mmap_mode="r")
+            for array_name in self.meta.get("_arrays", [])
+        }
+
+    def documents(self):
+        """Writer-side bulk data stored alongside the arrays"""
+        documents_path = os.path.join(self.path, "documents.json")
+        if not os.path.exists(documents_path):
+            return None
+        with open(documents_path) as f:
+            return json.load(f)
+
+
+class SnapshotWriter:
+    """Handle given to the holder of the writer lock"""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def latest(self):
+        return self.store.attach(self.name)
+
+    def publish(self, arrays, meta, documents=None):
+        """Write a new version and atomically make it current; returns the version number"""
+        store = self.store
+        state_dir = store._state_dir(self.name)
+        current = store.current_version(self.name) or 0
+        version = current + 1
+
+        staging = tempfile.mkdtemp(prefix=f".v{version}-", dir=state_dir)
+        try:
+            for array_name, array in arrays.items():
+                np.save(os.path.join(staging, array_name + ".npy"), np.ascontiguousarray(array))
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(dict(meta, _arrays=sorted(arrays), _version=version), f)
+            if documents is not None:
+                with open(os.path.join(staging, "documents.json"), "w") as f:
+                    json.dump(documents, f)
+            os.rename(staging, os.path.join(state_dir, f"v{version:010d}"))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        pointer_tmp = os.path.join(state_dir, f".CURRENT.{os.getpid()}")
+        with open(pointer_tmp, "w") as f:
+            f.write(str(version))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(state_dir, "CURRENT"))
+
+        store._prune(self.name, version)
+        return version
+
+
+class SharedStateStore:
+    def __init__(self, root=None, keep_versions=3):
+        self.root = root or default_root()
+        self.keep_versions = keep_versions
+        os.makedirs(self.root, exist_ok=True)
+
+    def _state_dir(self, name):
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def current_version(self, name):
+        """Version number CURRENT points at, or None if nothing was published yet"""
+        try:
+            with open(os.path.join(self.root, name, "CURRENT")) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def attach(self, name, version=None):
+        """Map a version (default: current) of a state; None if nothing was published"""
+        version = self.current_version(name) if version is None else version
+        if version is None:
+            return None
+        return Snapshot(name, version, os.path.join(self.root, name, f"v{version:010d}"))
+
+    @contextmanager
+    def writer(self, name):
+        """Exclusive writer lock across processes for one named state"""
+        lock_path = os.path.join(self._state_dir(name), ".lock")
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield SnapshotWriter(self, name)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _prune(self, name, current):
+        # Readers that still map an old version keep its pages alive after unlink
+        state_dir = self._state_dir(name)
+        for entry in os.listdir(state_dir):
+            if entry.startswith("v") and entry[1:].isdigit() and int(entry[1:]) <= current - self.keep_versions:
+                shutil.rmtree(os.path.join(state_dir, entry), ignore_errors=True)
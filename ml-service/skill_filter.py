@@ -0,0 +1,135 @@
+"""
+Hard filters applied before scoring: must-have / must-not skills and numeric
+ranges on experience and education.
+
+    {
+        "must": ["python", "docker"],        # every one of these skills
+        "must_not": ["php"],                 # none of these
+        "experience": {"min": 3, "max": 10}, # years, inclusive; either bound optional
+        "education": {"min": "bachelor"}     # level names from EDUCATION_HIERARCHY
+    }
+
+Over the candidate index, skills are looked up in per-segment posting lists
+(SkillPostings: for each skill, the sorted rows that have it), so a must-have
+query touches only the rows of its rarest skill. Inline candidate pools are
+filtered with a boolean mask over the feature columns. Either way, only the
+surviving candidates reach TF-IDF and the bonus terms.
+"""
+
+import numpy as np
+
+from candidate_matcher import TECHNICAL_SKILLS, EDUCATION_HIERARCHY
+
+FILTER_KEYS = {"must", "must_not", "experience", "education"}
+
+
+class SkillPostings:
+    """Per-skill sorted row lists in CSR form: rows of skill s are rows[indptr[s]:indptr[s + 1]]"""
+
+    def __init__(self, indptr, rows):
+        self.indptr = indptr
+        self.rows = rows
+
+    @classmethod
+    def from_skill_matrix(cls, skills):
+        """Build from a (candidates, skills) 0/1 matrix"""
+        skill_ids, rows = np.nonzero(np.asarray(skills).T)
+        indptr = np.zeros(len(TECHNICAL_SKILLS) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(skill_ids, minlength=len(TECHNICAL_SKILLS)), out=indptr[1:])
+        return cls(indptr, rows.astype(np.int32))
+
+    def posting(self, skill_id):
+        return self.rows[self.indptr[skill_id]:self.indptr[skill_id + 1]]
+
+    def count(self, skill_id):
+        return int(self.indptr[skill_id + 1] - self.indptr[skill_id])
+
+
+class CandidateFilter:
+    """A parsed filter spec; raises ValueError on unknown skills, levels or keys"""
+
+    def __init__(self, spec):
+        spec = spec or {}
+        unknown = set(spec) - FILTER_KEYS
+        if unknown:
+            raise ValueError(f"Unknown filter keys: {sorted(unknown)}")
+
+        self.must = self._skill_ids(spec.get("must"))
+        self.must_not = self._skill_ids(spec.get("must_not"))
+        self.experience = self._range(spec.get("experience"), "experience", float)
+        self.education = self._range(spec.get("education"), "education", self._education_level)
+
+    def __bool__(self):
+        return bool(self.must or self.must_not or self.experience != (None, None) or self.education != (None, None))
+
+    @staticmethod
+    def _skill_ids(skills):
+        ids = []
+        for skill in skills or []:
+            name = str(skill).lower()
+            if name not in TECHNICAL_SKILLS:
+                raise ValueError(f"Unknown skill '{skill}'; supported: {TECHNICAL_SKILLS}")
+            ids.append(TECHNICAL_SKILLS.index(name))
+        return sorted(set(ids))
+
+    @staticmethod
+    def _education_level(value):
+        level = EDUCATION_HIERARCHY.get(str(value).lower())
+        if level is None:
+            raise ValueError(f"Unknown education level '{value}'; use one of {list(EDUCATION_HIERARCHY)}")
+        return level
+
+    @staticmethod
+    def _range(spec, name, convert):
+        if spec is None:
+            return (None, None)
+        if not isinstance(spec, dict) or set(spec) - {"min", "max"}:
+            raise ValueError(f"Filter '{name}' must be an object with 'min' and/or 'max'")
+        low, high = spec.get("min"), spec.get("max")
+        return (None if low is None else convert(low), None if high is None else convert(high))
+
+    def select(self, postings, live, column):
+        """Sorted rows of one segment passing the filter; `column(name, rows)` reads feature values"""
+        if self.must:
+            # Intersect from the rarest skill up, so the candidate set only shrinks
+            must = sorted(self.must, key=postings.count)
+            rows = postings.posting(must[0])
+            for skill_id in must[1:]:
+                if not len(rows):
+                    break
+                rows = rows[np.isin(rows, postings.posting(skill_id), assume_unique=True)]
+        else:
+            rows = np.flatnonzero(live)
+
+        if len(rows) and self.must_not:
+            excluded = np.concatenate([postings.posting(skill_id) for skill_id in self.must_not])
+            rows = rows[~np.isin(rows, excluded)]
+
+        if self.must and len(rows):
+            rows = rows[np.asarray(live[rows], dtype=bool)]
+
+        for name, (low, high) in (("experience", self.experience), ("education", self.education)):
+            if len(rows) and (low is not None or high is not None):
+                values = column(name, rows)
+                keep = np.ones(len(rows), dtype=bool)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                rows = rows[keep]
+        return rows
+
+    def mask(self, columns):
+        """Boolean mask over dense CandidateMatcher feature columns (inline pools)"""
+        keep = np.ones(len(columns["experience"]), dtype=bool)
+        skills = columns["skills"]
+        for skill_id in self.must:
+            keep &= skills[:, skill_id] > 0
+        for skill_id in self.must_not:
+            keep &= skills[:, skill_id] == 0
+        for name, (low, high) in (("experience", self.experience), ("education", self.education)):
+            if low is not None:
+                keep &= columns[name] >= low
+            if high is not None:
+                keep &= columns[name] <= high
+        return keep
@@ -0,0 +1,187 @@
+"""
+Typo-tolerant skill lookup with a SymSpell-style deletion index.
+
+Every taxonomy term is normalised to a key (lower case, letters, digits, '+'
+and '#' only, so "Node.js" -> "nodejs", "Postgre SQL" -> "postgresql"), and
+every string obtainable by deleting up to MAX_EDIT_DISTANCE characters from
+the key's first PREFIX_LENGTH characters is indexed. A lookup generates the
+same deletes of the query key's prefix and checks only the terms sharing one,
+so its cost depends on neither the taxonomy size nor the key length.
+Candidates are verified with the optimal string alignment distance (edits
+plus adjacent transpositions: "pyhton" -> "python").
+
+Ordinary English words sit within an edit or two of many skills ("cluster
+nodes" -> node.js, "locker" -> docker, "conference" -> confluence), so a
+correction must look like a typo of the term, not like another word:
+
+- only terms of at least MIN_FUZZY_LENGTH characters are matched fuzzily,
+  and shorter terms (sql, aws, react) only exactly
+- one edit at most ("expressed" and "influence" are two away)
+- the first letter must match, as it almost always does in real typos
+- a token ending like an English word form that the term does not
+  ("docked" for docker) is a word, not a typo
+- a token shorter than the term (a deletion, "nodes" for nodejs) only
+  matches terms of at least LONG_TERM_LENGTH characters, where a word
+  that close is unlikely ("kubernets", "machine lerning")
+- ties between terms are not resolved, and the words in NOT_TYPOS are
+  never corrected
+
+Words are only joined into keys of MIN_FUZZY_LENGTH or more ("my sql" is
+not mysql).
+
+find() looks up every word and every pair of adjacent words joined (so
+"Postgre SQL" and "machine lerning" resolve) and caches the resolution of
+every key it sees, so repeated tokens cost one dictionary lookup.
+"""
+
+import re
+
+MAX_EDIT_DISTANCE = 1
+MIN_FUZZY_LENGTH = 6
+# Terms long enough to also match tokens with a character missing
+LONG_TERM_LENGTH = 9
+# Only deletes of a key's first PREFIX_LENGTH characters are indexed and generated (as in SymSpell)
+PREFIX_LENGTH = 7
+# Longest run of words joined into one key ("Postgre SQL", "machine lerning")
+MAX_JOINED_WORDS = 2
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+KEY_PATTERN = re.compile(r"[^a-z0-9+#]")
+
+# Endings of English word forms; a token ending in one its term does not is a word, not a typo ("docked")
+WORD_ENDINGS = ("ed", "ing", "ly", "ion", "ence", "ance", "ment", "ness")
+
+# Real words within one edit of a taxonomy term that pass the rules above
+NOT_TYPOS = {"docket", "annular", "pandan"}
+
+
+def normalize(term):
+    """Lookup key of a term or token"""
+    return KEY_PATTERN.sub("", term.lower())
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance of a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def deletes(key, distance):
+    """Every string obtained by deleting up to `distance` characters from key (including key)"""
+    result = {key}
+    frontier = {key}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        result |= frontier
+    return result
+
+
+def allowed_distance(length):
+    """Edits allowed between a term and a token, by the term's length"""
+    return MAX_EDIT_DISTANCE if length >= MIN_FUZZY_LENGTH else 0
+
+
+def looks_like_typo(token, term):
+    """Whether a token within the allowed edits of a term reads as a misspelling of it"""
+    if token[0] != term[0]:
+        return False
+    if any(token.endswith(ending) and not term.endswith(ending) for ending in WORD_ENDINGS):
+        return False
+    return len(token) >= len(term) or len(term) >= LONG_TERM_LENGTH
+
+
+class SkillResolver:
+    """Resolves tokens and word n-grams to taxonomy terms, tolerating typos"""
+
+    def __init__(self, terms, max_cache_size=200000):
+        self.terms = list(dict.fromkeys(terms))
+        self.max_cache_size = max_cache_size
+        self._exact = {}
+        self._deletes = {}
+        for term in self.terms:
+            key = normalize(term)
+            if not key:
+                continue
+            self._exact.setdefault(key, term)
+            if len(key) < MIN_FUZZY_LENGTH:
+                continue
+            for deleted in deletes(key[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self._deletes.setdefault(deleted, set()).add(key)
+        self.max_key_length = max(map(len, self._exact), default=0) + MAX_EDIT_DISTANCE
+        self._cache = {}
+
+    def resolve(self, token):
+        """Taxonomy term for a token (exact or within the allowed edits), or None"""
+        return self._resolve_key(normalize(token))
+
+    def _resolve_key(self, key):
+        term = self._exact.get(key)
+        if term is not None or len(key) < MIN_FUZZY_LENGTH:
+            return term
+
+        cached = self._cache.get(key, False)
+        if cached is not False:
+            return cached
+        term = self._fuzzy(key)
+        if len(self._cache) >= self.max_cache_size:
+            self._cache.clear()
+        self._cache[key] = term
+        return term
+
+    def _fuzzy(self, key):
+        if key in NOT_TYPOS or len(key) > self.max_key_length:
+            return None
+        best, best_distance, tied = None, MAX_EDIT_DISTANCE + 1, False
+        seen = set()
+        for deleted in deletes(key[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+            for candidate in self._deletes.get(deleted, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if not looks_like_typo(key, candidate):
+                    continue
+                distance = edit_distance(key, candidate, MAX_EDIT_DISTANCE)
+                if distance > MAX_EDIT_DISTANCE:
+                    continue
+                if distance < best_distance:
+                    best, best_distance, tied = candidate, distance, False
+                elif distance == best_distance:
+                    tied = True
+        if best is None or tied:
+            return None
+        return self._exact[best]
+    
+    def find(self, text):
+        """Taxonomy terms found in a text, in order of first appearance"""
+        keys = [normalize(token) for token in TOKEN_PATTERN.findall(text.lower())]
+        found = {}
+        for i, key in enumerate(keys):
+            term = self._resolve_key(key)
+            if term is not None:
+                found.setdefault(term, None)
+            for n in range(1, MAX_JOINED_WORDS):
+                if i + n >= len(keys) or len(key) > self.max_key_length:
+                    break
+                key += keys[i + n]
+                # "my sql" is not mysql; joined words must be long enough to be unambiguous
+                if len(key) >= MIN_FUZZY_LENGTH:
+                    term = self._resolve_key(key)
+                    if term is not None:
+                        found.setdefault(term, None)
+        return list(found)
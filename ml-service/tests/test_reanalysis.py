@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_analyzer import ResumeAnalyzer
+
+# "5 years" ends the line right before the Experience heading, so the
+# experience pattern only matches across the section boundary
+RESUME = """Jane Doe
+jane.doe@example.com
+Software engineer. I have 5 years
+Experience
+Backend developer at Acme working with Python, Django and PostgreSQL on AWS.
+Education
+Bachelor of Science in Computer Science, State University
+Skills
+Python, Docker, Git
+"""
+
+COMPARED = (
+    "overall_score", "skills_analysis", "experience_analysis", "education_analysis",
+    "contact_info", "summary", "recommendations", "minhash", "sections",
+)
+
+
+def test_experience_before_a_heading_is_found():
+    analysis = ResumeAnalyzer().analyze(RESUME)
+    assert analysis["experience_analysis"]["years"] == 5
+
+
+def test_reanalyze_matches_analyze():
+    analyzer = ResumeAnalyzer()
+    previous = analyzer.analyze(RESUME)
+    edited = RESUME.replace("Python, Docker, Git", "Python, Docker, Git, Kubernetes")
+
+    full = analyzer.analyze(edited)
+    for reanalysis in (analyzer.reanalyze(edited, previous), analyzer.reanalyze(edited, None)):
+        assert {key: reanalysis[key] for key in COMPARED} == {key: full[key] for key in COMPARED}
+    assert analyzer.reanalyze(edited, previous)["reanalysis"]["recomputed_sections"] == ["skills"]
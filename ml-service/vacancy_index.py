@@ -0,0 +1,308 @@
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from candidate_matcher import TECHNICAL_SKILLS, EDUCATION_HIERARCHY
+from metrics import record_cache, stage
+from scoring import MatchScorer
+
+SHARED_STATE_NAME = "vacancy_index"
+
+
+class VacancyIndex:
+    """Index of open vacancies so resumes can be matched against all of them in one pass
+
+    With a SharedStateStore the built index (IDF table, vacancy term matrix,
+    requirement columns) lives in a memory-mapped snapshot shared by every
+    worker; updates from any worker publish a new snapshot version.
+
+    Each vacancy may carry its own normalised match scoring config
+    ("scoring"); all of them compile into one MatchScorer whose columns line
+    up with the vacancy columns.
+    """
+
+    def __init__(self, matcher, chunk_size=1024, store=None):
+        self.matcher = matcher
+        self.chunk_size = chunk_size
+        self.store = store
+        self.vacancies = {}
+        # Automatic IDs only count up, so a removed vacancy's ID is never handed to another
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._built = None
+        self._built_version = None
+
+    def upsert(self, vacancies):
+        """Add or replace vacancies; the index is rebuilt lazily on the next query"""
+        def apply(current, counter):
+            for vacancy in vacancies:
+                vacancy_id = vacancy.get('id')
+                if vacancy_id is None:
+                    # Skip past IDs callers chose themselves
+                    while f"vacancy_{counter['next_id']}" in current:
+                        counter['next_id'] += 1
+                    vacancy_id = f"vacancy_{counter['next_id']}"
+                    counter['next_id'] += 1
+                vacancy_id = str(vacancy_id)
+                current[vacancy_id] = {
+                    "id": vacancy_id,
+                    "title": vacancy.get('title', ''),
+                    "text": vacancy.get('text', ''),
+                    "scoring": vacancy.get('scoring')
+                }
+            return len(current)
+
+        return self._update(apply)
+
+    def remove(self, vacancy_ids):
+        """Remove vacancies from the index"""
+        def apply(current, counter):
+            return sum(1 for vacancy_id in vacancy_ids if current.pop(str(vacancy_id), None) is not None)
+
+        return self._update(apply)
+
+    def clear(self):
+        """Drop every indexed vacancy"""
+        self._update(lambda current, counter: current.clear())
+
+    def __len__(self):
+        if self.store is not None:
+            return len(self._ensure_built()["vacancies"])
+        return len(self.vacancies)
+
+    def _update(self, apply):
+        """Apply a change to the vacancy set, publishing a new snapshot in shared mode"""
+        if self.store is None:
+            with self._lock:
+                counter = {"next_id": self._next_id}
+                result = apply(self.vacancies, counter)
+                self._next_id = counter["next_id"]
+                self._built = None
+            return result
+
+        with self.store.writer(SHARED_STATE_NAME) as writer:
+            latest = writer.latest()
+            current = {vacancy["id"]: vacancy for vacancy in (latest.documents() or [])} if latest else {}
+            # The counter travels with the snapshot so every worker continues from it
+            counter = {"next_id": latest.meta.get("next_id", 0) if latest else 0}
+            result = apply(current, counter)
+            built = self._build(list(current.values()))
+            arrays, meta = self._export(built)
+            meta["next_id"] = counter["next_id"]
+            writer.publish(arrays, meta, documents=built["vacancies"])
+        return result
+
+    def _ensure_built(self):
+        """Fit TF-IDF over the vacancy corpus and precompute requirement columns"""
+        if self.store is not None:
+            return self._ensure_attached()
+
+        built = self._built
+        record_cache("vacancy_index", built is not None)
+        if built is not None:
+            return built
+
+        with self._lock:
+            if self._built is None:
+                self._built = self._build(list(self.vacancies.values()))
+            return self._built
+
+    def _ensure_attached(self):
+        """Map the current shared snapshot, re-attaching when a writer published a new one"""
+        version = self.store.current_version(SHARED_STATE_NAME)
+        built = self._built
+        hit = built is not None and self._built_version == version
+        record_cache("vacancy_index", hit)
+        if hit:
+            return built
+
+        with self._lock:
+            if self._built is None or self._built_version != version:
+                snapshot = self.store.attach(SHARED_STATE_NAME, version)
+                self._built = self._from_snapshot(snapshot) if snapshot else self._build([])
+                self._built_version = version
+            return self._built
+
+    def _build(self, vacancies):
+        from sklearn.base import clone
+
+        texts = [vacancy["text"] for vacancy in vacancies]
+
+        # Same vectorizer settings as CandidateMatcher, fitted once on the vacancies
+        vectorizer = clone(self.matcher.vectorizer)
+        try:
+            vacancy_matrix = vectorizer.fit_transform(texts)
+        except ValueError:
+            # Empty vocabulary (e.g. only stop words); similarity is 0 everywhere
+            vectorizer = None
+            vacancy_matrix = None
+
+        requirements = [self.matcher._jd_requirements(text) for text in texts]
+
+        return {
+            "vacancies": vacancies,
+            "vectorizer": vectorizer,
+            # Stored transposed so scoring is a single sparse product
+            "matrix_t": vacancy_matrix.T.tocsr() if vacancy_matrix is not None else None,
+            "requirements": requirements,
+            "columns": self.matcher._requirement_columns(requirements),
+            "scorer": self._scorer(vacancies)
+        }
+
+    def _scorer(self, vacancies):
+        """One compiled scorer for all vacancy columns (the matcher's default when none is configured)"""
+        configs = [vacancy.get("scoring") for vacancy in vacancies]
+        if not any(configs):
+            return self.matcher.scorer
+        return MatchScorer(configs)
+
+    def _export(self, built):
+        """Split a built index into shareable arrays and small metadata"""
+        columns = built["columns"]
+        arrays = {
+            "req_skills": columns["skills"],
+            "req_skill_count": columns["skill_count"],
+            "req_experience": columns["experience"],
+            "req_education": columns["education"],
+        }
+        meta = {
+            "vacancies": [
+                {"id": v["id"], "title": v["title"], "scoring": v.get("scoring")} for v in built["vacancies"]
+            ],
+            "taxonomy": {"technical_skills": TECHNICAL_SKILLS, "education_hierarchy": EDUCATION_HIERARCHY},
+            "vocabulary": None,
+        }
+        if built["vectorizer"] is not None:
+            matrix_t = built["matrix_t"]
+            arrays.update({
+                "idf": built["vectorizer"].idf_,
+                "matrix_t_data": matrix_t.data,
+                "matrix_t_indices": matrix_t.indices,
+                "matrix_t_indptr": matrix_t.indptr,
+            })
+            meta["vocabulary"] = built["vectorizer"].get_feature_names_out().tolist()
+            meta["matrix_t_shape"] = list(matrix_t.shape)
+        return arrays, meta
+
+    def _from_snapshot(self, snapshot):
+        """Rebuild query-time state on top of memory-mapped snapshot arrays (no copies)"""
+        from sklearn.base import clone
+
+        arrays, meta = snapshot.arrays, snapshot.meta
+        vectorizer = None
+        matrix_t = None
+        if meta["vocabulary"] is not None:
+            vectorizer = clone(self.matcher.vectorizer)
+            vectorizer.vocabulary_ = {term: i for i, term in enumerate(meta["vocabulary"])}
+            vectorizer.idf_ = arrays["idf"]
+            matrix_t = csr_matrix(
+                (arrays["matrix_t_data"], arrays["matrix_t_indices"], arrays["matrix_t_indptr"]),
+                shape=tuple(meta["matrix_t_shape"]), copy=False
+            )
+
+        skills = arrays["req_skills"]
+        taxonomy = meta["taxonomy"]["technical_skills"]
+        requirements = [
+            {"skills": {taxonomy[j] for j in np.flatnonzero(row)}} for row in skills
+        ]
+
+        return {
+            "vacancies": meta["vacancies"],
+            "vectorizer": vectorizer,
+            "matrix_t": matrix_t,
+            "requirements": requirements,
+            "columns": {
+                "skills": skills,
+                "skill_count": arrays["req_skill_count"],
+                "experience": arrays["req_experience"],
+                "education": arrays["req_education"],
+            },
+            "scorer": self._scorer(meta["vacancies"])
+        }
+
+    def match(self, resumes, top_k=10):
+        """Return the top vacancies for each resume"""
+        if not resumes:
+            return []
+
+        built = self._ensure_built()
+        vacancies = built["vacancies"]
+        if not vacancies:
+            return [self._empty_result(resume, i) for i, resume in enumerate(resumes)]
+
+        top_k = max(1, min(top_k, len(vacancies)))
+        results = []
+
+        for start in range(0, len(resumes), self.chunk_size):
+            chunk = resumes[start:start + self.chunk_size]
+            scores, similarities = self._score_chunk(built, chunk)
+
+            # Top-k per resume without sorting the full row
+            if top_k < len(vacancies):
+                top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            else:
+                top = np.tile(np.arange(len(vacancies)), (len(chunk), 1))
+
+            for row, resume in enumerate(chunk):
+                order = top[row][np.argsort(-scores[row, top[row]], kind='stable')]
+                results.append({
+                    "candidate_id": resume.get('id', f"candidate_{start + row}"),
+                    "name": resume.get('name', f"Candidate {start + row + 1}"),
+                    "matches": [
+                        self._format_match(built, resume, column, scores[row, column], similarities[row, column])
+                        for column in order
+                    ]
+                })
+
+        return results
+
+    def _score_chunk(self, built, resumes):
+        """Score a chunk of resumes against every vacancy"""
+        with stage("match_vacancies", "similarity"):
+            if built["vectorizer"] is not None:
+                resume_matrix = built["vectorizer"].transform([resume.get('text', '') for resume in resumes])
+                # TF-IDF rows are L2-normalised, so the product is the cosine similarity
+                similarities = (resume_matrix @ built["matrix_t"]).toarray()
+            else:
+                similarities = np.zeros((len(resumes), len(built["vacancies"])))
+
+        with stage("match_vacancies", "bonuses"):
+            candidate_columns = self.matcher._candidate_columns(resumes)
+            scorer = built["scorer"]
+            bonuses = self.matcher._bonus_matrix(candidate_columns, built["columns"], scorer)
+            scores = scorer.combine(similarities, bonuses)
+
+        return scores, similarities
+
+    def _format_match(self, built, resume, column, score, similarity):
+        """Build the per-vacancy result entry for one resume"""
+        vacancy = built["vacancies"][column]
+        jd_skills = built["requirements"][column]["skills"]
+        candidate_skills = set(resume.get('skills') or [])
+
+        if jd_skills:
+            overlap = candidate_skills & jd_skills
+            skills_match = {
+                "matched_skills": list(overlap),
+                "missing_skills": list(jd_skills - candidate_skills),
+                "match_percentage": len(overlap) / len(jd_skills) * 100
+            }
+        else:
+            skills_match = "No specific skills mentioned in JD"
+
+        return {
+            "vacancy_id": vacancy["id"],
+            "title": vacancy["title"],
+            "similarity_score": round(float(similarity) * 100, 2),
+            "comprehensive_score": round(float(score), 2),
+            "skills_match": skills_match,
+            "recommendation": self.matcher._generate_recommendation(score)
+        }
+
+    def _empty_result(self, resume, i):
+        return {
+            "candidate_id": resume.get('id', f"candidate_{i}"),
+            "name": resume.get('name', f"Candidate {i+1}"),
+            "matches": []
+        }